@@ -5,49 +5,71 @@ Flask后端 + 前端界面
 """
 
 import os
-import sys
 import json
 import time
-import subprocess
 import threading
+import functools
 from datetime import datetime
-from flask import Flask, render_template_string, jsonify, request
+from flask import Flask, Response, render_template_string, jsonify, request
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from scrapers import phases
+from scrapers.browser_pool import BrowserPool
+from scrapers.debug_capture import capture_stats
+from scrapers.futu_session import session_stats
+from scrapers.registry import GROUPS, load_all
+from scrapers.router import route_totals
+from scrapers.selector_cache import selector_cache
+from scrapers.supervisor import supervisor
+from scrapers.waits import wait_stats
+from service.cache import ResultCache
+from service.dedup import DEDUP_DEFAULT, Deduper, merge_duplicates
+from service.engine import ScrapeEngine
+from service.jobs import JobRegistry, JobRegistryFull
+from service.metrics import (
+    QUEUE_SECONDS, REQUEST_SECONDS, SCRAPE_ITEMS, SCRAPE_SECONDS, SOURCE_SECONDS, STAGE_SECONDS,
+    observe_phase, registry as metrics_registry,
+)
+from service.scheduler import WatchlistScheduler
+from service.singleflight import SingleFlight
+from service.store import NewsStore, parse_since
+from service.watermarks import WatermarkStore
 
 app = Flask(__name__)
 
-# 爬虫配置
-SCRAPERS = {
-    "toutiao": {
-        "name": "今日头条",
-        "file": "scrapers/toutiao_scraper.py",
-        "time": "~65秒",
-    },
-    "cls": {"name": "财联社", "file": "scrapers/cls_scraper.py", "time": "~8秒"},
-    "wallstreet": {
-        "name": "华尔街见闻",
-        "file": "scrapers/wallstreet_scraper.py",
-        "time": "~13秒",
-    },
-    "futu": {"name": "富途新闻", "file": "scrapers/futu_scraper.py", "time": "~17秒"},
-    "futu_report": {
-        "name": "富途研报",
-        "file": "scrapers/futu_report_scraper.py",
-        "time": "~13秒",
-    },
-    "gelonghui": {
-        "name": "格隆汇",
-        "file": "scrapers/gelonghui_scraper.py",
-        "time": "~7秒",
-    },
-    "eastmoney": {
-        "name": "东方财富",
-        "file": "scrapers/eastmoney_scraper.py",
-        "time": "~10秒",
-    },
-}
-
-# 任务状态
-tasks = {}
+# 爬虫配置（插件注册表：{key: {"name", "time", "func"}}）
+SCRAPERS = load_all()
+
+# 并发采集引擎（上限由 SCRAPER_MAX_WORKERS 控制），数据源任务的排队时长计入 /metrics
+engine = ScrapeEngine(on_queue=lambda source, seconds: QUEUE_SECONDS.observe(seconds, source=source))
+
+# 爬虫各阶段耗时计入 /metrics（只在 collect_source 的 tracking 范围内计时）
+phases.set_observer(observe_phase)
+
+# 异步任务注册表，子任务复用引擎线程池
+job_registry = JobRegistry.from_env(engine.submit)
+
+# 预热浏览器池，爬虫在进程内租用 BrowserContext 运行
+browser_pool = BrowserPool.from_env()
+
+# 单个数据源的超时（秒）
+SOURCE_TIMEOUT = 120
+
+
+class ScrapeTimeout(RuntimeError):
+    """数据源在浏览器池中超过 SOURCE_TIMEOUT 未完成"""
+
+# 采集结果缓存（按数据源 TTL，过期后先返回旧数据再后台刷新）
+result_cache = ResultCache.from_env()
+
+# 相同 (数据源, 关键词, 档位) 的进行中采集只跑一次，其余调用方共享结果
+flights = SingleFlight()
+
+# 增量采集水位线（按数据源、关键词记录已返回的条目）
+watermarks = WatermarkStore.from_env()
+
+# 历史条目存储（SQLite + 中文二元分词索引），每次采集到的条目都写入；首次读写时才建库
+news_store = NewsStore()
 
 HTML_TEMPLATE = (
     """
@@ -310,7 +332,7 @@ HTML_TEMPLATE = (
     
     <script>
         const scrapers = """
-    + json.dumps(SCRAPERS)
+    + json.dumps({k: {"name": v["name"], "time": v["time"]} for k, v in SCRAPERS.items()})
     + """;
         
         function init() {
@@ -438,19 +460,547 @@ def api_health():
 # /api/v1/sources 接口已移除，不对外暴露数据源列表
 
 
+@app.route("/api/v1/stats")
+def api_stats():
+    """运行状态：缓存命中、请求合并、浏览器池与进程监管、富途常驻会话、页面等待耗时、资源拦截、调试快照、关注列表"""
+    return jsonify(
+        {
+            "cache": result_cache.stats(),
+            "singleflight": flights.stats(),
+            "browser_pool": browser_pool.stats(),
+            "browser_processes": supervisor.stats(),
+            "futu_session": session_stats.snapshot(),
+            "jobs": job_registry.stats(),
+            "waits": wait_stats.snapshot(),
+            "routing": route_totals.snapshot(),
+            "debug_capture": capture_stats.snapshot(),
+            "watermarks": watermarks.stats(),
+            "store": news_store.stats(),
+            "watchlist": watchlist.stats(),
+        }
+    )
+
+
+@metrics_registry.collector
+def pool_metrics():
+    stats = browser_pool.stats()
+    procs = supervisor.stats()
+    return [
+        ("browser_pool_size", "gauge", "浏览器池当前浏览器数", [({}, stats["size"])]),
+        ("browser_pool_busy", "gauge", "正在执行任务的浏览器数", [({}, stats["busy"])]),
+        ("browser_pool_queued", "gauge", "排队等待浏览器的任务数", [({}, stats["queued"])]),
+        ("browser_pool_recycled_total", "counter", "按次数 / 内存回收的浏览器数", [({}, stats["recycled"])]),
+        ("browser_rss_bytes", "gauge", "每个浏览器（含子进程）的常驻内存",
+         [({"browser": b["id"]}, int(b["rss_mb"] * 1024 * 1024)) for b in stats["browsers"]]),
+        ("browser_processes", "gauge", "本服务登记的存活浏览器进程数（含子进程）", [({}, procs["processes"])]),
+        ("browser_jobs_killed_total", "counter", "超过墙钟上限被强制结束的浏览器任务数", [({}, procs["killed_jobs"])]),
+        ("browser_orphans_reaped_total", "counter", "回收的孤儿浏览器数", [({}, procs["reaped_orphans"])]),
+    ]
+
+
+@metrics_registry.collector
+def traffic_metrics():
+    routing = route_totals.snapshot()
+    cache = result_cache.stats()
+    return [
+        ("scraper_bytes_total", "counter", "各数据源下载的字节数（浏览器放行的响应 + 直连接口）",
+         [({"source": source}, s["bytes_allowed"]) for source, s in sorted(routing.items())]),
+        ("scraper_requests_total", "counter", "浏览器发出的请求数（action = allowed / blocked）",
+         [({"source": source, "action": action}, s[action])
+          for source, s in sorted(routing.items()) for action in ("allowed", "blocked")]),
+        ("result_cache_lookups_total", "counter", "结果缓存查询（outcome = hit / stale / miss）",
+         [({"outcome": "hit"}, cache["hits"]), ({"outcome": "stale"}, cache["stale_hits"]),
+          ({"outcome": "miss"}, cache["misses"])]),
+    ]
+
+
+@app.route("/metrics")
+def metrics():
+    """Prometheus 指标（文本格式 0.0.4）：各阶段 / 数据源 / 请求耗时、条目数、下载字节、浏览器池"""
+    return Response(metrics_registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def standardize(item: dict, keyword: str, source_name: str) -> dict:
+    """转换为股票项目需要的标准格式"""
+    return {
+        "symbol": keyword,
+        "title": item.get("title", ""),
+        "summary": item.get("summary", ""),
+        "content": item.get("summary", ""),  # 用摘要作为正文
+        "source": source_name,
+        "source_type": "scraper",
+        "url": item.get("url", ""),
+        "publish_time": item.get("time", ""),
+        "sentiment": "neutral",
+        "relevance_score": 0.8,
+        "tags": [keyword],
+        "created_at": datetime.now().isoformat(),
+    }
+
+
+def observed(label: str, fn):
+    """运行一次采集并计入 /metrics：阶段耗时记在 label 名下，整体耗时按结果（ok / empty / error / timeout）统计"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        with phases.tracking(label):
+            result = fn()
+        outcome = "ok" if result and (not isinstance(result, dict) or any(result.values())) else "empty"
+        return result
+    except (ScrapeTimeout, PlaywrightTimeoutError):
+        # 按异常类型判断，页面操作超时未被爬虫处理的也算超时
+        outcome = "timeout"
+        raise
+    finally:
+        SCRAPE_SECONDS.observe(time.perf_counter() - start, source=label, outcome=outcome)
+
+
+def collect_source(source: str, keyword: str, limit: int, watermark=None) -> list:
+    """运行单个爬虫（有直连路径先直连，拿不到数据再进浏览器池），返回原始条目列表，失败时抛出异常
+
+    watermark 为增量状态，只传给声明了 incremental 的爬虫；耗时、结果和条目数计入 /metrics
+    """
+
+    def run():
+        items = collect_direct(source, keyword, limit, watermark)
+        return items if items is not None else collect_browser(source, keyword, limit, watermark)
+
+    items = observed(source, run)
+    SCRAPE_ITEMS.inc(len(items), source=source)
+    return items
+
+
+def watermark_arg(source: str, watermark) -> dict:
+    return {"watermark": watermark} if watermark is not None and SCRAPERS[source]["incremental"] else {}
+
+
+def collect_direct(source: str, keyword: str, limit: int, watermark=None):
+    """直连路径，返回条目列表；没有直连路径或没拿到数据（需要进浏览器）时返回 None"""
+    direct = SCRAPERS[source].get("direct")
+    if direct is None:
+        return None
+    extra = watermark_arg(source, watermark)
+    try:
+        items = direct(keyword, limit, **extra)
+    except Exception as e:
+        print(f"⚠️ {source} 直连失败，改用浏览器: {e}")
+        items = []
+    # 增量模式下接口可用但没有新条目，也不必再进浏览器
+    if items or (extra and watermark.incremental and watermark.rounds):
+        return items
+    return None
+
+
+def collect_browser(source: str, keyword: str, limit: int, watermark=None) -> list:
+    """在浏览器池中运行爬虫，返回原始条目列表"""
+    extra = watermark_arg(source, watermark)
+    func = SCRAPERS[source]["func"]
+    session = SCRAPERS[source].get("session")
+    try:
+        if session is not None:
+            # 浏览器池保留常驻会话，换关键词不必重新打开页面
+            return browser_pool.run(
+                lambda s: func(keyword, limit, session=s, **extra),
+                timeout=SOURCE_TIMEOUT,
+                session=session,
+            )
+        return browser_pool.run(
+            lambda context: func(keyword, limit, context=context, **extra),
+            timeout=SOURCE_TIMEOUT,
+        )
+    except TimeoutError:
+        raise ScrapeTimeout("采集超时")
+
+
+def collect_group(group: str, sources: list, keyword: str, limit: int, runs: dict) -> dict:
+    """同组数据源（富途新闻 / 研报）一起采集，返回 {数据源: 原始条目列表}，失败时抛出异常
+
+    各自先直连；仍需浏览器的不止一个时只运行一次组采集（只搜索一次），runs 为 {数据源: 增量状态}
+    """
+
+    def run():
+        results, pending = {}, []
+        for source in sources:
+            with phases.tracking(source):
+                items = collect_direct(source, keyword, limit, runs.get(source))
+            if items is None:
+                pending.append(source)
+            else:
+                results[source] = items
+        if len(pending) == 1:
+            with phases.tracking(pending[0]):
+                results[pending[0]] = collect_browser(pending[0], keyword, limit, runs.get(pending[0]))
+        elif pending:
+            results.update(collect_group_browser(group, pending, keyword, limit, runs))
+        return results
+
+    results = observed("+".join(sources), run)
+    for source, items in results.items():
+        SCRAPE_ITEMS.inc(len(items), source=source)
+    return results
+
+
+def collect_group_browser(group: str, sources: list, keyword: str, limit: int, runs: dict) -> dict:
+    """在浏览器池中运行一次组采集，返回 {数据源: 原始条目列表}"""
+    spec = GROUPS[group]
+    func, session = spec["func"], spec["session"]
+    marks = {s: runs[s] for s in sources if runs.get(s) is not None and SCRAPERS[s]["incremental"]}
+    try:
+        if session is not None:
+            found = browser_pool.run(
+                lambda s: func(keyword, limit, session=s, watermarks=marks),
+                timeout=SOURCE_TIMEOUT,
+                session=session,
+            )
+        else:
+            found = browser_pool.run(
+                lambda context: func(keyword, limit, context=context, watermarks=marks),
+                timeout=SOURCE_TIMEOUT,
+            )
+    except TimeoutError:
+        raise ScrapeTimeout("采集超时")
+    return {source: found.get(source, []) for source in sources}
+
+
+def collect_full(source: str, keyword: str, limit: int) -> list:
+    """全量采集，记录轮数作为增量模式的基线（条目不并入水位线，见 service/watermarks.py）"""
+    run = watermarks.start(source, keyword, incremental=False)
+    items = collect_source(source, keyword, limit, watermark=run)
+    watermarks.finish(source, keyword, run, items)
+    return items
+
+
+def collect_shared(source: str, keyword: str, limit: int) -> list:
+    """按缓存档位采集，同键的并发调用合并为一次"""
+    key = result_cache.make_key(source, keyword, limit)
+    items, _ = flights.do(key, lambda: collect_full(source, keyword, key[2]))
+    return items
+
+
+def collect_incremental(source: str, keyword: str, limit: int):
+    """增量采集：只返回水位线之后的新条目，返回 (原始条目, 增量统计)
+
+    不读写结果缓存；不支持 watermark 的爬虫照常采集，再按水位线过滤
+    """
+    key = result_cache.make_key(source, keyword, limit) + ("incremental",)
+
+    def load():
+        run = watermarks.start(source, keyword, incremental=True)
+        items = collect_source(source, keyword, key[2], watermark=run)
+        if not SCRAPERS[source]["incremental"]:
+            items = run.split(items)
+        return items, watermarks.finish(source, keyword, run, items)
+
+    result, _ = flights.do(key, load)
+    return result
+
+
+def store_items(source: str, items: list):
+    """写入历史存储，失败不影响本次返回"""
+    try:
+        news_store.upsert_many(source, items)
+    except Exception as e:
+        print(f"⚠️ {source} 写入存储失败: {e}")
+
+
+def run_incremental(source: str, keyword: str, limit: int):
+    """增量采集单个数据源，返回 (标准格式列表, 增量统计)"""
+    items, info = collect_incremental(source, keyword, limit)
+    name = SCRAPERS[source]["name"]
+    std_items = [standardize(item, keyword, name) for item in items]
+    store_items(source, std_items)
+    return std_items, info
+
+
+def fetch_source(source: str, keyword: str, limit: int) -> list:
+    """采集并写入缓存（空结果不缓存），返回原始条目列表"""
+    items = collect_shared(source, keyword, limit)
+    if items:
+        result_cache.put(result_cache.make_key(source, keyword, limit), items)
+    return items
+
+
+def run_source(source: str, keyword: str, limit: int) -> list:
+    """运行单个爬虫，返回标准格式列表，失败时抛出异常"""
+    items = fetch_source(source, keyword, limit)
+    std_items = [standardize(item, keyword, SCRAPERS[source]["name"]) for item in items]
+    store_items(source, std_items)
+    return std_items
+
+
+def run_group(group: str, sources: list, keyword: str, limit: int, incremental: bool = False) -> dict:
+    """同组数据源一起采集（只搜索一次），返回 {数据源: (标准格式列表, 增量统计)}，失败时抛出异常
+
+    全量模式与 run_source 一样记录轮数、写缓存；增量模式与 run_incremental 一样不走缓存，只返回新条目
+    """
+    key = result_cache.make_key(group, keyword, limit) + (tuple(sources),)
+    if incremental:
+        key += ("incremental",)
+
+    def load():
+        runs = {s: watermarks.start(s, keyword, incremental=incremental) for s in sources}
+        found = collect_group(group, sources, keyword, key[2], runs)
+        out = {}
+        for s in sources:
+            items = found[s]
+            if incremental and not SCRAPERS[s]["incremental"]:
+                items = runs[s].split(items)
+            info = watermarks.finish(s, keyword, runs[s], items)
+            out[s] = (items, info if incremental else None)
+        return out
+
+    found, _ = flights.do(key, load)
+    results = {}
+    for s, (items, info) in found.items():
+        if items and not incremental:
+            result_cache.put(result_cache.make_key(s, keyword, limit), items)
+        std_items = [standardize(item, keyword, SCRAPERS[s]["name"]) for item in items]
+        store_items(s, std_items)
+        results[s] = (std_items, info)
+    return results
+
+
+def run_group_items(group: str, sources: list, keyword: str, limit: int) -> dict:
+    """全量组采集，返回 {数据源: 标准格式列表}（异步任务、关注列表使用）"""
+    return {s: items for s, (items, _) in run_group(group, sources, keyword, limit).items()}
+
+
+def group_pending(sources: list) -> dict:
+    """待采集的数据源中同组且不少于两个的，返回 {组标识: [数据源, ...]}"""
+    grouped = {}
+    for source in sources:
+        if SCRAPERS[source]["group"]:
+            grouped.setdefault(SCRAPERS[source]["group"], []).append(source)
+    # 按组内顺序排列，同组的并发请求合并为一次
+    return {
+        group: [s for s in GROUPS[group]["sources"] if s in members]
+        for group, members in grouped.items() if len(members) > 1
+    }
+
+
+# 关注列表：后台按自适应间隔刷新热门关键词，结果写入缓存和存储（初始间隔取各数据源缓存 TTL）
+watchlist = WatchlistScheduler.from_env(
+    run_source,
+    engine.submit,
+    list(SCRAPERS.keys()),
+    {source: result_cache.ttl_for(source) for source in SCRAPERS},
+    groups={s: GROUPS[spec["group"]]["sources"] for s, spec in SCRAPERS.items() if spec["group"]},
+    group_runner=lambda sources, keyword, limit: run_group_items(SCRAPERS[sources[0]]["group"], sources, keyword, limit),
+)
+
+
+def cached_source(source: str, keyword: str, limit: int):
+    """查缓存：命中返回 (标准格式列表, 缓存信息)，过期命中同时触发后台刷新；未命中返回 None"""
+    key = result_cache.make_key(source, keyword, limit)
+    hit = result_cache.peek(key)
+    if hit is None:
+        return None
+
+    items, age, stale = hit
+    if stale:
+        loader = functools.partial(collect_shared, source, keyword, limit)
+        result_cache.refresh(key, loader, engine.submit)
+    name = SCRAPERS[source]["name"]
+    return (
+        [standardize(i, keyword, name) for i in items],
+        {"age_seconds": round(age, 1), "stale": stale},
+    )
+
+
+def format_items(items: list) -> str:
+    """控制台展示用的 Markdown 文本"""
+    lines = []
+    for i, item in enumerate(items, 1):
+        lines.append(f"## {i}. {item.get('title', '')}")
+        if item.get("time"):
+            lines.append(f"- 时间: {item['time']}")
+        if item.get("summary"):
+            lines.append(f"- 摘要: {item['summary']}")
+        if item.get("url"):
+            lines.append(f"- 链接: {item['url']}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def iter_sources(sources: list, keyword: str, limit: int, refresh: bool = False, incremental: bool = False):
+    """按完成顺序 yield (source, items, error, elapsed, cached, incremental_info)
+
+    全量模式缓存命中先返回，其余并发采集；增量模式不走缓存，只返回新条目
+    """
+    jobs = {}
+    for source in sources:
+        if incremental:
+            jobs[source] = functools.partial(run_incremental, source, keyword, limit)
+            continue
+        hit = None if refresh else cached_source(source, keyword, limit)
+        if hit is None:
+            jobs[source] = functools.partial(run_source, source, keyword, limit)
+        else:
+            SOURCE_SECONDS.observe(0.0, source=source, outcome="cache")
+            yield source, hit[0], None, 0.0, hit[1], None
+
+    # 同组且都要采集的数据源（富途新闻 / 研报）合成一个任务，只搜索一次
+    members = {}
+    for group, group_sources in group_pending(list(jobs)).items():
+        label = "+".join(group_sources)
+        for source in group_sources:
+            del jobs[source]
+        jobs[label] = functools.partial(run_group, group, group_sources, keyword, limit, incremental)
+        members[label] = group_sources
+
+    for label, result, error, elapsed in engine.run_all(jobs):
+        if label in members:
+            # 组任务的结果按数据源拆开，逐个返回
+            for source in members[label]:
+                SOURCE_SECONDS.observe(elapsed, source=source, outcome="ok" if error is None else "error")
+                if error is not None:
+                    yield source, None, error, elapsed, None, None
+                else:
+                    items, info = result[source]
+                    yield source, items, None, elapsed, None, info
+            continue
+        SOURCE_SECONDS.observe(elapsed, source=label, outcome="ok" if error is None else "error")
+        if incremental and error is None:
+            items, info = result
+        else:
+            items, info = result, None
+        yield label, items, error, elapsed, None, info
+
+
+def parse_dedup() -> bool:
+    """dedup=0/1 覆盖默认的跨数据源去重开关（DEDUP）"""
+    value = request.args.get("dedup", "")
+    return DEDUP_DEFAULT if value == "" else value != "0"
+
+
+def parse_limit(value, default: int = 20):
+    """请求体 / 参数里的 limit 转为正整数，缺省取 default，非法（非数字或不大于 0）返回 None"""
+    if value is None or value == "":
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return None
+    return limit if limit > 0 else None
+
+
+def stream_news(sources: list, keyword: str, limit: int, refresh: bool, fmt: str, incremental: bool = False,
+                dedup: bool = True):
+    """逐个数据源输出结果（NDJSON 或 SSE），最后输出元数据，条目不在内存中累积
+
+    去重时只保留标题索引，与先输出的数据源重复的条目直接丢弃（已输出的条目无法再补 duplicates）
+    """
+
+    def encode(event: str, payload: dict) -> str:
+        body = json.dumps(payload, ensure_ascii=False)
+        if fmt == "sse":
+            return f"event: {event}\ndata: {body}\n\n"
+        return json.dumps(dict(payload, event=event), ensure_ascii=False) + "\n"
+
+    def generate():
+        start_time = time.time()
+        total = 0
+        errors_by_source = {}
+        durations = {}
+        cached = {}
+        incremental_info = {}
+        deduper = Deduper() if dedup else None
+        removed = 0
+
+        for source, items, error, elapsed, cache_info, inc_info in iter_sources(
+            sources, keyword, limit, refresh, incremental
+        ):
+            durations[source] = round(elapsed, 2)
+            if error is not None:
+                errors_by_source[source] = f"{source}: {error}"
+                yield encode("error", {"source": source, "error": str(error)})
+                continue
+            if cache_info:
+                cached[source] = cache_info
+            if inc_info:
+                incremental_info[source] = inc_info
+            dropped = 0
+            if deduper is not None:
+                before = len(items)
+                merge_start = time.perf_counter()
+                items = deduper.filter_new(items)
+                STAGE_SECONDS.observe(time.perf_counter() - merge_start, stage="merge")
+                dropped = before - len(items)
+                removed += dropped
+            total += len(items)
+            yield encode(
+                "source",
+                {
+                    "source": source,
+                    "name": SCRAPERS[source]["name"],
+                    "count": len(items),
+                    "duration_seconds": durations[source],
+                    "cached": cache_info,
+                    "incremental": inc_info,
+                    "duplicates_removed": dropped if dedup else None,
+                    "data": items,
+                },
+            )
+
+        errors = [errors_by_source[s] for s in sources if s in errors_by_source]
+        REQUEST_SECONDS.observe(
+            time.time() - start_time, mode="incremental" if incremental else "full", stream=fmt,
+            outcome="partial" if errors else "ok",
+        )
+        yield encode(
+            "metadata",
+            {
+                "success": True,
+                "keyword": keyword,
+                "metadata": {
+                    "total_count": total,
+                    "sources_used": sources,
+                    "duration_seconds": round(time.time() - start_time, 2),
+                    "source_durations": durations,
+                    "errors": errors if errors else None,
+                    "cached": cached if cached else None,
+                    "mode": "incremental" if incremental else "full",
+                    "incremental": incremental_info if incremental else None,
+                    "dedup": {"merged": removed} if dedup else None,
+                },
+            },
+        )
+
+    mimetype = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return Response(
+        generate(),
+        mimetype=mimetype,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/api/v1/news")
 def api_news():
     """采集新闻 - JSON API
 
     参数:
         keyword: 关键词 (必须)
-        limit: 每个源的采集数量 (默认 20)
+        limit: 每个源的采集数量 (默认 20，向上取整到缓存档位)
+        refresh: 1 表示跳过缓存强制重新采集 (默认 0)
+        stream: ndjson / sse 表示流式返回，每个数据源完成即输出 (默认不流式)
+                也可用 Accept: text/event-stream 请求 SSE
+        mode: incremental 表示只返回上次采集之后的新条目，碰到已采集条目即停止滚动/翻页
+              (默认 full；增量模式不走缓存)
+        dedup: 0 表示不合并跨数据源的近似重复条目 (默认 1，可由 DEDUP 环境变量修改)
 
     示例:
         /api/v1/news?keyword=小米集团&limit=20
+        /api/v1/news?keyword=小米集团&stream=ndjson
+        /api/v1/news?keyword=小米集团&mode=incremental
     """
     keyword = request.args.get("keyword", "")
-    limit = request.args.get("limit", "20", type=int)
+    limit = request.args.get("limit", 20, type=int)
+    refresh = request.args.get("refresh", "0") == "1"
+    incremental = request.args.get("mode", "full") == "incremental"
+    dedup = parse_dedup()
+    stream = request.args.get("stream", "")
+    if not stream and "text/event-stream" in request.headers.get("Accept", ""):
+        stream = "sse"
 
     if not keyword:
         return jsonify({"success": False, "error": "缺少 keyword 参数"}), 400
@@ -458,50 +1008,40 @@ def api_news():
     # 强制使用所有数据源，不提供选择
     sources = list(SCRAPERS.keys())
 
+    if stream in ("ndjson", "sse"):
+        return stream_news(sources, keyword, limit, refresh, stream, incremental, dedup)
+
     start_time = time.time()
-    all_results = []
-    errors = []
+    items_by_source = {}
+    errors_by_source = {}
+    cached = {}
+    incremental_info = {}
 
-    for source in sources:
-        scraper = SCRAPERS[source]
-        try:
-            # 运行爬虫，使用 --json 模式
-            cmd = [sys.executable, scraper["file"], keyword, str(limit), "--json"]
-            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-
-            if proc.returncode == 0:
-                try:
-                    items = json.loads(proc.stdout)
-                    # 转换为股票项目需要的标准格式
-                    for item in items:
-                        standardized = {
-                            "symbol": keyword,
-                            "title": item.get("title", ""),
-                            "summary": item.get("summary", ""),
-                            "content": item.get("summary", ""),  # 用摘要作为正文
-                            "source": scraper["name"],
-                            "source_type": "scraper",
-                            "url": item.get("url", ""),
-                            "publish_time": item.get("time", ""),
-                            "sentiment": "neutral",
-                            "relevance_score": 0.8,
-                            "tags": [keyword],
-                            "created_at": datetime.now().isoformat(),
-                        }
-                        all_results.append(standardized)
-                except json.JSONDecodeError:
-                    errors.append(f"{source}: JSON解析失败")
-            else:
-                errors.append(f"{source}: {proc.stderr[:100]}")
+    for source, items, error, _, cache_info, inc_info in iter_sources(
+        sources, keyword, limit, refresh, incremental
+    ):
+        if error is not None:
+            errors_by_source[source] = f"{source}: {error}"
+        else:
+            items_by_source[source] = items
+            if cache_info:
+                cached[source] = cache_info
+            if inc_info:
+                incremental_info[source] = inc_info
 
-        except subprocess.TimeoutExpired:
-            errors.append(f"{source}: 采集超时")
-        except Exception as e:
-            errors.append(f"{source}: {str(e)}")
+    # 按数据源固定顺序合并，保证输出稳定
+    all_results = [item for s in sources for item in items_by_source.get(s, [])]
+    errors = [errors_by_source[s] for s in sources if s in errors_by_source]
+    dedup_info = None
+    if dedup:
+        merge_start = time.perf_counter()
+        all_results, dedup_info = merge_duplicates(all_results)
+        STAGE_SECONDS.observe(time.perf_counter() - merge_start, stage="merge")
 
     elapsed = time.time() - start_time
 
-    return jsonify(
+    serialize_start = time.perf_counter()
+    response = jsonify(
         {
             "success": True,
             "keyword": keyword,
@@ -511,11 +1051,231 @@ def api_news():
                 "sources_used": sources,
                 "duration_seconds": round(elapsed, 2),
                 "errors": errors if errors else None,
+                "cached": cached if cached else None,
+                "mode": "incremental" if incremental else "full",
+                "incremental": incremental_info if incremental else None,
+                "dedup": dedup_info,
+            },
+        }
+    )
+    STAGE_SECONDS.observe(time.perf_counter() - serialize_start, stage="serialize")
+    REQUEST_SECONDS.observe(
+        time.time() - start_time, mode="incremental" if incremental else "full", stream="none",
+        outcome="partial" if errors else "ok",
+    )
+    return response
+
+
+@app.route("/api/v1/search")
+def api_search():
+    """检索历史条目（只查存储，不启动浏览器）
+
+    参数:
+        q: 检索词，中文按子串匹配，空格分隔多个词表示同时包含 (可选)
+        since: 只返回该时间之后发布的条目，YYYY-MM-DD[ HH:MM] 或 Unix 时间戳 (可选)
+        source: 数据源标识，如 futu / cls (可选)
+        limit: 返回条数 (默认 50，最大 500)
+        offset: 分页偏移 (默认 0)
+
+    示例:
+        /api/v1/search?q=回购&since=2026-01-01
+        /api/v1/search?q=小米汽车&source=cls
+    """
+    q = request.args.get("q", "")
+    since_arg = request.args.get("since", "")
+    source = request.args.get("source") or None
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 500)
+    offset = max(request.args.get("offset", 0, type=int), 0)
+
+    since = parse_since(since_arg)
+    if since_arg and since is None:
+        return jsonify({"success": False, "error": "since 格式应为 YYYY-MM-DD[ HH:MM] 或 Unix 时间戳"}), 400
+    if source and source not in SCRAPERS:
+        return jsonify({"success": False, "error": f"未知数据源: {source}"}), 400
+
+    start_time = time.time()
+    items, total = news_store.search(q, since=since, source=source, limit=limit, offset=offset)
+    return jsonify(
+        {
+            "success": True,
+            "query": q,
+            "data": items,
+            "metadata": {
+                "total_count": total,
+                "returned": len(items),
+                "offset": offset,
+                "since": since,
+                "source": source,
+                "duration_ms": round((time.time() - start_time) * 1000, 1),
             },
         }
     )
 
 
+@app.route("/api/v1/jobs", methods=["POST"])
+def api_create_job():
+    """创建异步采集任务，立即返回任务 ID
+
+    参数 (JSON body 或 query):
+        keyword: 关键词 (必须)
+        limit: 每个源的采集数量 (默认 20)
+        refresh: true 表示跳过缓存
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "请求体必须是 JSON 对象"}), 400
+    keyword = data.get("keyword") or request.args.get("keyword", "")
+    limit = parse_limit(data["limit"] if "limit" in data else request.args.get("limit"))
+    refresh = bool(data.get("refresh")) or request.args.get("refresh", "0") == "1"
+
+    if not keyword:
+        return jsonify({"success": False, "error": "缺少 keyword 参数"}), 400
+    if limit is None:
+        return jsonify({"success": False, "error": "limit 必须是正整数"}), 400
+
+    sources = list(SCRAPERS.keys())
+    try:
+        job = job_registry.create(keyword, limit, sources)
+    except JobRegistryFull as e:
+        return jsonify({"success": False, "error": str(e)}), 429
+
+    pending = {}
+    for source in sources:
+        hit = None if refresh else cached_source(source, keyword, limit)
+        if hit is None:
+            pending[source] = functools.partial(run_source, source, keyword, limit)
+        else:
+            job.set_result(source, hit[0], cached=hit[1])
+    # 同组数据源合成一个子任务，只搜索一次
+    for group, members in group_pending(list(pending)).items():
+        for source in members:
+            del pending[source]
+        pending[tuple(members)] = functools.partial(run_group_items, group, members, keyword, limit)
+    job_registry.start(job, pending)
+
+    return (
+        jsonify(
+            {
+                "success": True,
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": f"/api/v1/jobs/{job.id}",
+            }
+        ),
+        202,
+    )
+
+
+@app.route("/api/v1/jobs/<job_id>", methods=["GET"])
+def api_get_job(job_id):
+    """查询任务进度，返回已完成数据源的部分结果（dedup=0 关闭近似重复合并）"""
+    job = job_registry.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "任务不存在或已过期"}), 404
+
+    snap = job.snapshot()
+    sources = job.sources
+    all_results = [item for s in sources for item in snap["results"].get(s, [])]
+    dedup_info = None
+    if parse_dedup():
+        all_results, dedup_info = merge_duplicates(all_results)
+    errors = [
+        f"{s}: {snap['progress'][s]['error']}"
+        for s in sources
+        if snap["progress"][s]["status"] == "error"
+    ]
+    end = snap["finished_at"] or time.time()
+
+    return jsonify(
+        {
+            "success": True,
+            "job_id": job.id,
+            "status": snap["status"],
+            "keyword": job.keyword,
+            "progress": snap["progress"],
+            "data": all_results,
+            "metadata": {
+                "total_count": len(all_results),
+                "sources_used": sources,
+                "duration_seconds": round(end - snap["created_at"], 2),
+                "errors": errors if errors else None,
+                "dedup": dedup_info,
+            },
+        }
+    )
+
+
+@app.route("/api/v1/jobs/<job_id>", methods=["DELETE"])
+def api_cancel_job(job_id):
+    """取消任务：未开始的数据源直接撤销，运行中的结果丢弃"""
+    cancelled = job_registry.cancel(job_id)
+    if cancelled is None:
+        return jsonify({"success": False, "error": "任务不存在或已过期"}), 404
+    if not cancelled:
+        return jsonify({"success": False, "error": "任务已结束"}), 409
+    return jsonify({"success": True, "job_id": job_id, "status": "cancelled"})
+
+
+@app.route("/api/v1/watchlist")
+def api_watchlist():
+    """关注列表：每个关键词各数据源的刷新间隔、下次运行时间、上次耗时与新条目数"""
+    return jsonify({"success": True, "data": watchlist.entries(), "stats": watchlist.stats()})
+
+
+@app.route("/api/v1/watchlist", methods=["POST"])
+def api_add_watch():
+    """加入关注关键词（已存在则更新）
+
+    参数 (JSON body):
+        keyword: 关键词 (必须)
+        limit: 每个源的采集数量 (默认 20)
+        sources: 数据源列表 (默认全部)
+    """
+    if not watchlist.enabled:
+        return jsonify({"success": False, "error": "关注列表后台刷新已关闭（WATCHLIST）"}), 409
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "请求体必须是 JSON 对象"}), 400
+    keyword = str(data.get("keyword") or "").strip()
+    limit = parse_limit(data.get("limit"))
+    sources = data.get("sources") or None
+
+    if not keyword:
+        return jsonify({"success": False, "error": "缺少 keyword 参数"}), 400
+    if limit is None:
+        return jsonify({"success": False, "error": "limit 必须是正整数"}), 400
+    if sources is not None and (not isinstance(sources, list) or not all(isinstance(s, str) for s in sources)):
+        return jsonify({"success": False, "error": "sources 必须是数据源标识的列表"}), 400
+    unknown = [s for s in sources or [] if s not in SCRAPERS]
+    if unknown:
+        return jsonify({"success": False, "error": f"未知数据源: {', '.join(unknown)}"}), 400
+
+    return jsonify({"success": True, "data": watchlist.add(keyword, limit, sources)}), 201
+
+
+@app.route("/api/v1/watchlist/<keyword>", methods=["DELETE"])
+def api_remove_watch(keyword):
+    """移除关注关键词，进行中的刷新完成后不再排期"""
+    if not watchlist.remove(keyword):
+        return jsonify({"success": False, "error": "关键词不在关注列表中"}), 404
+    return jsonify({"success": True, "keyword": keyword})
+
+
+@app.route("/api/v1/admin/selectors")
+def api_selectors():
+    """选择器学习缓存：各数据源当前优先的选择器、命中率、各选择器尝试次数与平均耗时"""
+    return jsonify({"success": True, "data": selector_cache.snapshot()})
+
+
+@app.route("/api/v1/admin/selectors", methods=["DELETE"])
+def api_reset_selectors():
+    """清除学习结果（?source= 指定数据源，缺省清除全部），页面改版后可强制重新走候选链"""
+    source = request.args.get("source")
+    if not selector_cache.reset(source):
+        return jsonify({"success": False, "error": "该数据源没有学习记录"}), 404
+    return jsonify({"success": True, "source": source})
+
+
 # ========== Web 界面 ==========
 
 
@@ -526,63 +1286,46 @@ def index():
 
 @app.route("/api/scrape", methods=["POST"])
 def api_scrape():
-    data = request.json
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "请求体必须是 JSON 对象"}), 400
     keyword = data.get("keyword", "")
-    count = data.get("count", 20)
+    count = parse_limit(data.get("count"))
     sources = data.get("sources", [])
+    if count is None:
+        return jsonify({"success": False, "error": "count 必须是正整数"}), 400
 
     results = {}
+    jobs = {}
 
     for source in sources:
         if source not in SCRAPERS:
             results[source] = {"status": "error", "message": "未知数据源"}
             continue
+        jobs[source] = functools.partial(fetch_source, source, keyword, count)
 
-        scraper = SCRAPERS[source]
-        try:
-            # 启动前清理残留浏览器进程
-            subprocess.run(
-                ["pkill", "-9", "-f", "chromium"], capture_output=True, timeout=5
-            )
-            time.sleep(0.5)
-
-            # 运行爬虫
-            cmd = [sys.executable, scraper["file"], keyword, str(count)]
-            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-
-            if proc.returncode == 0:
-                # 查找生成的文件
-                import glob
-
-                files = glob.glob(f"{keyword}_{scraper['name']}_*.md")
-                files.sort(reverse=True)
-
-                if files:
-                    with open(files[0], "r", encoding="utf-8") as f:
-                        content = f.read()
-                    results[source] = {
-                        "status": "done",
-                        "message": content[:2000] + "\n...(更多内容请查看文件)"
-                        if len(content) > 2000
-                        else content,
-                    }
-                else:
-                    results[source] = {"status": "done", "message": proc.stdout}
-            else:
-                results[source] = {
-                    "status": "error",
-                    "message": proc.stderr or proc.stdout,
-                }
-
-        except subprocess.TimeoutExpired:
-            results[source] = {"status": "error", "message": "采集超时"}
-        except Exception as e:
-            results[source] = {"status": "error", "message": str(e)}
+    for source, items, error, _ in engine.run_all(jobs):
+        if error is not None:
+            results[source] = {"status": "error", "message": str(error)}
+        elif not items:
+            results[source] = {"status": "done", "message": "⚠️ 无数据"}
+        else:
+            content = format_items(items)
+            results[source] = {
+                "status": "done",
+                "message": content[:2000] + "\n...(更多内容请查看接口返回)"
+                if len(content) > 2000
+                else content,
+            }
 
     return jsonify(results)
 
 
 if __name__ == "__main__":
     print("🚀 启动财经爬虫控制台...")
-    print("📍 访问: http://localhost:9527")
-    app.run(host="0.0.0.0", port=9527, debug=False)
+    port = int(os.environ.get("PORT", "9527"))
+    print(f"📍 访问: http://localhost:{port}")
+    supervisor.reap_orphans()  # 上次运行崩溃残留的浏览器
+    browser_pool.start()
+    watchlist.start()
+    app.run(host="0.0.0.0", port=port, debug=False)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+并发引擎基准测试
+本地起一个夹具服务器，每个数据源页面按比例模拟真实耗时，
+对比顺序执行（旧逻辑）与 ScrapeEngine 并发执行的总耗时
+
+用法: python bench/bench_concurrency.py [缩放系数] [并发上限]
+示例: python bench/bench_concurrency.py 0.05 7
+"""
+
+import os
+import sys
+import time
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service.engine import ScrapeEngine
+
+# 各数据源实测耗时（秒），与 app.py 中 SCRAPERS 的 time 字段一致
+SOURCE_SECONDS = {
+    "toutiao": 65,
+    "cls": 8,
+    "wallstreet": 13,
+    "futu": 17,
+    "futu_report": 13,
+    "gelonghui": 7,
+    "eastmoney": 10,
+}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """/<source>?delay=秒 → 等待后返回一个最小的新闻列表页"""
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        delay = float(query.split("=", 1)[1]) if query.startswith("delay=") else 0
+        time.sleep(delay)
+        body = f"<html><body><div class='news_item'>{path}</div></body></html>"
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_task(base_url: str, source: str, scale: float):
+    def task():
+        url = f"{base_url}/{source}?delay={SOURCE_SECONDS[source] * scale}"
+        with urllib.request.urlopen(url, timeout=300) as resp:
+            return resp.read()
+
+    return task
+
+
+def main():
+    scale = float(sys.argv[1]) if len(sys.argv) > 1 else 0.05
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else len(SOURCE_SECONDS)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    tasks = {s: make_task(base_url, s, scale) for s in SOURCE_SECONDS}
+    expected_sum = sum(SOURCE_SECONDS.values()) * scale
+    expected_max = max(SOURCE_SECONDS.values()) * scale
+
+    print(f"{'=' * 50}")
+    print(f"⏱️ 并发引擎基准 | 缩放: {scale} | 并发上限: {workers}")
+    print(f"   理论 sum(source): {expected_sum:.2f}s | max(source): {expected_max:.2f}s")
+    print(f"{'=' * 50}")
+
+    # 顺序执行（旧 api_news 逻辑）
+    start = time.time()
+    for task in tasks.values():
+        task()
+    sequential = time.time() - start
+    print(f"顺序执行: {sequential:.2f}s")
+
+    # 并发执行
+    engine = ScrapeEngine(max_workers=workers)
+    start = time.time()
+    for source, _, error, elapsed in engine.run_all(tasks):
+        status = "❌" if error else "✅"
+        print(f"   {status} {source:<12} {elapsed:.2f}s")
+    concurrent = time.time() - start
+    engine.shutdown()
+    print(f"并发执行: {concurrent:.2f}s")
+
+    print(f"{'=' * 50}")
+    print(f"📊 加速比: {sequential / concurrent:.1f}x | 并发/max: {concurrent / expected_max:.2f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+跨数据源去重基准测试
+生成 N 条合成标题（默认 5 万）：每条"消息"在 1~4 个数据源各有一份改写
+（加前缀/后缀、去掉主语、删掉或替换一个词），另有少量只换了数字的同类公告。测量：
+  - LSH 去重总耗时与精确比较次数
+  - 两两全比较的耗时（在子集上实测后按平方外推）
+  - 按真实簇计算的成对精确率 / 召回率
+
+用法: python bench/bench_dedup.py [条数] [两两比较子集大小]
+示例: python bench/bench_dedup.py 50000 2000
+"""
+
+import os
+import sys
+import time
+import random
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service.dedup import DEFAULT_THRESHOLD, Deduper, merge_duplicates, numbers
+from service.store import tokenize
+
+COMPANIES = (
+    "小米集团 腾讯控股 阿里巴巴 美团 京东集团 比亚迪 理想汽车 蔚来 小鹏汽车 快手 网易 百度集团 中芯国际 药明生物 港交所 "
+    "贵州茅台 宁德时代 招商银行 中国平安 长江电力 海天味业 隆基绿能 迈瑞医疗 恒瑞医药 美的集团 格力电器 工商银行 "
+    "中国移动 中海油 紫金矿业 万科企业 携程集团 哔哩哔哩 零跑汽车 泡泡玛特 蜜雪集团 农夫山泉 安踏体育 李宁 舜宇光学"
+).split()
+WORDS = (
+    "回购 增持 减持 分红 派息 配股 定增 可转债 绿色债券 业绩 营收 净利润 毛利率 现金流 指引 预告 快报 交付 销量 订单 "
+    "产能 扩产 停产 复产 新品 发布会 大模型 算力 芯片 光刻 电池 储能 光伏 充电桩 出海 海外 欧洲 东南亚 中东 关税 "
+    "汇率 降息 加息 南向资金 北水 外资 机构 评级 目标价 上调 下调 维持 买入 中性 卖出 做空 空头 估值 市值 股价 "
+    "大涨 大跌 跳水 拉升 涨停 跌停 新高 新低 成交额 换手 恒指 科技指数 成分股 纳入 剔除 监管 问询 处罚 立案 诉讼 "
+    "和解 收购 并购 出售 分拆 上市 退市 私有化 合资 合作 签约 中标 供货 供应链 库存 去化 价格战 降价 提价 补贴 "
+    "会员 用户 日活 广告 游戏 电商 直播 外卖 酒旅 物流 云计算 金融科技 自动驾驶 机器人 手机 平板 汽车 门店 加盟 "
+    "裁员 招聘 高管 离职 任命 董事会 股东大会 年报 中报 季报 审计 员工持股 股权激励 战略投资 研发 专利 牌照 试点"
+).split()
+UNITS = ["{n}万股", "{a}亿港元", "{a}亿元", "{r}%", "{n}辆", "{p}港元"]
+PREFIXES = ["【快讯】", "格隆汇{m}月{d}日丨", "财联社电，", "港股异动：", "{c}："]
+SUFFIXES = ["，股价盘中拉升", "，市场反应积极", "（附公告）", "，较上一交易日有所扩大", "，机构解读来了"]
+SOURCES = ["富途", "格隆汇", "东方财富", "财联社", "华尔街见闻", "今日头条", "富途研报"]
+
+# 同类公告（标题相同、只有数字不同）在消息中的占比，检验数字校验能否把它们分开
+SIBLING_RATE = 0.05
+
+
+def fill(rng: random.Random, unit: str) -> str:
+    return unit.format(n=rng.randint(10, 5000), a=round(rng.uniform(0.5, 50), 2), r=rng.randint(3, 180),
+                       p=round(rng.uniform(5, 600), 1))
+
+
+def make_story(rng: random.Random) -> list:
+    """一条消息：公司 + 若干词，约一半带数字；返回片段列表，便于改写时增删"""
+    parts = [rng.choice(COMPANIES)] + rng.sample(WORDS, rng.randint(5, 9))
+    if rng.random() < 0.5:
+        parts.insert(rng.randint(2, len(parts)), fill(rng, rng.choice(UNITS)))
+    return parts
+
+
+def sibling(rng: random.Random, parts: list):
+    """同类公告：同样的措辞换一组数字；原标题没有数字时返回 None"""
+    if not any(numbers(p) for p in parts):
+        return None
+    return [fill(rng, rng.choice(UNITS)) if numbers(p) else p for p in parts]
+
+
+def rewrite(rng: random.Random, parts: list) -> str:
+    """同一消息的另一个数据源版本：可能加前缀/后缀、去掉主语、删掉或替换一个词"""
+    parts = list(parts)
+    prefix = rng.choice(PREFIXES).format(m=rng.randint(1, 12), d=rng.randint(1, 28), c=parts[0]) if rng.random() < 0.6 else ""
+    if prefix == parts[0] + "：":
+        parts = parts[1:]
+    if len(parts) > 5 and rng.random() < 0.4:
+        victim = rng.randrange(1, len(parts))
+        if not numbers(parts[victim]):
+            del parts[victim]
+    if rng.random() < 0.3:
+        victim = rng.randrange(1, len(parts))
+        if not numbers(parts[victim]):
+            parts[victim] = rng.choice(WORDS)
+    suffix = rng.choice(SUFFIXES) if rng.random() < 0.4 else ""
+    return prefix + "".join(parts) + suffix
+
+
+def corpus(rows: int, rng: random.Random):
+    """返回 (条目列表, 每条所属真实消息编号)"""
+    items, labels = [], []
+    story_id = 0
+    previous = None
+    while len(items) < rows:
+        parts = None
+        if previous is not None and rng.random() < SIBLING_RATE:
+            parts = sibling(rng, previous)
+        parts = parts or make_story(rng)
+        previous = parts
+        for n, source in enumerate(rng.sample(SOURCES, rng.randint(1, 4))):
+            if len(items) >= rows:
+                break
+            text = "".join(parts) if n == 0 else rewrite(rng, parts)
+            items.append({"title": text, "source": source, "url": f"https://example.com/{len(items)}"})
+            labels.append(story_id)
+        story_id += 1
+    order = list(range(len(items)))
+    rng.shuffle(order)
+    return [items[i] for i in order], [labels[i] for i in order]
+
+
+def pair_count(counter: Counter) -> int:
+    return sum(v * (v - 1) // 2 for v in counter.values())
+
+
+def pairwise_quality(labels: list, clusters: list):
+    """成对精确率 / 召回率：同簇且真实同一消息的条目对占比"""
+    true_pairs = pair_count(Counter(labels))
+    found_pairs = pair_count(Counter(clusters))
+    both = pair_count(Counter(zip(labels, clusters)))
+    precision = both / found_pairs if found_pairs else 1.0
+    recall = both / true_pairs if true_pairs else 1.0
+    return precision, recall
+
+
+def naive(items: list, threshold: float) -> int:
+    """两两全比较（与 LSH 路径相同的判定条件），返回比较次数"""
+    grams = [set(tokenize(i["title"])) for i in items]
+    nums = [numbers(i["title"]) for i in items]
+    comparisons = 0
+    for a in range(len(items)):
+        for b in range(a):
+            comparisons += 1
+            inter = len(grams[a] & grams[b])
+            union = len(grams[a]) + len(grams[b]) - inter
+            if union and inter / union >= threshold:
+                short, long_ = (nums[a], nums[b]) if len(grams[a]) <= len(grams[b]) else (nums[b], nums[a])
+                if short <= long_:
+                    break
+    return comparisons
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    sample = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    rng = random.Random(7)
+    items, labels = corpus(rows, rng)
+    print(f"📄 条目: {len(items)} | 真实消息数: {len(set(labels))} | 阈值: {DEFAULT_THRESHOLD}")
+
+    start = time.perf_counter()
+    merged, info = merge_duplicates(items)
+    elapsed = time.perf_counter() - start
+    print(f"⚡ LSH 去重: {elapsed:.2f}s ({len(items) / elapsed:,.0f} 条/秒) | 输出 {info['output_count']} 条，合并 {info['merged']} 条")
+
+    deduper = Deduper()
+    clusters = [deduper.add(i["title"]) for i in items]
+    precision, recall = pairwise_quality(labels, clusters)
+    print(f"🔍 精确比较: {deduper.comparisons:,} 次 | 精确率 {precision:.3f} | 召回率 {recall:.3f}")
+
+    start = time.perf_counter()
+    comparisons = naive(items[:sample], DEFAULT_THRESHOLD)
+    naive_elapsed = time.perf_counter() - start
+    scale = (len(items) / sample) ** 2
+    print(f"🐢 两两比较（{sample} 条实测）: {naive_elapsed:.2f}s，{comparisons:,} 次"
+          f" | 外推到 {len(items)} 条约 {naive_elapsed * scale:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+记忆库基准测试
+在临时目录生成 N 条中文记忆（默认 100 万），分别测量：
+  - add_many 批量写入吞吐
+  - 旧查询（每次新建连接 + LIKE '%q%' 全表扫描，返回全部命中）
+  - 新查询（复用连接 + FTS5 两字词索引，分页取第一页）
+  - 按 entity_id 过滤的查询
+
+用法: python bench/bench_memori.py [条数] [批大小]
+示例: python bench/bench_memori.py 1000000 10000
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memori import Memori
+
+WORDS = (
+    "小米 汽车 回购 财报 营收 腾讯 阿里 港股 新能源 芯片 交付 发布 增长 下跌 上涨 机构 评级 "
+    "目标价 分红 合作 用户 偏好 项目 部署 接口 数据库 索引 缓存 服务器 日志 配置 版本 测试 上线"
+).split()
+
+QUERIES = ["回购", "小米汽车", "目标价", "数据库 索引", "上线"]
+
+
+def make_content(rng: random.Random, i: int) -> str:
+    return "".join(rng.choice(WORDS) for _ in range(rng.randint(6, 16))) + f" #{i}"
+
+
+def legacy_search(db_path: str, query: str) -> int:
+    """旧实现：每次 connect，LIKE 全表扫描并取回全部命中"""
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute(
+            "SELECT content, created_at FROM memory WHERE content LIKE ? ORDER BY created_at DESC",
+            (f"%{query}%",),
+        ).fetchall()
+    return len(rows)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    rng = random.Random(42)
+
+    db_path = os.path.join(tempfile.mkdtemp(), "memory.db")
+    mem = Memori(db_path=db_path)
+    print(f"📄 数据库: {db_path} | 条数: {rows} | 批大小: {batch}")
+
+    start = time.perf_counter()
+    for offset in range(0, rows, batch):
+        # 轮换归属，用于测试按 entity 过滤
+        mem.attribution(entity_id=f"User{offset // batch % 10}", process_id="Bench")
+        mem.add_many([make_content(rng, i) for i in range(offset, min(offset + batch, rows))])
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(db_path) / 1024 / 1024
+    print(f"✍️ 写入: {elapsed:.1f}s ({rows / elapsed:,.0f} 条/秒) | 库大小: {size_mb:.0f} MB")
+
+    print(f"\n{'查询':<10}{'命中':>10}{'旧(ms)':>12}{'新(ms)':>10}{'过滤(ms)':>12}")
+    for q in QUERIES:
+        legacy_ms, hits = timed(legacy_search, db_path, q)
+        new_ms, (_, total) = timed(mem.find, q, limit=20)
+        filtered_ms, _ = timed(mem.find, q, entity_id="User3", limit=20)
+        print(f"{q:<10}{total:>10}{legacy_ms:>12.1f}{new_ms:>10.1f}{filtered_ms:>12.1f}")
+
+    deep_ms, _ = timed(mem.find, "回购", limit=20, offset=10_000)
+    print(f"\n📖 深分页（offset=10000）: {deep_ms:.1f} ms")
+    mem.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+各爬虫分阶段基准测试（离线）
+起 bench/fixture_server.py，设置 SCRAPER_BASE_URL 让每个爬虫对夹具页面跑完整的浏览器流程，
+按 scrapers/phases.py 的阶段（启动、打开、搜索、切标签、滚动/翻页、提取、序列化）
+记录每轮耗时，多轮取中位数；直连路径（富途新闻 / 研报）单独计一项；
+有常驻会话的爬虫另计 <数据源>.session：会话先用另一个关键词搜过一次，只计换关键词后的这一次。
+
+用法:
+    python bench/bench_scrapers.py run [轮数] [数据源,...]     运行并打印结果
+    python bench/bench_scrapers.py baseline [轮数]             运行并保存为基线 bench/baselines/scrapers.json
+    python bench/bench_scrapers.py compare [阈值]              运行并与基线比较，任一阶段变慢超过阈值（默认 0.2）退出码为 1
+    python bench/bench_scrapers.py import <调试快照.zip> [站点]  把快照里最后一个页面存为 bench/fixtures/<站点>.html
+
+基线与机器相关，换机器后先重新生成基线再比较。
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import zipfile
+import platform
+import tempfile
+import statistics
+from contextlib import redirect_stdout
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# 基准运行不读写正式的学习状态（接口地址、选择器缓存），也不落调试快照；须在导入爬虫之前设置
+_STATE_DIR = tempfile.mkdtemp(prefix="bench_scrapers_")
+os.environ["FUTU_ENDPOINT_FILE"] = os.path.join(_STATE_DIR, "futu_search_endpoint.json")
+os.environ["SELECTOR_CACHE_FILE"] = os.path.join(_STATE_DIR, "selector_cache.json")
+os.environ["DEBUG_CAPTURE"] = "off"
+
+from fixture_server import FIXTURE_DIR, FixtureServer
+from scrapers import phases
+from scrapers.registry import GROUPS, load_all
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+BASELINE_FILE = os.path.join(BASELINE_DIR, "scrapers.json")
+
+KEYWORD = "小米集团"
+# 常驻会话每轮先搜这个词（不计时），再计时搜 KEYWORD，模拟连续查不同关键词
+SWITCH_KEYWORD = "腾讯控股"
+LIMIT = 20
+DEFAULT_ROUNDS = 3
+DEFAULT_THRESHOLD = 0.2
+# 绝对差小于这个值（秒）的变慢视为噪声，避免毫秒级阶段误报
+NOISE_FLOOR = 0.05
+
+
+def targets(only=None) -> list:
+    """[(名称, 函数, 是否需要浏览器, 会话工厂)]：每个爬虫的浏览器流程，
+    加上有直连路径的 <数据源>.direct、有常驻会话的 <数据源>.session，
+    以及组采集 <组>.group / <组>.group.session（只搜索一次采集组内全部数据源）"""
+    out = []
+    for key, spec in load_all().items():
+        if only and key not in only:
+            continue
+        out.append((key, spec["func"], True, None))
+        if spec["direct"]:
+            out.append((f"{key}.direct", spec["direct"], False, None))
+        if spec["session"]:
+            out.append((f"{key}.session", spec["func"], True, spec["session"]))
+    for key, spec in GROUPS.items():
+        if only and not set(spec["sources"]) & set(only):
+            continue
+        out.append((f"{key}.group", spec["func"], True, None))
+        if spec["session"]:
+            out.append((f"{key}.group.session", spec["func"], True, spec["session"]))
+    return out
+
+
+def run_once(pw, fn, browser_needed: bool, session=None) -> dict:
+    """跑一轮，返回 {total, phases, counts, items}；session 为已预热的常驻会话"""
+    from scrapers.browser_pool import LAUNCH_ARGS, new_context
+
+    browser = None
+    with phases.collect() as record, redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        try:
+            if session is not None:
+                items = fn(KEYWORD, LIMIT, session=session)
+            elif browser_needed:
+                with phases.phase("launch"):
+                    browser = pw.chromium.launch(headless=True, args=LAUNCH_ARGS)
+                    context = new_context(browser)
+                items = fn(KEYWORD, LIMIT, context=context)
+            else:
+                items = fn(KEYWORD, LIMIT)
+            with phases.phase("serialize"):
+                json.dumps(items, ensure_ascii=False, default=str)
+        finally:
+            if browser is not None:
+                browser.close()
+        total = time.perf_counter() - start
+    # 组采集返回 {数据源: 列表}，条目数取合计
+    count = sum(map(len, items.values())) if isinstance(items, dict) else len(items)
+    return {"total": total, "phases": record.totals(), "counts": record.counts(), "items": count}
+
+
+def run_session(pw, fn, factory, rounds: int) -> list:
+    """同一个常驻会话跑多轮，每轮先切到 SWITCH_KEYWORD（不计时）再计时搜 KEYWORD"""
+    from scrapers.browser_pool import LAUNCH_ARGS
+
+    browser = pw.chromium.launch(headless=True, args=LAUNCH_ARGS)
+    try:
+        session = factory(browser)
+        results = []
+        for _ in range(rounds):
+            with redirect_stdout(io.StringIO()):
+                fn(SWITCH_KEYWORD, LIMIT, session=session)
+            results.append(run_once(pw, fn, True, session))
+        session.close()
+        return results
+    finally:
+        browser.close()
+
+
+def summarize(rounds: list) -> dict:
+    """多轮取中位数（某轮没出现的阶段按 0 计）"""
+    names = [p for p in phases.PHASES if any(p in r["phases"] for r in rounds)]
+    return {
+        "rounds": len(rounds),
+        "total": round(statistics.median(r["total"] for r in rounds), 4),
+        "items": statistics.median(r["items"] for r in rounds),
+        "phases": {p: round(statistics.median(r["phases"].get(p, 0.0) for r in rounds), 4) for p in names},
+        "counts": {p: statistics.median(r["counts"].get(p, 0) for r in rounds) for p in names},
+    }
+
+
+def run(rounds: int = DEFAULT_ROUNDS, only=None) -> dict:
+    server = FixtureServer().start()
+    os.environ["SCRAPER_BASE_URL"] = server.base_url
+    os.environ["FUTU_SEARCH_API"] = server.base_url + "/futu/search-api?keyword={keyword}&page={page}"
+    fixtures = sorted(f[:-5] for f in os.listdir(FIXTURE_DIR) if f.endswith(".html")) if os.path.isdir(FIXTURE_DIR) else []
+
+    print(f"{'=' * 60}")
+    print(f"🧪 爬虫分阶段基准 | 夹具: {server.base_url} | 轮数: {rounds} | 关键词: {KEYWORD}")
+    if fixtures:
+        print(f"   使用导入的真实页面: {', '.join(fixtures)}")
+    print(f"{'=' * 60}")
+
+    from playwright.sync_api import sync_playwright
+
+    results = {}
+    try:
+        with sync_playwright() as pw:
+            for name, fn, browser_needed, factory in targets(only):
+                if factory is not None:
+                    rounds_data = run_session(pw, fn, factory, rounds)
+                else:
+                    rounds_data = [run_once(pw, fn, browser_needed) for _ in range(rounds)]
+                results[name] = summarize(rounds_data)
+                print_target(name, results[name])
+    finally:
+        server.stop()
+
+    return {
+        "meta": {
+            "keyword": KEYWORD,
+            "limit": LIMIT,
+            "rounds": rounds,
+            "fixtures": fixtures,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "machine": f"{platform.system()} {platform.machine()} / Python {platform.python_version()}",
+        },
+        "targets": results,
+    }
+
+
+def print_target(name: str, result: dict):
+    parts = " | ".join(f"{p} {v * 1000:.0f}ms×{result['counts'][p]:g}" for p, v in result["phases"].items())
+    print(f"  {name:<18} {result['total']:6.2f}s  {result['items']:>4g} 条  {parts}")
+
+
+def save(report: dict, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """返回 [(目标, 指标, 基线秒, 当前秒)]：当前比基线慢 threshold 以上且绝对差超过 NOISE_FLOOR 的项；
+    条数变少也算回退（提取不到内容时耗时反而会变短）"""
+    regressions = []
+    for name, base in baseline["targets"].items():
+        cur = current["targets"].get(name)
+        if cur is None:
+            continue
+        pairs = [("total", base["total"], cur["total"])]
+        pairs += [(p, v, cur["phases"].get(p, 0.0)) for p, v in base["phases"].items()]
+        for metric, b, c in pairs:
+            if c > b * (1 + threshold) and c - b > NOISE_FLOOR:
+                regressions.append((name, metric, b, c))
+        if cur["items"] < base["items"]:
+            regressions.append((name, "items", base["items"], cur["items"]))
+    return regressions
+
+
+def import_fixture(zip_path: str, site: str = None) -> str:
+    """调试快照（scrapers/debug_capture.py 生成的 zip）里编号最大的 HTML 存为 bench/fixtures/<站点>.html"""
+    with zipfile.ZipFile(zip_path) as zf:
+        meta = json.loads(zf.read("meta.json"))
+        pages = sorted(n for n in zf.namelist() if n.endswith(".html"))
+        if not pages:
+            raise ValueError("快照里没有 HTML 页面")
+        html = zf.read(pages[-1]).decode("utf-8", errors="replace")
+    site = site or meta["source"]
+    path = os.path.join(FIXTURE_DIR, f"{site}.html")
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return path
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("run", "baseline", "compare", "import"):
+        print(__doc__)
+        sys.exit(1)
+    command, args = sys.argv[1], sys.argv[2:]
+
+    if command == "import":
+        if not args:
+            print("用法: python bench/bench_scrapers.py import <调试快照.zip> [站点]")
+            sys.exit(1)
+        path = import_fixture(args[0], args[1] if len(args) > 1 else None)
+        print(f"📄 已导入: {path}")
+        return
+
+    if command == "run":
+        rounds = int(args[0]) if args else DEFAULT_ROUNDS
+        only = set(args[1].split(",")) if len(args) > 1 else None
+        run(rounds, only)
+        return
+
+    if command == "baseline":
+        report = run(int(args[0]) if args else DEFAULT_ROUNDS)
+        save(report, BASELINE_FILE)
+        print(f"💾 基线已保存: {BASELINE_FILE}")
+        return
+
+    threshold = float(args[0]) if args else DEFAULT_THRESHOLD
+    if not os.path.exists(BASELINE_FILE):
+        print("⚠️ 没有基线，先运行: python bench/bench_scrapers.py baseline")
+        sys.exit(1)
+    with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    report = run(baseline["meta"]["rounds"])
+    regressions = compare(report, baseline, threshold)
+    print(f"\n{'=' * 60}")
+    if not regressions:
+        print(f"✅ 无回退（阈值 {threshold:.0%}，基线 {baseline['meta']['created']}）")
+        return
+    for name, metric, b, c in regressions:
+        if metric == "items":
+            print(f"❌ {name} 条数 {b:g} → {c:g}")
+        else:
+            print(f"❌ {name} {metric} {b * 1000:.0f}ms → {c * 1000:.0f}ms (+{(c / b - 1) if b else 1:.0%})")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
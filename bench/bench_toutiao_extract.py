@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+今日头条 DOM 提取基准测试
+在浏览器中载入保存的搜索结果页 HTML（或生成的仿真页面），
+对比逐卡片 locator 提取（旧逻辑）与单次 evaluate 提取的耗时，并校验两者结果一致
+
+用法: python bench/bench_toutiao_extract.py [HTML文件] [--cards N] [--rounds N]
+示例: python bench/bench_toutiao_extract.py output/toutiao_search.html --rounds 5
+      python bench/bench_toutiao_extract.py --cards 30
+保存页面: 在抓取过程中执行 open(path, 'w').write(page.content())
+"""
+
+import os
+import re
+import sys
+import time
+import tempfile
+from datetime import datetime
+
+# 基准测试不写入正式的选择器缓存
+os.environ.setdefault("SELECTOR_CACHE_FILE", os.path.join(tempfile.mkdtemp(), "selector_cache.json"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.sync_api import sync_playwright
+
+from scrapers.browser_pool import LAUNCH_ARGS
+from scrapers.toutiao_scraper import (
+    CARD_SELECTORS, TITLE_SELECTORS, SOURCE_SELECTOR, TIME_PATTERNS,
+    extract_news_from_dom, normalize_url, parse_time,
+)
+
+
+def extract_legacy(page) -> list:
+    """旧逻辑：逐卡片、逐选择器的 locator 调用（每次都是一次驱动往返）"""
+    news = []
+    for selector in CARD_SELECTORS:
+        try:
+            cards = page.locator(selector).all()
+            if len(cards) <= 2:
+                continue
+            for card in cards:
+                try:
+                    title = ""
+                    for ts in TITLE_SELECTORS:
+                        try:
+                            title_elem = card.locator(ts).first
+                            if title_elem.count() > 0:
+                                t = title_elem.inner_text().strip()
+                                if len(t) > 20:
+                                    title = t
+                                    break
+                        except:
+                            continue
+                    if not title or len(title) < 15:
+                        continue
+
+                    url = ""
+                    link = card.locator('a').first
+                    if link.count() > 0:
+                        url = normalize_url(link.get_attribute('href') or "")
+
+                    source = ""
+                    source_elem = card.locator(SOURCE_SELECTOR).first
+                    if source_elem.count() > 0:
+                        source = source_elem.inner_text().strip()[:50]
+
+                    time_text = ""
+                    time_obj = datetime(2000, 1, 1)
+                    card_text = card.inner_text()
+                    for pattern in TIME_PATTERNS:
+                        match = re.search(pattern, card_text)
+                        if match:
+                            time_text = match.group()
+                            time_obj = parse_time(time_text)
+                            break
+
+                    news.append({
+                        'title': title,
+                        'url': url,
+                        'source': source,
+                        'time': time_obj,
+                        'time_text': time_text,
+                    })
+                except Exception:
+                    continue
+            if news:
+                break
+        except:
+            continue
+    return news
+
+
+def synthetic_html(cards: int) -> str:
+    """仿头条搜索结果结构：result-content 卡片，含标题链接、来源、相对时间"""
+    times = ['5分钟前', '3小时前', '2天前', '昨天', '10月12日', '2023年5月1日']
+    rows = []
+    for i in range(cards):
+        rows.append(
+            f'<div class="result-content"><div class="cs-view">'
+            f'<a class="text-ellipsis" href="/article/{7300000000000000000 + i}/">'
+            f'小米集团发布第{i}季度财报，营收同比增长显著超出市场预期并上调全年指引</a>'
+            f'<div class="cs-source"><span class="text-ellipsis">财经媒体{i % 7}</span>'
+            f'<span>{times[i % len(times)]}</span></div>'
+            f'<p>摘要内容 {i}：公司表示将继续加大研发投入，推进高端化战略。</p>'
+            f'</div></div>'
+        )
+    return f"<html><body><div class='s-result-list'>{''.join(rows)}</div></body></html>"
+
+
+def timed(fn, page, rounds: int):
+    best = None
+    result = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn(page)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    args = sys.argv[1:]
+    cards, rounds = 30, 3
+    if '--cards' in args:
+        i = args.index('--cards')
+        cards = int(args[i + 1])
+        del args[i:i + 2]
+    if '--rounds' in args:
+        i = args.index('--rounds')
+        rounds = int(args[i + 1])
+        del args[i:i + 2]
+
+    if args:
+        with open(args[0], encoding='utf-8') as f:
+            html = f.read()
+        label = args[0]
+    else:
+        html = synthetic_html(cards)
+        label = f"仿真页面 ({cards} 张卡片)"
+
+    print(f"📄 页面: {label} | 轮数: {rounds}")
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=LAUNCH_ARGS)
+        page = browser.new_page()
+        page.set_content(html)
+
+        legacy_t, legacy = timed(extract_legacy, page, rounds)
+        batched_t, batched = timed(extract_news_from_dom, page, rounds)
+        browser.close()
+
+    strip = lambda items: [(n['title'], n['url'], n['source'], n['time_text']) for n in items]
+    same = strip(legacy) == strip(batched)
+
+    print(f"\n{'=' * 50}")
+    print(f"旧逻辑 (逐卡片 locator): {legacy_t * 1000:8.1f} ms  {len(legacy)} 条")
+    print(f"新逻辑 (单次 evaluate) : {batched_t * 1000:8.1f} ms  {len(batched)} 条")
+    if batched_t:
+        print(f"加速比: {legacy_t / batched_t:.1f}x")
+    print(f"结果一致: {'✅' if same else '❌'}")
+    print("=" * 50)
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+华尔街见闻快讯提取基准测试
+在浏览器中载入保存的快讯搜索页 HTML（或生成的仿真页面，相当于点击 5 次"加载更多"后的规模），
+对比逐条 locator 提取（旧逻辑）与单次 evaluate + 批量解析时间的耗时，并校验两者结果一致
+
+用法: python bench/bench_wallstreet_extract.py [HTML文件] [--items N] [--rounds N]
+示例: python bench/bench_wallstreet_extract.py --items 120
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.sync_api import sync_playwright
+
+from scrapers.browser_pool import LAUNCH_ARGS
+from scrapers.wallstreet_scraper import extract_live_items
+
+
+def extract_legacy(page) -> list:
+    """旧逻辑：每条快讯 3 个 locator，各自 count() + get_attribute()/inner_text()"""
+    news = []
+    for item in page.locator('div.live-item').all():
+        try:
+            time_elem = item.locator('time.live-item_created')
+            if time_elem.count() == 0:
+                continue
+            datetime_attr = time_elem.get_attribute('datetime')
+            if not datetime_attr:
+                continue
+            time_obj = datetime.strptime(datetime_attr[:19], '%Y-%m-%dT%H:%M:%S')
+
+            title = ""
+            title_elem = item.locator('div.live-item_title')
+            if title_elem.count() > 0:
+                title = title_elem.inner_text().strip()
+
+            content = ""
+            content_elem = item.locator('div.live-item_html')
+            if content_elem.count() > 0:
+                content = content_elem.inner_text().strip()
+
+            full_text = title
+            if content:
+                full_text = title + "\n" + content if title else content
+            if len(full_text) < 10:
+                continue
+
+            news.append({
+                'title': title,
+                'content': content,
+                'full_text': full_text[:500],
+                'time': time_obj,
+            })
+        except Exception:
+            continue
+    return news
+
+
+def synthetic_html(items: int) -> str:
+    """仿快讯列表结构：time[datetime] + 标题 + 正文，部分条目无标题"""
+    base = datetime(2026, 1, 16, 18, 58, 31)
+    rows = []
+    for i in range(items):
+        ts = (base - timedelta(minutes=7 * i)).strftime('%Y-%m-%dT%H:%M:%S') + '.000+08:00'
+        title = f'<div class="live-item_title">小米集团第{i}条快讯标题</div>' if i % 3 else ''
+        rows.append(
+            f'<div class="live-item"><time class="live-item_created" datetime="{ts}">18:58</time>'
+            f'{title}<div class="live-item_html"><p>【快讯】小米集团港股盘中涨超{i % 9}%，'
+            f'成交额突破{i + 10}亿港元，市场关注其汽车业务交付进展。</p></div></div>'
+        )
+    return f"<html><body><div class='live-list'>{''.join(rows)}</div></body></html>"
+
+
+def timed(fn, page, rounds: int):
+    best = None
+    result = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn(page)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    args = sys.argv[1:]
+    items, rounds = 120, 3
+    if '--items' in args:
+        i = args.index('--items')
+        items = int(args[i + 1])
+        del args[i:i + 2]
+    if '--rounds' in args:
+        i = args.index('--rounds')
+        rounds = int(args[i + 1])
+        del args[i:i + 2]
+
+    if args:
+        with open(args[0], encoding='utf-8') as f:
+            html = f.read()
+        label = args[0]
+    else:
+        html = synthetic_html(items)
+        label = f"仿真页面 ({items} 条快讯)"
+
+    print(f"📄 页面: {label} | 轮数: {rounds}")
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=LAUNCH_ARGS)
+        page = browser.new_page()
+        page.set_content(html)
+        found = page.locator('div.live-item').count()
+
+        legacy_t, legacy = timed(extract_legacy, page, rounds)
+        batched_t, batched = timed(extract_live_items, page, rounds)
+        browser.close()
+
+    same = legacy == batched
+
+    print(f"\n{'=' * 50}")
+    # 旧逻辑每条 6 次驱动往返（3×count + get_attribute + 2×inner_text），另加一次 locator.all
+    print(f"旧逻辑 (逐条 locator)  : {legacy_t * 1000:8.1f} ms  {len(legacy)} 条  ~{1 + found * 6} 次往返")
+    print(f"新逻辑 (单次 evaluate) : {batched_t * 1000:8.1f} ms  {len(batched)} 条  1 次往返")
+    if batched_t:
+        print(f"加速比: {legacy_t / batched_t:.1f}x")
+    print(f"结果一致: {'✅' if same else '❌'}")
+    print("=" * 50)
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
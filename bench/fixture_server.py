@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+离线夹具服务器
+按各爬虫依赖的 DOM 结构生成确定性的搜索页（标题含关键词、带时间），
+配合 SCRAPER_BASE_URL 让爬虫在没有外网的情况下跑完整的浏览器流程：
+
+    /toutiao/search       资讯标签 + div.result-content 卡片，页码链接切换结果
+    /cls/searchPage       div.search-telegram-wrap 下的电报条目
+    /wallstreet/search    div.live-item 快讯，"加载更多"追加
+    /futu/main/live       搜索框 → /futu/search-api 响应 → 资讯/新闻/研报标签 → 可滚动的结果面板
+    /futu/search-api      与 futu_api_dump.json 同结构的分页 JSON（也供直连路径使用）
+    /gelonghui/search     a[href*="/news/"] 链接，滚动到底追加
+    /eastmoney/news/s     .news_item 条目，页码链接切换结果
+
+bench/fixtures/<站点>.html 存在时（bench_scrapers.py import 从调试快照导出），
+该站点的搜索页改为返回这份真实页面（去掉脚本，只用于测量提取）。
+
+可按站点注入延迟、慢响应、超时和 HTTP 错误（见 Faults），供 bench/load_test.py 压测使用。
+
+用法: python bench/fixture_server.py [端口] [故障规则]
+示例: python bench/fixture_server.py 8765 "*:delay=0.2;futu:error=0.1;cls:timeout=0.05"
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import threading
+from collections import Counter
+from html import escape
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# 每页 / 每次追加的条目数，以及每个站点最多生成的条目数
+PAGE_SIZE = 10
+MAX_ITEMS = 60
+
+# 生成的条目时间从这里往前排
+BASE_TIME = datetime(2026, 1, 16, 18, 58, 31)
+
+EVENTS = [
+    "回购2.19亿港元，年内累计回购14.60亿港元", "获南向资金净买入9.05亿港元", "发布季度业绩，营收同比增长22%",
+    "新品发布会定档，市场关注交付节奏", "股价盘中拉升逾4%，成交额放大", "获多家机构上调目标价",
+    "公告董事会变动，任命新任首席财务官", "与合作伙伴签署战略合作协议", "月度交付量创历史新高",
+    "被纳入恒生科技指数成分股", "研发投入持续加大，专利数量领先", "海外市场拓展提速，东南亚收入翻倍",
+]
+DETAILS = [
+    "分析师认为短期估值仍有修复空间", "公司表示将继续执行回购计划", "多家券商维持买入评级",
+    "市场人士称资金面边际改善", "管理层在业绩会上给出全年指引", "相关板块同步走强",
+]
+ORGS = ["中金公司", "华泰证券", "摩根士丹利", "高盛", "中信证券", "招商证券"]
+RATINGS = ["买入", "增持", "持有", "跑赢行业"]
+
+SEARCH_PAGES = {
+    "toutiao": "/toutiao/search",
+    "cls": "/cls/searchPage",
+    "wallstreet": "/wallstreet/search",
+    "futu": "/futu/main/live",
+    "gelonghui": "/gelonghui/search",
+    "eastmoney": "/eastmoney/news/s",
+}
+
+_SCRIPT_RE = re.compile(r"<script\b.*?</script>", re.S | re.I)
+
+
+def headlines(keyword: str, site: str, count: int = MAX_ITEMS) -> list:
+    """确定性地生成 count 条 {title, detail, time}，标题前 10 个字符内带序号，保证去重键互不相同"""
+    rng = random.Random(f"{site}:{keyword}")
+    items = []
+    for i in range(count):
+        items.append({
+            "title": f"【{i + 1:03d}】{keyword}{rng.choice(EVENTS)}",
+            "detail": f"{keyword}{rng.choice(DETAILS)}，{rng.choice(DETAILS)}。",
+            "time": BASE_TIME - timedelta(minutes=7 * i + rng.randint(0, 5)),
+        })
+    return items
+
+
+def search_api(keyword: str, page: int) -> dict:
+    """与 futu_api_dump.json 同结构：data.news / report / notice，标题用 <em> 标出关键词"""
+    data = {}
+    for kind, prefix in (("news", "post"), ("report", "report"), ("notice", "notice")):
+        rows = headlines(keyword, f"futu_{kind}")[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+        data[kind] = [
+            {
+                "title": r["title"].replace(keyword, f"<em>{keyword}</em>"),
+                "timestamp": int(r["time"].timestamp()),
+                "url": f"/futu/{prefix}/{page * 100 + n}",
+                "newsUniqueId": f"{prefix}:{page * 100 + n}",
+                "orgName": ORGS[n % len(ORGS)] if kind == "report" else "",
+                "rating": RATINGS[n % len(RATINGS)] if kind == "report" else "",
+            }
+            for n, r in enumerate(rows)
+        ]
+    return {"code": 0, "message": "成功", "data": data}
+
+
+def _embed(value) -> str:
+    """嵌入 <script> 的 JSON"""
+    return json.dumps(value, ensure_ascii=False).replace("</", "<\\/")
+
+
+def _page(title: str, body: str, script: str = "", style: str = "") -> str:
+    return (
+        "<!doctype html><html><head><meta charset=\"utf-8\">"
+        f"<title>{escape(title)}</title><style>body{{font-family:sans-serif}}{style}</style></head>"
+        f"<body>{body}<script>{script}</script></body></html>"
+    )
+
+
+def toutiao_page(keyword: str) -> str:
+    """综合页首条为推荐卡片，点"资讯"后换成新闻结果；页码 2..5 整体替换结果"""
+    rows = [
+        {"title": r["title"] + "，" + r["detail"], "source": "财经头条",
+         "ago": f"{i // 3 + 1}小时前", "href": f"/toutiao/a/{i}"}
+        for i, r in enumerate(headlines(keyword, "toutiao", PAGE_SIZE * 5))
+    ]
+    pager = "".join(f'<a href="javascript:void(0)" onclick="show({n})">{n}</a> ' for n in range(1, 6))
+    body = (
+        '<div class="tabs"><span onclick="show(1)">资讯</span> <span>综合</span> <span>视频</span></div>'
+        '<div id="results"><div class="result-content"><a href="/toutiao/topic">'
+        f'{escape(keyword)} 综合推荐：相关话题、股票行情与热门讨论汇总</a></div></div>'
+        f'<div class="pager">{pager}</div>'
+    )
+    script = f"""
+var ROWS = {_embed(rows)};
+function esc(s) {{ var d = document.createElement('div'); d.textContent = s; return d.innerHTML; }}
+function show(n) {{
+    var html = '';
+    ROWS.slice((n - 1) * {PAGE_SIZE}, n * {PAGE_SIZE}).forEach(function(r) {{
+        html += '<div class="result-content"><a href="' + r.href + '">' + esc(r.title) + '</a>'
+              + '<div><span class="source">' + esc(r.source) + '</span> <span>' + r.ago + '</span></div></div>';
+    }});
+    setTimeout(function() {{ document.getElementById('results').innerHTML = html; }}, 30);
+}}"""
+    return _page(f"{keyword} - 头条搜索", body, script)
+
+
+def cls_page(keyword: str) -> str:
+    entries = "".join(
+        f'<div class="telegram-item">{r["time"]:%Y-%m-%d %H:%M} 星期五 '
+        f'【{escape(r["title"])}】财联社{r["time"].month}月{r["time"].day}日电，{escape(r["detail"])}</div>'
+        for r in headlines(keyword, "cls", 30)
+    )
+    return _page(f"{keyword} - 财联社搜索", f'<div class="search-telegram-wrap">{entries}</div>')
+
+
+def wallstreet_page(keyword: str) -> str:
+    """首屏 PAGE_SIZE 条，每点一次"加载更多"追加一页，到 MAX_ITEMS 后按钮消失"""
+    rows = [
+        {"iso": r["time"].strftime("%Y-%m-%dT%H:%M:%S.000+08:00"), "title": r["title"], "html": r["detail"]}
+        for r in headlines(keyword, "wallstreet")
+    ]
+    body = '<div id="list"></div><button id="more" onclick="more()">加载更多</button>'
+    script = f"""
+var ROWS = {_embed(rows)}, shown = 0;
+function esc(s) {{ var d = document.createElement('div'); d.textContent = s; return d.innerHTML; }}
+function more() {{
+    setTimeout(function() {{
+        var list = document.getElementById('list');
+        ROWS.slice(shown, shown + {PAGE_SIZE}).forEach(function(r) {{
+            var el = document.createElement('div');
+            el.className = 'live-item';
+            el.innerHTML = '<time class="live-item_created" datetime="' + r.iso + '">' + r.iso.slice(11, 16) + '</time>'
+                         + '<div class="live-item_title">' + esc(r.title) + '</div>'
+                         + '<div class="live-item_html">' + esc(r.html) + '</div>';
+            list.appendChild(el);
+        }});
+        shown += {PAGE_SIZE};
+        if (shown >= ROWS.length) document.getElementById('more').remove();
+    }}, 50);
+}}
+more();"""
+    return _page(f"{keyword} - 华尔街见闻", body, script)
+
+
+def futu_page(keyword: str) -> str:
+    """输入关键词后请求 /futu/search-api 并显示标签；资讯 → 新闻/研报子标签 → 结果面板，面板滚到底再取下一页"""
+    body = (
+        '<input class="web_search-input" placeholder="搜索">'
+        '<ul id="tabs"></ul><ul id="subtabs"></ul>'
+        '<div class="web_search-res-panel" id="panel"></div>'
+    )
+    style = (
+        ".web_search-res-panel{height:400px;overflow-y:auto;display:none}"
+        ".web_search-res-panel a{display:block;height:60px}"
+    )
+    script = """
+var keyword = '', kind = 'news', page = 0, loading = false;
+function api(p) {
+    return fetch('/futu/search-api?keyword=' + encodeURIComponent(keyword) + '&page=' + p).then(function(r) { return r.json(); });
+}
+function render(data, append) {
+    var panel = document.getElementById('panel');
+    var html = '';
+    (data.data[kind] || []).forEach(function(item) {
+        html += '<a href="' + item.url + '">' + item.title.replace(/<\\/?em>/g, '') + '\\n' + item.timestamp + '</a>';
+    });
+    panel.innerHTML = append ? panel.innerHTML + html : html;
+    panel.style.display = 'block';
+}
+function openKind(k) {
+    kind = k; page = 1;
+    document.getElementById('panel').style.display = 'block';
+    api(1).then(function(data) { render(data, false); });
+}
+document.querySelector('input.web_search-input').addEventListener('input', function(e) {
+    keyword = e.target.value;
+    api(1).then(function() {
+        var tabs = document.getElementById('tabs');
+        tabs.innerHTML = '<li class="web_search-tab-li">综合</li><li class="web_search-tab-li">资讯</li><li class="web_search-tab-li">股票</li>';
+        tabs.children[1].addEventListener('click', function() {
+            setTimeout(function() {
+                var sub = document.getElementById('subtabs');
+                sub.innerHTML = '<li class="web_search-sec-tab-li">新闻</li><li class="web_search-sec-tab-li">研报</li><li class="web_search-sec-tab-li">公告</li>';
+                sub.children[0].addEventListener('click', function() { openKind('news'); });
+                sub.children[1].addEventListener('click', function() { openKind('report'); });
+                sub.children[2].addEventListener('click', function() { openKind('notice'); });
+            }, 30);
+        });
+    });
+});
+document.getElementById('panel').addEventListener('scroll', function(e) {
+    var panel = e.target;
+    if (loading || panel.scrollTop + panel.clientHeight < panel.scrollHeight - 50) return;
+    loading = true;
+    api(page + 1).then(function(data) {
+        page += 1;
+        render(data, true);
+        loading = false;
+    });
+});"""
+    return _page(f"{keyword} - 富途牛牛", body, script, style)
+
+
+def gelonghui_page(keyword: str) -> str:
+    """首屏 PAGE_SIZE 条，滚动到底部时追加一页"""
+    rows = [
+        {"title": r["title"], "meta": f"格隆汇{r['time'].month}月{r['time'].day}日丨{r['detail']}", "href": f"/gelonghui/news/{i}"}
+        for i, r in enumerate(headlines(keyword, "gelonghui"))
+    ]
+    body = '<div id="list"></div>'
+    style = ".news{display:block;height:180px}"
+    script = f"""
+var ROWS = {_embed(rows)}, shown = 0, loading = false;
+function esc(s) {{ var d = document.createElement('div'); d.textContent = s; return d.innerHTML; }}
+function more() {{
+    var list = document.getElementById('list');
+    ROWS.slice(shown, shown + {PAGE_SIZE}).forEach(function(r) {{
+        var el = document.createElement('a');
+        el.className = 'news';
+        el.href = r.href;
+        el.innerHTML = '<h3>' + esc(r.title) + '</h3><p>' + esc(r.meta) + '</p>';
+        list.appendChild(el);
+    }});
+    shown += {PAGE_SIZE};
+}}
+window.addEventListener('scroll', function() {{
+    if (loading || shown >= ROWS.length) return;
+    if (window.innerHeight + window.scrollY < document.body.scrollHeight - 200) return;
+    loading = true;
+    setTimeout(function() {{ more(); loading = false; }}, 50);
+}});
+more();"""
+    return _page(f"{keyword} - 格隆汇", body, script, style)
+
+
+def eastmoney_page(keyword: str) -> str:
+    """每页 PAGE_SIZE 条，页码链接整体替换"""
+    rows = [
+        {"title": r["title"], "time": f"{r['time']:%Y-%m-%d %H:%M:%S}", "summary": r["detail"],
+         "url": f"http://finance.eastmoney.com/a/2026011600{i:04d}.html"}
+        for i, r in enumerate(headlines(keyword, "eastmoney", PAGE_SIZE * 3))
+    ]
+    pager = "".join(f'<a href="javascript:void(0)" onclick="show({n})">{n}</a> ' for n in range(1, 4))
+    body = f'<div id="list"></div><div class="pager">{pager}</div>'
+    script = f"""
+var ROWS = {_embed(rows)};
+function esc(s) {{ var d = document.createElement('div'); d.textContent = s; return d.innerHTML; }}
+function show(n) {{
+    var html = '';
+    ROWS.slice((n - 1) * {PAGE_SIZE}, n * {PAGE_SIZE}).forEach(function(r) {{
+        html += '<div class="news_item"><div class="news_item_t"><a href="' + r.url + '">' + esc(r.title) + '</a></div>'
+              + '<div class="news_item_c"><span>' + r.time + '</span> - ' + esc(r.summary) + '</div>'
+              + '<div class="news_item_url">' + r.url + '</div></div>';
+    }});
+    document.getElementById('list').innerHTML = html;
+}}
+show(1);"""
+    return _page(f"{keyword} - 东方财富搜索", body, script)
+
+
+PAGE_BUILDERS = {
+    "toutiao": toutiao_page,
+    "cls": cls_page,
+    "wallstreet": wallstreet_page,
+    "futu": futu_page,
+    "gelonghui": gelonghui_page,
+    "eastmoney": eastmoney_page,
+}
+
+
+def saved_fixture(site: str):
+    """bench/fixtures/<站点>.html（去掉脚本），没有时返回 None"""
+    path = os.path.join(FIXTURE_DIR, f"{site}.html")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return _SCRIPT_RE.sub("", f.read())
+
+
+class Faults:
+    """
+    按站点注入故障，规则格式 "站点:键=值,键=值;站点:..."，站点写 * 表示所有站点（具体站点的键覆盖 *）：
+        delay=秒       每个响应固定延迟
+        jitter=秒      再加 0~jitter 秒的随机延迟
+        slow=概率      变成慢响应，额外等待 slow_delay 秒（默认 10）
+        timeout=概率   挂起 hang 秒（默认 90，超过爬虫 60 秒的页面超时）后断开连接，不返回响应
+        error=概率     返回 HTTP status（默认 500）
+    同一站点的页面、接口（/futu/search-api）都按该站点的规则注入。
+    """
+
+    DEFAULTS = {"delay": 0.0, "jitter": 0.0, "slow": 0.0, "slow_delay": 10.0,
+                "timeout": 0.0, "hang": 90.0, "error": 0.0, "status": 500}
+
+    def __init__(self, rules: dict = None, seed: int = None):
+        self.rules = rules or {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.injected = {}  # 站点 -> Counter(slow / timeout / error)
+
+    @classmethod
+    def parse(cls, spec: str, seed: int = None) -> "Faults":
+        rules = {}
+        for part in filter(None, (p.strip() for p in (spec or "").split(";"))):
+            site, _, body = part.partition(":")
+            rule = rules.setdefault(site.strip(), {})
+            for pair in filter(None, (p.strip() for p in body.split(","))):
+                key, _, value = pair.partition("=")
+                key = key.strip()
+                if key not in cls.DEFAULTS:
+                    raise ValueError(f"未知的故障参数: {key}")
+                rule[key] = type(cls.DEFAULTS[key])(float(value))
+        return cls(rules, seed)
+
+    def rule(self, site: str) -> dict:
+        return {**self.DEFAULTS, **self.rules.get("*", {}), **self.rules.get(site, {})}
+
+    def decide(self, site: str):
+        """返回 (延迟秒数, 动作)，动作为 None / "timeout" / "error"，并按站点计数"""
+        rule = self.rule(site)
+        with self._lock:
+            roll = self._rng.random()
+            delay = rule["delay"] + self._rng.uniform(0, rule["jitter"])
+            if self._rng.random() < rule["slow"]:
+                delay += rule["slow_delay"]
+                self._count(site, "slow")
+            action = None
+            if roll < rule["timeout"]:
+                action = "timeout"
+            elif roll < rule["timeout"] + rule["error"]:
+                action = "error"
+            if action:
+                self._count(site, action)
+        return delay, action
+
+    def _count(self, site: str, kind: str):
+        self.injected.setdefault(site, Counter())[kind] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {site: dict(c) for site, c in self.injected.items()}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """按路径分发到各站点的页面生成函数，其余路径 404；先按站点规则注入故障"""
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        keyword = (query.get("keyword") or query.get("q") or ["小米集团"])[0]
+        site = parts.path.split("/")[1] if parts.path.count("/") > 1 else ""
+        self.server.count(site)
+
+        delay, action = self.server.faults.decide(site)
+        if delay:
+            time.sleep(delay)
+        if action == "timeout":
+            time.sleep(self.server.faults.rule(site)["hang"])
+            self.close_connection = True
+            return
+        if action == "error":
+            return self._send("injected error", "text/plain", status=self.server.faults.rule(site)["status"])
+
+        if parts.path == "/futu/search-api":
+            page = int((query.get("page") or ["1"])[0])
+            return self._send(json.dumps(search_api(keyword, page), ensure_ascii=False), "application/json")
+
+        site = next((s for s, p in SEARCH_PAGES.items() if parts.path == p), None)
+        if site is None:
+            return self._send("not found", "text/plain", status=404)
+        html = saved_fixture(site)
+        if html is None:
+            html = PAGE_BUILDERS[site](keyword)
+        self._send(html, "text/html")
+
+    def _send(self, text: str, content_type: str, status: int = 200):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    def __init__(self, address, faults: Faults):
+        super().__init__(address, FixtureHandler)
+        self.faults = faults
+        self.hits = Counter()
+        self._hits_lock = threading.Lock()
+
+    def count(self, site: str):
+        with self._hits_lock:
+            self.hits[site] += 1
+
+
+class FixtureServer:
+    """在后台线程运行的夹具服务器：start() 后用 base_url 设置 SCRAPER_BASE_URL"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, faults: Faults = None):
+        self.httpd = _HTTPServer((host, port), faults or Faults())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def faults(self) -> Faults:
+        return self.httpd.faults
+
+    def stats(self) -> dict:
+        """各站点请求数与注入的故障数"""
+        with self.httpd._hits_lock:
+            hits = dict(self.httpd.hits)
+        return {"hits": hits, "injected": self.faults.snapshot()}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    faults = Faults.parse(sys.argv[2]) if len(sys.argv) > 2 else None
+    server = FixtureServer(port=port, faults=faults)
+    print(f"🧪 夹具服务器: {server.base_url}")
+    if faults and faults.rules:
+        print(f"   故障注入: {faults.rules}")
+    for site, path in SEARCH_PAGES.items():
+        print(f"   {site:<11} {server.base_url}{path}?keyword=小米集团")
+    print(f"   SCRAPER_BASE_URL={server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+API 服务端到端压测
+本地起夹具服务器（bench/fixture_server.py，可按站点注入延迟 / 慢响应 / 超时 / HTTP 错误），
+以子进程启动 app.py 并把所有站点指向夹具服务器，然后按固定到达率（开环，不等上一个请求返回）
+向 /api/v1/news 发请求，关键词按权重混合。
+
+报告：吞吐、延迟 p50/p95/p99（从计划发出时刻算起，排队也计入）、失败率、各数据源报错数、
+服务进程及其所有子进程（浏览器）的峰值 RSS、峰值浏览器数。结果写成 JSON，可用 compare 对比两次运行。
+
+用法:
+    python bench/load_test.py run --rate 2 --duration 60 --keywords 小米集团:3,腾讯控股:1 \\
+        --faults "*:delay=0.2,jitter=0.3;futu:error=0.1;cls:timeout=0.05" --out before.json
+    python bench/load_test.py run --app /path/to/other/checkout/app.py --out after.json
+    python bench/load_test.py run --url http://127.0.0.1:9527 --pid 12345   # 压已在运行的服务
+    python bench/load_test.py compare before.json after.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixture_server import Faults, FixtureServer
+from scrapers.browser_pool import descendant_pids, rss_bytes
+
+SAMPLE_INTERVAL = 0.5
+
+
+def parse_keywords(spec: str) -> list:
+    """"小米集团:3,腾讯控股:1" -> [(关键词, 权重)]"""
+    mix = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        keyword, _, weight = part.partition(":")
+        mix.append((keyword.strip(), float(weight or 1)))
+    return mix
+
+
+def percentile(values: list, p: float):
+    """最近秩百分位，values 为空时返回 None"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def browser_count(pids) -> int:
+    """Chromium 主进程数（渲染 / GPU 等子进程命令行带 --type=，不计）"""
+    count = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                args = f.read().split(b"\0")
+        except OSError:
+            continue
+        exe = os.path.basename(args[0]).decode("utf-8", errors="replace") if args and args[0] else ""
+        if ("chrom" in exe or "headless_shell" in exe) and not any(a.startswith(b"--type=") for a in args):
+            count += 1
+    return count
+
+
+class ResourceSampler:
+    """后台线程定期采样服务进程树的 RSS、进程数和浏览器数，记录峰值"""
+
+    def __init__(self, pid: int, interval: float = SAMPLE_INTERVAL):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_browsers = 0
+        self.peak_processes = 0
+        self.samples = []  # (相对秒数, rss_mb, 浏览器数)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="sampler", daemon=True)
+        self._start = time.time()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            pids = {self.pid} | descendant_pids(self.pid)
+            rss = rss_bytes(pids)
+            browsers = browser_count(pids)
+            self.peak_rss = max(self.peak_rss, rss)
+            self.peak_browsers = max(self.peak_browsers, browsers)
+            self.peak_processes = max(self.peak_processes, len(pids))
+            self.samples.append((round(time.time() - self._start, 1), round(rss / 1024 / 1024, 1), browsers))
+            self._stop.wait(self.interval)
+
+    def summary(self) -> dict:
+        return {
+            "peak_rss_mb": round(self.peak_rss / 1024 / 1024, 1),
+            "peak_browsers": self.peak_browsers,
+            "peak_processes": self.peak_processes,
+            "samples": self.samples,
+        }
+
+
+class AppServer:
+    """以子进程运行 app.py，状态文件放临时目录，所有站点指向夹具服务器"""
+
+    def __init__(self, app_path: str, fixture_url: str, port: int, extra_env: dict = None):
+        self.app_path = os.path.abspath(app_path)
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self.state_dir = tempfile.mkdtemp(prefix="load_test_")
+        self.log_path = os.path.join(self.state_dir, "server.log")
+        self.env = dict(
+            os.environ,
+            PORT=str(port),
+            PYTHONUNBUFFERED="1",
+            SCRAPER_BASE_URL=fixture_url,
+            FUTU_SEARCH_API=fixture_url + "/futu/search-api?keyword={keyword}&page={page}",
+            FUTU_ENDPOINT_FILE=os.path.join(self.state_dir, "futu_search_endpoint.json"),
+            SELECTOR_CACHE_FILE=os.path.join(self.state_dir, "selector_cache.json"),
+            WATERMARK_FILE=os.path.join(self.state_dir, "watermarks.json"),
+            NEWS_STORE_PATH=os.path.join(self.state_dir, "news.db"),
+            WATCHLIST="",
+            WATCHLIST_FILE=os.path.join(self.state_dir, "watchlist.json"),
+            DEBUG_CAPTURE_DIR=os.path.join(self.state_dir, "screenshots"),
+            BROWSER_PID_DIR=os.path.join(self.state_dir, "browsers"),
+            **(extra_env or {}),
+        )
+        self.process = None
+
+    def start(self, timeout: float = 90):
+        self._log = open(self.log_path, "w", encoding="utf-8")
+        self.process = subprocess.Popen(
+            [sys.executable, self.app_path],
+            cwd=os.path.dirname(self.app_path),
+            env=self.env,
+            stdout=self._log,
+            stderr=subprocess.STDOUT,
+        )
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"服务启动失败，日志: {self.log_path}")
+            try:
+                with urllib.request.urlopen(self.url + "/api/v1/health", timeout=2):
+                    return self
+            except (urllib.error.URLError, OSError):
+                time.sleep(0.5)
+        self.stop()
+        raise RuntimeError(f"服务 {timeout:.0f}s 内未就绪，日志: {self.log_path}")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        if self.process:
+            self._log.close()
+
+
+def send(url: str, keyword: str, limit: int, refresh: bool, timeout: float) -> dict:
+    """发一个请求，返回 {status, outcome, items, source_errors}"""
+    query = {"keyword": keyword, "limit": limit}
+    if refresh:
+        query["refresh"] = 1
+    try:
+        with urllib.request.urlopen(f"{url}/api/v1/news?{urlencode(query)}", timeout=timeout) as resp:
+            body = json.loads(resp.read().decode("utf-8"))
+            meta = body.get("metadata") or {}
+            return {
+                "status": resp.status,
+                "outcome": "ok" if body.get("success") else "http_error",
+                "items": len(body.get("data") or []),
+                "source_errors": [e.split(":", 1)[0] for e in meta.get("errors") or []],
+            }
+    except urllib.error.HTTPError as e:
+        return {"status": e.code, "outcome": "http_error", "items": 0, "source_errors": []}
+    except (socket.timeout, TimeoutError):
+        return {"status": None, "outcome": "timeout", "items": 0, "source_errors": []}
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        reason = getattr(e, "reason", None)
+        outcome = "timeout" if isinstance(reason, (socket.timeout, TimeoutError)) else "exception"
+        return {"status": None, "outcome": outcome, "items": 0, "source_errors": []}
+
+
+def drive(url: str, args) -> list:
+    """开环发压：按到达率计划每个请求的发出时刻，延迟从计划时刻算起；返回每个请求的记录"""
+    rng = random.Random(args.seed)
+    mix = parse_keywords(args.keywords)
+    words, weights = [k for k, _ in mix], [w for _, w in mix]
+    records = []
+    lock = threading.Lock()
+
+    def task(planned: float, keyword: str, refresh: bool):
+        result = send(url, keyword, args.limit, refresh, args.request_timeout)
+        result.update(keyword=keyword, refresh=refresh, latency=time.time() - planned, offset=planned - start)
+        with lock:
+            records.append(result)
+
+    start = time.time()
+    planned = start
+    with ThreadPoolExecutor(max_workers=args.max_inflight) as pool:
+        while planned < start + args.duration:
+            wait = planned - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            pool.submit(task, planned, rng.choices(words, weights)[0], rng.random() < args.refresh)
+            gap = rng.expovariate(args.rate) if args.arrival == "poisson" else 1 / args.rate
+            planned += gap
+        print(f"📤 已按计划发出全部请求，等待在途请求完成（已完成 {len(records)}）...")
+    return records
+
+
+def summarize(records: list, elapsed: float) -> dict:
+    outcomes = {}
+    source_errors = {}
+    for r in records:
+        outcomes[r["outcome"]] = outcomes.get(r["outcome"], 0) + 1
+        for s in r["source_errors"]:
+            source_errors[s] = source_errors.get(s, 0) + 1
+    ok = [r for r in records if r["outcome"] == "ok"]
+    latencies = [r["latency"] * 1000 for r in records]
+    ok_latencies = [r["latency"] * 1000 for r in ok]
+    failed = len(records) - len(ok)
+
+    def ms(v):
+        return None if v is None else round(v, 1)
+
+    return {
+        "requests": len(records),
+        "ok": len(ok),
+        "outcomes": outcomes,
+        "error_rate": round(failed / len(records), 4) if records else None,
+        "responses_with_source_errors": sum(1 for r in ok if r["source_errors"]),
+        "source_errors": source_errors,
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed else None,
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 50)),
+            "p95": ms(percentile(latencies, 95)),
+            "p99": ms(percentile(latencies, 99)),
+            "max": ms(max(latencies) if latencies else None),
+        },
+        "ok_latency_ms": {
+            "p50": ms(percentile(ok_latencies, 50)),
+            "p95": ms(percentile(ok_latencies, 95)),
+            "p99": ms(percentile(ok_latencies, 99)),
+        },
+        "items_per_response": round(sum(r["items"] for r in ok) / len(ok), 1) if ok else None,
+    }
+
+
+def run(args) -> dict:
+    faults = Faults.parse(args.faults, seed=args.seed)
+    fixture = FixtureServer(port=args.fixture_port, faults=faults).start()
+    server = None
+    try:
+        if args.url:
+            url, pid = args.url.rstrip("/"), args.pid
+        else:
+            server = AppServer(args.app, fixture.base_url, args.port or free_port()).start()
+            url, pid = server.url, server.process.pid
+            print(f"🚀 服务已启动: {url} (pid {pid}，日志 {server.log_path})")
+
+        print(f"{'=' * 60}")
+        print(f"🔥 压测 {url}/api/v1/news | {args.rate}/s × {args.duration}s ({args.arrival}) | 关键词: {args.keywords}")
+        print(f"   夹具: {fixture.base_url} | 故障: {faults.rules or '无'} | refresh 比例: {args.refresh}")
+        print(f"{'=' * 60}")
+
+        sampler = ResourceSampler(pid).start() if pid else None
+        start = time.time()
+        records = drive(url, args)
+        elapsed = time.time() - start
+        if sampler:
+            sampler.stop()
+    finally:
+        if server:
+            server.stop()
+        fixture.stop()
+
+    report = {
+        "label": args.label or os.path.basename(os.path.dirname(os.path.abspath(args.app))),
+        "meta": {
+            "url": url,
+            "rate": args.rate,
+            "duration": args.duration,
+            "arrival": args.arrival,
+            "keywords": args.keywords,
+            "limit": args.limit,
+            "refresh": args.refresh,
+            "faults": args.faults,
+            "seed": args.seed,
+            "elapsed_seconds": round(elapsed, 2),
+            "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start)),
+            "machine": f"{platform.system()} {platform.machine()} / Python {platform.python_version()}",
+        },
+        "results": summarize(records, elapsed),
+        "resources": sampler.summary() if sampler else None,
+        "fixture": fixture.stats(),
+    }
+    print_report(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 结果已保存: {args.out}")
+    return report
+
+
+def print_report(report: dict):
+    r = report["results"]
+    lat = r["latency_ms"]
+    print(f"\n📊 请求 {r['requests']} | 成功 {r['ok']} | 失败率 {r['error_rate']:.1%} | 吞吐 {r['throughput_rps']}/s"
+          if r["requests"] else "\n📊 没有完成的请求")
+    print(f"⏱️ 延迟 p50 {lat['p50']}ms | p95 {lat['p95']}ms | p99 {lat['p99']}ms | max {lat['max']}ms")
+    if r["source_errors"]:
+        print(f"⚠️ 数据源报错: {r['source_errors']}（{r['responses_with_source_errors']} 个响应含报错）")
+    res = report["resources"]
+    if res:
+        print(f"💾 峰值 RSS {res['peak_rss_mb']}MB | 峰值浏览器 {res['peak_browsers']} | 峰值进程 {res['peak_processes']}")
+    print(f"🧪 夹具请求: {report['fixture']['hits']} | 注入: {report['fixture']['injected']}")
+
+
+COMPARE_ROWS = [
+    ("吞吐 (req/s)", ("results", "throughput_rps"), True),
+    ("失败率", ("results", "error_rate"), False),
+    ("p50 (ms)", ("results", "latency_ms", "p50"), False),
+    ("p95 (ms)", ("results", "latency_ms", "p95"), False),
+    ("p99 (ms)", ("results", "latency_ms", "p99"), False),
+    ("峰值 RSS (MB)", ("resources", "peak_rss_mb"), False),
+    ("峰值浏览器", ("resources", "peak_browsers"), False),
+]
+
+
+def _dig(report: dict, path: tuple):
+    for key in path:
+        report = (report or {}).get(key)
+    return report
+
+
+def compare(a: dict, b: dict):
+    """两次运行并排对比，变化列为 (b - a) / a；higher_better 的指标变小标 ❌，其余变大标 ❌"""
+    print(f"{'指标':<14}{a['label'][:18]:>20}{b['label'][:18]:>20}{'变化':>10}")
+    for name, path, higher_better in COMPARE_ROWS:
+        va, vb = _dig(a, path), _dig(b, path)
+        change, mark = "", ""
+        if isinstance(va, (int, float)) and isinstance(vb, (int, float)) and va:
+            delta = (vb - va) / va
+            change = f"{delta:+.0%}"
+            worse = delta < -0.1 if higher_better else delta > 0.1
+            mark = " ❌" if worse else ""
+        print(f"{name:<14}{str(va):>20}{str(vb):>20}{change:>10}{mark}")
+    for key in ("rate", "duration", "keywords", "faults"):
+        if a["meta"].get(key) != b["meta"].get(key):
+            print(f"⚠️ 两次运行的 {key} 不同: {a['meta'].get(key)} / {b['meta'].get(key)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API 服务端到端压测")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="启动服务并压测")
+    p.add_argument("--rate", type=float, default=1.0, help="每秒请求数（默认 1）")
+    p.add_argument("--duration", type=float, default=60, help="发压秒数（默认 60）")
+    p.add_argument("--arrival", choices=("fixed", "poisson"), default="fixed", help="到达间隔：固定或泊松")
+    p.add_argument("--keywords", default="小米集团:3,腾讯控股:1,贵州茅台:1", help="关键词:权重，逗号分隔")
+    p.add_argument("--limit", type=int, default=20)
+    p.add_argument("--refresh", type=float, default=0.0, help="带 refresh=1（跳过缓存）的请求比例")
+    p.add_argument("--faults", default="", help="故障规则，见 bench/fixture_server.py 的 Faults")
+    p.add_argument("--max-inflight", type=int, default=64, help="同时在途的请求上限（超过后排队，排队时间计入延迟）")
+    p.add_argument("--request-timeout", type=float, default=300)
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--app", default=os.path.join(ROOT, "app.py"), help="要启动的 app.py（对比其他版本时指向对应目录）")
+    p.add_argument("--port", type=int, default=0, help="服务端口（默认随机空闲端口）")
+    p.add_argument("--url", default="", help="压已在运行的服务（不启动子进程；该服务的 SCRAPER_BASE_URL 需指向 --fixture-port）")
+    p.add_argument("--fixture-port", type=int, default=0, help="夹具服务器端口（默认随机空闲端口）")
+    p.add_argument("--pid", type=int, default=0, help="配合 --url：采样该进程树的资源")
+    p.add_argument("--label", default="", help="结果标签（默认取 app.py 所在目录名）")
+    p.add_argument("--out", default="", help="结果 JSON 路径")
+
+    c = sub.add_parser("compare", help="并排对比两次运行的结果 JSON")
+    c.add_argument("before")
+    c.add_argument("after")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        with open(args.before, "r", encoding="utf-8") as f:
+            a = json.load(f)
+        with open(args.after, "r", encoding="utf-8") as f:
+            b = json.load(f)
+        compare(a, b)
+        return
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+富途接口直连离线回放
+本地起一个桩服务器，按页返回 futu_api_dump.json，
+验证 futu / futu_report 的直连路径（连接池请求 + 分页 + parse_api）能取到数据，
+以及接口异常时返回空列表（由调用方退回浏览器）。
+
+用法: python bench/replay_futu_api.py
+"""
+
+import os
+import sys
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+with open(os.path.join(ROOT, "futu_api_dump.json"), "r", encoding="utf-8") as f:
+    DUMP = json.load(f)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/search?keyword=&page= 第 1 页返回前半、第 2 页返回后半、之后为空；/broken 返回 500"""
+
+    requests_seen = []
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        StubHandler.requests_seen.append(self.path)
+        if parts.path == "/broken":
+            self.send_response(500)
+            self.end_headers()
+            return
+
+        page = int(parse_qs(parts.query).get("page", ["1"])[0])
+        data = {}
+        for key, items in DUMP["data"].items():
+            half = len(items) // 2
+            data[key] = [items[:half], items[half:]][page - 1] if page <= 2 else []
+        body = json.dumps({"code": 0, "message": "成功", "data": data}, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    from scrapers.futu_scraper import fetch_futu_direct
+    from scrapers.futu_report_scraper import fetch_futu_report_direct
+
+    failures = 0
+
+    def check(name, cond):
+        nonlocal failures
+        print(f"{'✅' if cond else '❌'} {name}")
+        failures += 0 if cond else 1
+
+    os.environ["FUTU_SEARCH_API"] = base + "/search?keyword={keyword}&page={page}"
+    news = fetch_futu_direct("小米集团", 50)
+    check(f"新闻直连取到 {len(news)} 条（dump 中 {len(DUMP['data']['news'])} 条）", len(news) == len(DUMP["data"]["news"]))
+    check("新闻条目带时间（timestamp 字段）", all(n["time"] for n in news))
+    check("分页请求了第 2 页", any("page=2" in p for p in StubHandler.requests_seen))
+
+    reports = fetch_futu_report_direct("小米集团", 50)
+    check(f"研报直连取到 {len(reports)} 条（dump 中 {len(DUMP['data']['report'])} 条）", len(reports) == len(DUMP["data"]["report"]))
+
+    StubHandler.requests_seen.clear()
+    few = fetch_futu_direct("小米集团", 2)
+    check("达到目标数量后停止翻页", len(few) >= 2 and not any("page=2" in p for p in StubHandler.requests_seen))
+
+    os.environ["FUTU_SEARCH_API"] = base + "/broken?keyword={keyword}"
+    check("接口 500 时返回空列表（退回浏览器）", fetch_futu_direct("小米集团", 50) == [])
+
+    server.shutdown()
+    print(f"\n{'全部通过' if failures == 0 else f'{failures} 项失败'}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
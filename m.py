@@ -15,7 +15,13 @@ def main():
         return
 
     command = sys.argv[1]          # add (存) 或 search (查)
-    content = " ".join(sys.argv[2:]) # 内容
+    args = sys.argv[2:]
+    page = 1                       # search 可加 --page N 翻页（每页 20 条）
+    if command == "search" and "--page" in args:
+        i = args.index("--page")
+        page = int(args[i + 1]) if i + 1 < len(args) and args[i + 1].isdigit() else 1
+        del args[i:i + 2]
+    content = " ".join(args)       # 内容
 
     if command == "add":
         mem.add(content)
@@ -24,7 +30,7 @@ def main():
         
     elif command == "search":
         print(f"🔍 [正在回忆]: {content}")
-        results = mem.search(content)
+        results = mem.search(content, page=page)
         print("--- 回忆内容 ---")
         print(results)
 
@@ -1,14 +1,29 @@
 
 import sqlite3
 import os
+import threading
+
+from service.store import tokenize, match_query
+
+# 单次写入 FTS 回填的批大小
+BACKFILL_BATCH = 10000
 
 class Memori:
+    """
+    记忆库：一个实例复用一个连接（WAL），正文的中文两字词写入 FTS5 索引，
+    与 memory 表在同一事务内更新；支持按 entity / process 过滤，检索结果分页
+    """
+
     def __init__(self, db_path="memory.db"):
         self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
         self._init_db()
 
     def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self.conn as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS memory (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -18,25 +33,110 @@ class Memori:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_created ON memory (created_at)")
+            # 单列索引隐含 rowid，按 entity / process 过滤后可直接按 id 倒序取页
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_entity ON memory (entity_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_process ON memory (process_id)")
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5 (grams, tokenize = 'unicode61')")
+        self._backfill()
+
+    def _backfill(self):
+        """旧库升级：为还没有索引的记录补写 FTS（按批提交）"""
+        while True:
+            with self._lock, self.conn as conn:
+                rows = conn.execute(
+                    "SELECT id, content FROM memory WHERE id > (SELECT IFNULL(MAX(rowid), 0) FROM memory_fts)"
+                    " ORDER BY id LIMIT ?",
+                    (BACKFILL_BATCH,),
+                ).fetchall()
+                conn.executemany(
+                    "INSERT INTO memory_fts (rowid, grams) VALUES (?, ?)",
+                    [(rid, " ".join(tokenize(content))) for rid, content in rows],
+                )
+            if len(rows) < BACKFILL_BATCH:
+                return
 
     def attribution(self, entity_id, process_id):
         self.entity_id = entity_id
         self.process_id = process_id
 
+    def _owner(self):
+        return getattr(self, "entity_id", "Unknown"), getattr(self, "process_id", "Unknown")
+
     def add(self, content):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT INTO memory (content, entity_id, process_id) VALUES (?, ?, ?)",
-                (content, getattr(self, "entity_id", "Unknown"), getattr(self, "process_id", "Unknown"))
-            )
+        return self.add_many([content])[0]
 
-    def search(self, query):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT content, created_at FROM memory WHERE content LIKE ? ORDER BY created_at DESC",
-                (f"%{query}%",)
+    def add_many(self, contents):
+        """批量写入（一个事务），返回新记录的 id 列表"""
+        entity_id, process_id = self._owner()
+        ids = []
+        with self._lock, self.conn as conn:
+            for content in contents:
+                cur = conn.execute(
+                    "INSERT INTO memory (content, entity_id, process_id) VALUES (?, ?, ?)",
+                    (content, entity_id, process_id)
+                )
+                ids.append(cur.lastrowid)
+            conn.executemany(
+                "INSERT INTO memory_fts (rowid, grams) VALUES (?, ?)",
+                [(rid, " ".join(tokenize(content))) for rid, content in zip(ids, contents)],
             )
-            rows = cursor.fetchall()
-            if not rows:
-                return "没有找到相关记忆。"
-            return "\n---\n".join([f"[{row[1]}] {row[0]}" for row in rows])
+        return ids
+
+    def delete(self, memory_id):
+        with self._lock, self.conn as conn:
+            conn.execute("DELETE FROM memory_fts WHERE rowid = ?", (memory_id,))
+            conn.execute("DELETE FROM memory WHERE id = ?", (memory_id,))
+
+    def find(self, query, entity_id=None, process_id=None, limit=20, offset=0):
+        """检索，按写入时间倒序（即 id 倒序）分页；返回 (当前页 [(content, created_at)], 命中总数)"""
+        where, params = [], []
+        if entity_id is not None:
+            where.append("m.entity_id = ?")
+            params.append(entity_id)
+        if process_id is not None:
+            where.append("m.process_id = ?")
+            params.append(process_id)
+
+        expr = match_query(query)
+        if expr:
+            # CROSS JOIN 固定以倒排索引为外层，按 rowid 倒序流式读取，取够一页即停
+            base = "FROM memory_fts f CROSS JOIN memory m ON m.id = f.rowid"
+            where.insert(0, "memory_fts MATCH ?")
+            params.insert(0, expr)
+            order = "f.rowid DESC"
+        else:
+            base = "FROM memory m"
+            order = "m.id DESC"
+            if query.strip():
+                # 单个汉字没有两字词可用，退回扫描
+                where.append("m.content LIKE ?")
+                params.append(f"%{query.strip()}%")
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+
+        with self._lock:
+            if expr and len(params) == 1:
+                # 无过滤条件时只数倒排索引，不回表
+                total = self.conn.execute(
+                    "SELECT COUNT(*) FROM memory_fts WHERE memory_fts MATCH ?", params
+                ).fetchone()[0]
+            else:
+                total = self.conn.execute(f"SELECT COUNT(*) {base}{clause}", params).fetchone()[0]
+            rows = self.conn.execute(
+                f"SELECT m.content, m.created_at {base}{clause} ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return rows, total
+
+    def search(self, query, page=1, page_size=20, entity_id=None, process_id=None):
+        rows, total = self.find(query, entity_id, process_id, limit=page_size, offset=(page - 1) * page_size)
+        if not rows:
+            return "没有找到相关记忆。"
+        text = "\n---\n".join([f"[{row[1]}] {row[0]}" for row in rows])
+        pages = (total + page_size - 1) // page_size
+        if pages > 1:
+            text += f"\n--- 第 {page}/{pages} 页，共 {total} 条 ---"
+        return text
+
+    def close(self):
+        self.conn.close()
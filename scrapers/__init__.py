@@ -0,0 +1,4 @@
+"""
+财经爬虫集合
+每个 *_scraper.py 既可命令行独立运行，也可被服务端直接导入
+"""
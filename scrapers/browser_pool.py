@@ -0,0 +1,399 @@
+"""
+共享浏览器池
+常驻 N 个预热的 Chromium，每个任务租用一个隔离的 BrowserContext，
+按使用次数 / 内存占用回收浏览器，按排队深度自动扩缩容。
+
+Playwright 同步 API 绑定创建它的线程，因此每个浏览器由一个专属工作线程持有，
+任务被投递到该线程上执行：fn(context, *args, **kwargs)
+run(..., session=工厂) 的任务改为 fn(会话, ...)：每个工作线程按工厂保留一个常驻会话 工厂(browser)，
+跨任务复用（会话需提供 usable() / close()），浏览器重启时一并丢弃。
+浏览器进程登记在 scrapers/supervisor.py，单个任务超过墙钟上限时由它结束浏览器。
+工作线程启动驱动 / 预热浏览器失败时，没有其他可用浏览器的排队任务直接以原异常失败；
+之后按指数退避（最长 LAUNCH_BACKOFF_MAX 秒）才再尝试启动，退避期间新任务立即失败，不再空等超时。
+"""
+
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+
+from playwright.sync_api import sync_playwright
+
+from scrapers import phases
+from scrapers.supervisor import child_pids, descendant_pids, rss_bytes, supervisor
+
+LAUNCH_ARGS = ["--no-sandbox"]
+
+# 与各爬虫原先的 new_context 参数一致
+CONTEXT_OPTIONS = {
+    "viewport": {"width": 1920, "height": 1080},
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0",
+}
+INIT_SCRIPT = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+
+# 启动 Playwright 驱动时串行化，便于识别新产生的驱动进程
+_start_lock = threading.Lock()
+
+# 启动失败后的重试退避（秒）：1, 2, 4 ... 封顶
+LAUNCH_BACKOFF_MAX = 60
+
+
+def new_context(browser):
+    """按统一参数创建隔离的 BrowserContext"""
+    context = browser.new_context(**CONTEXT_OPTIONS)
+    context.add_init_script(INIT_SCRIPT)
+    return context
+
+
+@contextmanager
+def lease_context(context=None):
+    """已租用的 context 直接使用；否则启动一次性浏览器（命令行独立运行时）"""
+    if context is not None:
+        yield context
+        return
+
+    p, driver_pid = start_driver()
+    try:
+        print("🚀 启动浏览器...")
+        browser = p.chromium.launch(headless=True, args=LAUNCH_ARGS)
+        roots = supervisor.track(driver_pid, "cli")
+        try:
+            yield new_context(browser)
+        finally:
+            browser.close()
+            supervisor.untrack(roots)
+            print("🔒 浏览器关闭")
+    finally:
+        p.stop()
+
+
+def start_driver():
+    """启动 Playwright 驱动，返回 (playwright, 驱动进程 PID)；识别不出驱动进程时 PID 为 None"""
+    with _start_lock:
+        before = child_pids(os.getpid())
+        pw = sync_playwright().start()
+        spawned = child_pids(os.getpid()) - before
+    return pw, (min(spawned) if spawned else None)
+
+
+# ========== 浏览器池 ==========
+
+
+class _BrowserWorker:
+    """持有一个 Playwright 驱动和一个 Chromium 的工作线程"""
+
+    def __init__(self, pool, worker_id: int):
+        self.pool = pool
+        self.worker_id = worker_id
+        self.driver_pid = None
+        self.browser = None
+        self.uses = 0
+        self.launches = 0
+        self.busy = False
+        self.roots = set()  # 监管登记的浏览器主进程
+        self.sessions = {}  # 会话工厂 -> 常驻会话
+        self.future = None
+        self.job = None
+        self.thread = threading.Thread(
+            target=self._loop, name=f"browser-{worker_id}", daemon=True
+        )
+
+    def browser_pids(self) -> set:
+        return descendant_pids(self.driver_pid) if self.driver_pid else set()
+
+    def rss(self) -> int:
+        return rss_bytes(self.browser_pids())
+
+    def _launch(self, pw):
+        self._close_browser()
+        before = child_pids(self.driver_pid) if self.driver_pid else set()
+        self.browser = pw.chromium.launch(headless=True, args=LAUNCH_ARGS)
+        self.roots = supervisor.track(self.driver_pid, f"browser-{self.worker_id}", before)
+        self.uses = 0
+        self.launches += 1
+
+    def _close_browser(self):
+        for session in self.sessions.values():
+            session.close()
+        self.sessions.clear()
+        if self.browser is not None:
+            try:
+                self.browser.close()
+            except Exception:
+                pass
+            self.browser = None
+        if self.roots:
+            supervisor.untrack(self.roots)
+            self.roots = set()
+
+    def _session(self, factory):
+        """取本线程的常驻会话，没有或已不可用时重建"""
+        current = self.sessions.get(factory)
+        if current is not None and current.usable():
+            return current
+        if current is not None:
+            current.close()
+        current = self.sessions[factory] = factory(self.browser)
+        return current
+
+    def _should_recycle(self) -> bool:
+        pool = self.pool
+        if pool.max_uses and self.uses >= pool.max_uses:
+            return True
+        if pool.max_rss_mb and self.rss() > pool.max_rss_mb * 1024 * 1024:
+            return True
+        return False
+
+    def _loop(self):
+        pool = self.pool
+        pw = None
+        try:
+            pw, self.driver_pid = start_driver()
+            self._launch(pw)  # 预热
+        except Exception as e:
+            print(f"❌ browser-{self.worker_id} 启动浏览器失败: {e}")
+            self._close_browser()
+            if pw is not None:
+                try:
+                    pw.stop()
+                except Exception:
+                    pass
+            pool._launch_failed(self, e)
+            return
+        pool._launch_ok()
+
+        try:
+            while True:
+                try:
+                    job = pool._queue.get(timeout=pool.idle_timeout)
+                except queue.Empty:
+                    if pool._retire(self):
+                        break
+                    continue
+
+                if job is None:  # 关闭信号
+                    break
+
+                future, fn, args, kwargs, source, session = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                self.busy = True
+                self.future = future
+                context = None
+                killed = False
+                try:
+                    with phases.tracking(source):
+                        with phases.phase("launch"):
+                            if self.browser is None or not self.browser.is_connected():
+                                self._launch(pw)
+                            if session is None:
+                                target = context = new_context(self.browser)
+                            else:
+                                target = self._session(session)
+                        # 超过墙钟上限由监管线程结束浏览器，fn 随之因连接断开而失败
+                        self.job = supervisor.start_job(self.roots, label=source or f"browser-{self.worker_id}")
+                        result = fn(target, *args, **kwargs)
+                    future.set_result(result)
+                except BaseException as e:
+                    if self.job is not None and self.job.killed:
+                        e = RuntimeError("浏览器任务超时，已强制结束")
+                    if session is not None and session in self.sessions:
+                        self.sessions.pop(session).close()  # 出错的会话不再复用
+                    future.set_exception(e)
+                finally:
+                    if self.job is not None:
+                        killed = supervisor.end_job(self.job)
+                        self.job = None
+                    self.future = None
+                    if context is not None and not killed:
+                        try:
+                            context.close()
+                        except Exception:
+                            pass
+                    self.uses += 1
+                    self.busy = False
+
+                if killed:
+                    self._close_browser()  # 下一个任务重新启动
+                elif self._should_recycle():
+                    self._close_browser()
+                    pool._recycled += 1
+        finally:
+            self._close_browser()
+            try:
+                pw.stop()
+            except Exception:
+                pass
+            pool._remove(self)
+
+
+class BrowserPool:
+    """预热浏览器池，submit(fn, ...) 在某个浏览器上执行 fn(context, ...)"""
+
+    def __init__(
+        self,
+        min_size: int = 1,
+        max_size: int = 4,
+        max_uses: int = 50,
+        max_rss_mb: int = 800,
+        idle_timeout: float = 120,
+    ):
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.idle_timeout = idle_timeout
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._next_id = 0
+        self._recycled = 0
+        self._closed = False
+        self._launch_error = None  # 最近一次启动失败的异常，启动成功后清除
+        self._launch_failures = 0
+        self._retry_at = 0.0
+
+    @classmethod
+    def from_env(cls):
+        """从环境变量读取池参数"""
+        env = os.environ.get
+        return cls(
+            min_size=int(env("BROWSER_POOL_MIN", "1")),
+            max_size=int(env("BROWSER_POOL_MAX", "4")),
+            max_uses=int(env("BROWSER_MAX_USES", "50")),
+            max_rss_mb=int(env("BROWSER_MAX_RSS_MB", "800")),
+            idle_timeout=float(env("BROWSER_IDLE_TIMEOUT", "120")),
+        )
+
+    def start(self):
+        """预热 min_size 个浏览器"""
+        with self._lock:
+            while len(self._workers) < self.min_size:
+                self._spawn()
+        return self
+
+    def _spawn(self):
+        worker = _BrowserWorker(self, self._next_id)
+        self._next_id += 1
+        self._workers.append(worker)
+        worker.thread.start()
+
+    def _remove(self, worker):
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+
+    def _retire(self, worker) -> bool:
+        """空闲超时：超过 min_size 的工作线程退出"""
+        with self._lock:
+            if len(self._workers) > self.min_size:
+                self._workers.remove(worker)
+                return True
+            return False
+
+    def _launch_ok(self):
+        with self._lock:
+            self._launch_error = None
+            self._launch_failures = 0
+
+    def _launch_failed(self, worker, error: Exception):
+        """工作线程启动失败：退出该线程、安排退避；没有其他浏览器时让排队任务以原异常失败"""
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            self._launch_error = error
+            self._launch_failures += 1
+            self._retry_at = time.time() + min(2 ** (self._launch_failures - 1), LAUNCH_BACKOFF_MAX)
+            if self._workers:
+                return
+            pending = []
+            while True:
+                try:
+                    pending.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+        for job in pending:
+            if job is None:
+                self._queue.put(None)  # 关闭信号留给之后的工作线程
+            elif job[0].set_running_or_notify_cancel():
+                job[0].set_exception(error)
+
+    def _maybe_grow(self):
+        """排队任务多于空闲浏览器时扩容（启动失败的退避期内不扩容）"""
+        with self._lock:
+            if self._launch_error is not None and time.time() < self._retry_at:
+                return
+            idle = sum(1 for w in self._workers if not w.busy)
+            if self._queue.qsize() > idle and len(self._workers) < self.max_size:
+                self._spawn()
+
+    def submit(self, fn, *args, session=None, **kwargs) -> Future:
+        if self._closed:
+            raise RuntimeError("浏览器池已关闭")
+        future = Future()
+        with self._lock:
+            # 启动失败的退避期内且没有可用浏览器：直接以启动异常失败（与 _launch_failed 清空队列互斥）
+            error = self._launch_error if not self._workers and time.time() < self._retry_at else None
+            if error is None:
+                # 阶段耗时记在提交方当前采集的数据源名下
+                self._queue.put((future, fn, args, kwargs, phases.current_source(), session))
+        if error is not None:
+            future.set_exception(error)
+            return future
+        self._maybe_grow()
+        return future
+
+    def run(self, fn, *args, timeout=None, session=None, **kwargs):
+        """提交并等待结果；等待超时时撤销排队中的任务，已在运行的结束其浏览器，不让它继续占着"""
+        future = self.submit(fn, *args, session=session, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            if not future.cancel():
+                self._abort(future)
+            raise
+
+    def _abort(self, future):
+        with self._lock:
+            workers = list(self._workers)
+        for w in workers:
+            job = w.job
+            if w.future is future and job is not None:
+                supervisor.kill_job(job, "等待超时")
+
+    def stats(self) -> dict:
+        with self._lock:
+            workers = list(self._workers)
+        return {
+            "size": len(workers),
+            "busy": sum(1 for w in workers if w.busy),
+            "queued": self._queue.qsize(),
+            "recycled": self._recycled,
+            "healthy": self._launch_error is None,
+            "launch_error": None if self._launch_error is None else str(self._launch_error),
+            "launch_failures": self._launch_failures,
+            "browsers": [
+                {
+                    "id": w.worker_id,
+                    "uses": w.uses,
+                    "launches": w.launches,
+                    "sessions": len(w.sessions),
+                    "rss_mb": round(w.rss() / 1024 / 1024, 1),
+                }
+                for w in workers
+            ],
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+        for _ in workers:
+            self._queue.put(None)
+        if wait:
+            for w in workers:
+                w.thread.join(timeout=30)
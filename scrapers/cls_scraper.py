@@ -12,7 +12,13 @@ import time
 import os
 import urllib.parse
 from datetime import datetime, timedelta
-from playwright.sync_api import sync_playwright
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers import debug_capture, phases, router, sites, waits
+from scrapers.browser_pool import lease_context
+from scrapers.registry import register
+from scrapers.selector_cache import selector_cache
 
 
 def parse_time(text: str) -> datetime:
@@ -37,105 +43,103 @@ def parse_time(text: str) -> datetime:
     return datetime(2000, 1, 1)
 
 
-def scrape(keyword: str) -> list:
-    """爬取财联社（只采集当前页）"""
+# 候选新闻条目选择器（按优先级，选择器缓存会把上次命中的提到最前）
+SELECTORS_TO_TRY = [
+    'div.search-telegram-wrap div',
+    'div.search-telegram-item',
+    'div.telegraph-item',
+    'div[class*="telegraph"]',
+    'div[class*="telegram"]',
+    'div[class*="search"] div',
+    'div.content-wrap div',
+    'div.list-item',
+    'article',
+]
+
+
+def extract_with_selector(page, selector: str) -> list:
+    """用单个选择器提取新闻，元素不足 3 个或没有有效条目时返回空列表"""
     news = []
-    os.makedirs('screenshots', exist_ok=True)
+    items = page.locator(selector).all()
+    if len(items) <= 2:
+        return news
+    print(f"  尝试选择器: {selector} → {len(items)} 个元素")
     
-    with sync_playwright() as p:
-        print("🚀 启动浏览器...")
-        browser = p.chromium.launch(headless=True, args=['--no-sandbox'])
-        
-        context = browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0',
-        )
-        page = context.new_page()
-        page.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    for item in items:
+        try:
+            text = item.inner_text().strip()
+            if len(text) < 30:
+                continue
+            
+            # 跳过UI元素
+            if any(skip in text for skip in ['热门话题', 'A股公告', '环球市场', '+关注']):
+                continue
+            
+            # 解析时间
+            time_obj = parse_time(text)
+            if time_obj.year == 2000:
+                continue  # 没有时间的跳过
+            
+            # 清理标题
+            title = text
+            # 移除日期时间前缀
+            title = re.sub(r'^\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}\s*[星期一二三四五六日]*\s*', '', title)
+            title = title.strip()
+            
+            if len(title) < 20:
+                continue
+            
+            news.append({
+                'title': title[:300],
+                'time': time_obj,
+            })
+        except:
+            continue
+    return news
+
+
+def scrape(keyword: str, context=None) -> list:
+    """爬取财联社（只采集当前页），context 为浏览器池租用的上下文"""
+    news = []
+    
+    with lease_context(context) as ctx:
+        page = ctx.new_page()
+        route_stats = router.install(page, "cls")
+        capture = debug_capture.start("cls")
+        waits.track_network(page)
         
         try:
             # 直接使用 URL 编码访问
             encoded_keyword = urllib.parse.quote(keyword)
-            url = f'https://www.cls.cn/searchPage?keyword={encoded_keyword}&type=telegram'
+            url = sites.site_url("cls", f"/searchPage?keyword={encoded_keyword}&type=telegram")
             print(f"📄 打开: {url}")
-            page.goto(url, wait_until='domcontentloaded', timeout=60000)
-            
-            print("⏳ 等待页面加载...")
-            time.sleep(6)
-            
-            # 截图
-            page.screenshot(path='screenshots/cls_page.png')
-            print("📷 截图: cls_page.png")
+            with phases.phase("navigate"):
+                page.goto(url, wait_until='domcontentloaded', timeout=60000)
+                
+                print("⏳ 等待页面加载...")
+                waits.wait_for_selector(
+                    page, 'div.search-telegram-wrap, div[class*="telegraph"], div[class*="telegram"]',
+                    timeout=10, label='cls.results')
+                waits.wait_for_network_idle(page, quiet_ms=500, timeout=3, label='cls.idle')
             
-            # 保存HTML用于调试
-            html = page.content()
-            with open('screenshots/cls_page.html', 'w', encoding='utf-8') as f:
-                f.write(html)
-            print("📄 HTML: cls_page.html")
+            # 调试快照（只在提取失败时落盘）
+            capture.snapshot(page, "results")
             
             # 直接获取页面所有文本，按行解析
             print("📰 提取新闻...")
             
-            # 方法1：尝试常见选择器
-            selectors_to_try = [
-                'div.search-telegram-wrap div',
-                'div.search-telegram-item',
-                'div.telegraph-item',
-                'div[class*="telegraph"]',
-                'div[class*="telegram"]',
-                'div[class*="search"] div',
-                'div.content-wrap div',
-                'div.list-item',
-                'article',
-            ]
-            
-            for selector in selectors_to_try:
-                try:
-                    items = page.locator(selector).all()
-                    if len(items) > 2:
-                        print(f"  尝试选择器: {selector} → {len(items)} 个元素")
-                        
-                        for item in items:
-                            try:
-                                text = item.inner_text().strip()
-                                if len(text) < 30:
-                                    continue
-                                
-                                # 跳过UI元素
-                                if any(skip in text for skip in ['热门话题', 'A股公告', '环球市场', '+关注']):
-                                    continue
-                                
-                                # 解析时间
-                                time_obj = parse_time(text)
-                                if time_obj.year == 2000:
-                                    continue  # 没有时间的跳过
-                                
-                                # 清理标题
-                                title = text
-                                # 移除日期时间前缀
-                                title = re.sub(r'^\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}\s*[星期一二三四五六日]*\s*', '', title)
-                                title = title.strip()
-                                
-                                if len(title) < 20:
-                                    continue
-                                
-                                news.append({
-                                    'title': title[:300],
-                                    'time': time_obj,
-                                })
-                            except:
-                                continue
-                        
-                        if len(news) > 0:
-                            print(f"  ✅ 使用选择器: {selector}")
-                            break
-                except:
-                    continue
+            # 方法1：按学习到的顺序尝试常见选择器
+            with phases.phase("extract"):
+                selector, news = selector_cache.walk(
+                    "cls", SELECTORS_TO_TRY, lambda sel: extract_with_selector(page, sel))
+            if selector:
+                print(f"  ✅ 使用选择器: {selector}")
             
             # 方法2：如果上面没提取到，尝试获取整个页面文本解析
             if len(news) == 0:
                 print("  尝试页面文本解析...")
-                body_text = page.inner_text('body')
+                with phases.phase("extract"):
+                    body_text = page.inner_text('body')
                 lines = [l.strip() for l in body_text.split('\n') if l.strip()]
                 
                 for line in lines:
@@ -163,13 +167,38 @@ def scrape(keyword: str) -> list:
             
         except Exception as e:
             print(f"❌ 错误: {e}")
+            capture.fail(e)
         finally:
-            browser.close()
-            print("🔒 浏览器关闭")
+            capture.finish(page, len(news))
+            print(route_stats.summary())
+            page.close()
     
     return news
 
 
+def to_json_items(all_news: list) -> list:
+    """去重、格式化时间，转换为 JSON 可序列化格式（最新 20 条）"""
+    output = []
+    seen = set()
+    for n in all_news:
+        key = n['title'][:40]
+        if key not in seen:
+            seen.add(key)
+            output.append({
+                'title': n['title'],
+                'time': n['time'].strftime('%Y-%m-%d %H:%M') if hasattr(n['time'], 'strftime') else str(n['time']),
+                'url': ''
+            })
+    output.sort(key=lambda x: x['time'], reverse=True)
+    return output[:20]
+
+
+@register("cls", name="财联社", time="~8秒")
+def collect(keyword: str, limit: int = 20, context=None) -> list:
+    """统一接口（limit 财联社不用）"""
+    return to_json_items(scrape(keyword, context=context))
+
+
 def main():
     # 解析参数: keyword [limit] [--json]
     keyword = "小米集团"
@@ -189,20 +218,7 @@ def main():
         sys_module.stdout = io.StringIO()
         all_news = scrape(keyword)
         sys_module.stdout = old_stdout
-        # 转换为 JSON 可序列化格式
-        output = []
-        seen = set()
-        for n in all_news:
-            key = n['title'][:40]
-            if key not in seen:
-                seen.add(key)
-                output.append({
-                    'title': n['title'],
-                    'time': n['time'].strftime('%Y-%m-%d %H:%M') if hasattr(n['time'], 'strftime') else str(n['time']),
-                    'url': ''
-                })
-        output.sort(key=lambda x: x['time'], reverse=True)
-        print(json.dumps(output[:20], ensure_ascii=False))
+        print(json.dumps(to_json_items(all_news), ensure_ascii=False))
         return
     
     # 普通模式
@@ -252,7 +268,7 @@ def main():
         
         print(f"\n💾 已保存: {md}")
     else:
-        print("\n⚠️ 未提取到新闻，请检查 screenshots/cls_page.html")
+        print("\n⚠️ 未提取到新闻，请检查 screenshots/ 下的调试快照")
     
     print(f"⏱️ 耗时: {elapsed:.1f}s")
 
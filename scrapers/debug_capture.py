@@ -0,0 +1,198 @@
+"""
+调试快照
+爬虫在关键步骤把页面 HTML（及提取结果）存进内存，只有采集出错或提取为 0 条时
+才连同最终截图打包成 zip 落盘；文件名带时间、数据源和随机 ID，并发运行不会互相覆盖。
+落盘目录按总大小做环形淘汰，超过上限先删最旧的。
+
+DEBUG_CAPTURE=failure（默认，只在失败时落盘）| always（每次都落盘并截图，调试用）| off
+"""
+
+import io
+import os
+import json
+import time
+import uuid
+import zipfile
+import threading
+from collections import deque
+
+MODES = ("off", "failure", "always")
+
+CAPTURE_MODE = os.environ.get("DEBUG_CAPTURE", "failure").strip().lower()
+if CAPTURE_MODE not in MODES:
+    CAPTURE_MODE = "failure"
+
+CAPTURE_DIR = os.environ.get("DEBUG_CAPTURE_DIR", "screenshots")
+CAPTURE_MAX_MB = float(os.environ.get("DEBUG_CAPTURE_MAX_MB", "50"))
+# 每次运行在内存中保留的最近快照数
+CAPTURE_KEEP = int(os.environ.get("DEBUG_CAPTURE_KEEP", "5"))
+
+
+class CaptureStats:
+    """落盘次数、字节数、淘汰数（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.persisted = 0
+        self.bytes_written = 0
+        self.evicted = 0
+        self.last_file = None
+
+    def add(self, persisted: bool = False, size: int = 0, path: str = None, evicted: int = 0):
+        with self._lock:
+            self.runs += 1
+            if persisted:
+                self.persisted += 1
+                self.bytes_written += size
+                self.last_file = path
+            self.evicted += evicted
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "mode": CAPTURE_MODE,
+                "dir": CAPTURE_DIR,
+                "max_mb": CAPTURE_MAX_MB,
+                "runs": self.runs,
+                "persisted": self.persisted,
+                "bytes_written": self.bytes_written,
+                "evicted": self.evicted,
+                "last_file": self.last_file,
+                "dir_bytes": _dir_size(CAPTURE_DIR),
+            }
+
+
+capture_stats = CaptureStats()
+_prune_lock = threading.Lock()
+
+
+def _archives(directory: str) -> list:
+    """目录下的快照包 [(mtime, size, path)]，按时间从旧到新"""
+    out = []
+    try:
+        for name in os.listdir(directory):
+            if name.endswith(".zip"):
+                path = os.path.join(directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                out.append((st.st_mtime, st.st_size, path))
+    except OSError:
+        pass
+    out.sort()
+    return out
+
+
+def _dir_size(directory: str) -> int:
+    return sum(size for _, size, _ in _archives(directory))
+
+
+def prune(directory: str = None, max_bytes: int = None) -> int:
+    """环形淘汰：总大小超过上限时从最旧的开始删除，返回删除个数"""
+    directory = directory or CAPTURE_DIR
+    max_bytes = int(CAPTURE_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+    removed = 0
+    with _prune_lock:
+        archives = _archives(directory)
+        total = sum(size for _, size, _ in archives)
+        for _, size, path in archives:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+class Capture:
+    """单次采集的调试快照，由 start() 创建"""
+
+    def __init__(self, source: str, mode: str = None):
+        self.source = source
+        self.mode = mode or CAPTURE_MODE
+        self.run_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{source}_{uuid.uuid4().hex[:8]}"
+        self.snapshots = deque(maxlen=max(CAPTURE_KEEP, 1))
+        self.error = None
+
+    def snapshot(self, page, label: str, data=None):
+        """记录当前页面 HTML（always 模式同时截图），data 为可 JSON 序列化的附加信息"""
+        if self.mode == "off":
+            return
+        entry = {"label": label, "time": time.time(), "url": None, "html": None, "png": None, "data": data}
+        try:
+            entry["url"] = page.url
+            entry["html"] = page.content()
+            if self.mode == "always":
+                entry["png"] = page.screenshot(full_page=True)
+        except Exception:
+            pass
+        self.snapshots.append(entry)
+
+    def fail(self, error):
+        """记录采集异常，finish 时据此决定是否落盘"""
+        self.error = str(error)
+
+    def finish(self, page, items: int) -> str:
+        """采集结束（页面关闭前）调用：失败或 0 条时落盘，返回快照包路径（未落盘为 None）"""
+        if self.mode == "off":
+            return None
+        if self.mode == "failure" and self.error is None and items > 0:
+            capture_stats.add()
+            return None
+
+        final_png = None
+        try:
+            final_png = page.screenshot(full_page=True)
+        except Exception:
+            pass
+        path = self._write(items, final_png)
+        evicted = prune() if path else 0
+        size = os.path.getsize(path) if path and os.path.exists(path) else 0
+        capture_stats.add(persisted=path is not None, size=size, path=path, evicted=evicted)
+        if path:
+            print(f"🐞 调试快照: {path}")
+        return path
+
+    def _write(self, items: int, final_png) -> str:
+        buf = io.BytesIO()
+        meta = {
+            "source": self.source,
+            "run_id": self.run_id,
+            "items": items,
+            "error": self.error,
+            "snapshots": [],
+        }
+        with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for i, snap in enumerate(self.snapshots, 1):
+                prefix = f"{i:02d}_{snap['label']}"
+                meta["snapshots"].append({"label": snap["label"], "time": snap["time"], "url": snap["url"]})
+                if snap["html"] is not None:
+                    zf.writestr(f"{prefix}.html", snap["html"])
+                if snap["png"] is not None:
+                    zf.writestr(f"{prefix}.png", snap["png"], compress_type=zipfile.ZIP_STORED)
+                if snap["data"] is not None:
+                    zf.writestr(f"{prefix}.json", json.dumps(snap["data"], ensure_ascii=False, indent=2, default=str))
+            if final_png is not None:
+                zf.writestr("final.png", final_png, compress_type=zipfile.ZIP_STORED)
+            zf.writestr("meta.json", json.dumps(meta, ensure_ascii=False, indent=2))
+
+        path = os.path.join(CAPTURE_DIR, f"{self.run_id}.zip")
+        try:
+            os.makedirs(CAPTURE_DIR, exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(buf.getvalue())
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️ 调试快照写入失败: {e}")
+            return None
+        return path
+
+
+def start(source: str) -> Capture:
+    return Capture(source)
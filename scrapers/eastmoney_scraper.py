@@ -5,84 +5,109 @@ URL: https://so.eastmoney.com/news/s?keyword=关键词&type=content
 直接打开就是 资讯>正文，翻页点底栏页码
 """
 
+import os
 import sys
 import time
 from datetime import datetime
-from playwright.sync_api import sync_playwright
 
-def scrape_eastmoney(keyword: str, target_count: int = 20):
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers import phases, router, sites, waits
+from scrapers.browser_pool import lease_context
+from scrapers.registry import register
+
+# 每条 .news_item：首行标题，其后为"时间 - 摘要"，链接在 .news_item_url
+EXTRACT_JS = """() => {
+    var results = [];
+    document.querySelectorAll('.news_item').forEach(function(item) {
+        var text = item.innerText || '';
+        var lines = text.split('\\n');
+        var title = lines[0].trim();
+
+        // 摘要（第二行通常是时间+摘要）
+        var summary = '';
+        if (lines.length > 1) {
+            // 跳过时间，取摘要内容
+            var content = lines.slice(1).join(' ').trim();
+            // 去掉时间和链接
+            content = content.replace(/\\d{4}-\\d{2}-\\d{2}\\s+\\d{2}:\\d{2}:\\d{2}\\s*-?/g, '');
+            content = content.replace(/http[^\\s]+/g, '');
+            summary = content.trim().substring(0, 200);
+        }
+
+        // 时间
+        var time = '';
+        var m = text.match(/(\\d{4}-\\d{2}-\\d{2}\\s+\\d{2}:\\d{2}:\\d{2})/);
+        if (m) time = m[1];
+
+        // 链接
+        var urlEl = item.querySelector('.news_item_url');
+        var url = urlEl ? urlEl.innerText.trim() : '';
+
+        if (title.length > 5) results.push({
+            title: title, 
+            summary: summary,
+            time: time, 
+            url: url
+        });
+    });
+    return results;
+}"""
+
+
+@register("eastmoney", name="东方财富", time="~10秒", incremental=True)
+def scrape_eastmoney(keyword: str, target_count: int = 20, context=None, watermark=None):
+    """采集东方财富资讯，context 为浏览器池租用的上下文，
+    watermark 为增量状态（按相关性排序，整页都是已采集条目时停止翻页）"""
     results = []
     seen = set()
     
-    with sync_playwright() as p:
-        print("🚀 启动浏览器...")
-        browser = p.chromium.launch(headless=True, args=['--no-sandbox'])
-        page = browser.new_page(viewport={'width': 1920, 'height': 1080})
+    with lease_context(context) as ctx:
+        page = ctx.new_page()
+        route_stats = router.install(page, "eastmoney")
         
         try:
             # 直接访问，不需要点Tab
-            url = f"https://so.eastmoney.com/news/s?keyword={keyword}&type=content"
+            url = sites.site_url("eastmoney", f"/news/s?keyword={keyword}&type=content")
             print(f"🌍 访问: {url}")
-            page.goto(url, wait_until='domcontentloaded', timeout=60000)
-            time.sleep(3)
+            with phases.phase("navigate"):
+                page.goto(url, wait_until='domcontentloaded', timeout=60000)
+                waits.wait_for_selector(page, '.news_item', timeout=8, label='eastmoney.results')
             
             page_num = 1
             while len(results) < target_count:
                 print(f"📖 第 {page_num} 页...")
                 
                 # 采集 .news_item
-                items = page.evaluate("""() => {
-                    var results = [];
-                    document.querySelectorAll('.news_item').forEach(function(item) {
-                        var text = item.innerText || '';
-                        var lines = text.split('\\n');
-                        var title = lines[0].trim();
-                        
-                        // 摘要（第二行通常是时间+摘要）
-                        var summary = '';
-                        if (lines.length > 1) {
-                            // 跳过时间，取摘要内容
-                            var content = lines.slice(1).join(' ').trim();
-                            // 去掉时间和链接
-                            content = content.replace(/\\d{4}-\\d{2}-\\d{2}\\s+\\d{2}:\\d{2}:\\d{2}\\s*-?/g, '');
-                            content = content.replace(/http[^\\s]+/g, '');
-                            summary = content.trim().substring(0, 200);
-                        }
-                        
-                        // 时间
-                        var time = '';
-                        var m = text.match(/(\\d{4}-\\d{2}-\\d{2}\\s+\\d{2}:\\d{2}:\\d{2})/);
-                        if (m) time = m[1];
-                        
-                        // 链接
-                        var urlEl = item.querySelector('.news_item_url');
-                        var url = urlEl ? urlEl.innerText.trim() : '';
-                        
-                        if (title.length > 5) results.push({
-                            title: title, 
-                            summary: summary,
-                            time: time, 
-                            url: url
-                        });
-                    });
-                    return results;
-                }""")
+                with phases.phase("extract"):
+                    items = page.evaluate(EXTRACT_JS)
                 
+                fresh = []
                 for item in items:
                     if item['title'][:30] not in seen:
                         seen.add(item['title'][:30])
-                        results.append(item)
+                        fresh.append(item)
+                if watermark is not None:
+                    watermark.tick()
+                    fresh = watermark.split(fresh)
+                results.extend(fresh)
                 
                 print(f"   本页: {len(items)} 条, 总计: {len(results)} 条")
                 
                 if len(results) >= target_count:
                     break
                 
+                if watermark is not None and watermark.should_stop(ordered=False):
+                    print("   ⏹️ 本页均已采集过，停止翻页")
+                    break
+                
                 # 点击下一页页码
                 page_num += 1
                 try:
-                    page.click(f'a:text-is("{page_num}")', timeout=3000)
-                    time.sleep(2)
+                    with phases.phase("scroll"):
+                        prev_first = waits.first_text(page, '.news_item')
+                        page.click(f'a:text-is("{page_num}")', timeout=3000)
+                        waits.wait_for_text_change(page, '.news_item', prev_first, timeout=5, label='eastmoney.page')
                 except:
                     print("   翻页结束")
                     break
@@ -90,7 +115,8 @@ def scrape_eastmoney(keyword: str, target_count: int = 20):
         except Exception as e:
             print(f"❌ 错误: {e}")
         finally:
-            browser.close()
+            print(route_stats.summary())
+            page.close()
     
     # 保持页面顺序（默认按相关性排序）
     return results[:target_count]
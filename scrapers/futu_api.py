@@ -0,0 +1,148 @@
+"""
+富途搜索接口直连
+网页搜索时调用的后端直接返回 JSON（data.news / data.report，见 futu_api_dump.json），
+这里用连接池 HTTP 客户端直接请求并分页，结果交给各爬虫已有的 parse_api 解析，
+失败时由调用方退回浏览器流程。
+
+接口地址优先级：环境变量 FUTU_SEARCH_API（可含 {keyword} / {page}）> 浏览器流程实际观察到的地址。
+浏览器流程每次成功解析搜索响应都会记下真实 URL（remember_endpoint），
+之后直连时沿用它的参数，只替换关键词和页码；两者都没有时直连不可用，直接走浏览器。
+"""
+
+import os
+import json
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scrapers import phases
+from scrapers.router import route_totals
+
+# 浏览器流程观察到的真实接口地址，持久化以便重启后沿用
+ENDPOINT_FILE = os.environ.get(
+    "FUTU_ENDPOINT_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output", "futu_search_endpoint.json"),
+)
+
+# 可能的页码参数名
+PAGE_PARAMS = ("page", "pageNo", "pageNum", "pageIndex")
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0",
+    "Referer": "https://news.futunn.com/main/live",
+    "Accept": "application/json, text/plain, */*",
+}
+
+_session = None
+_session_lock = threading.Lock()
+_endpoint = None  # (url, keyword_param)
+
+
+def session() -> requests.Session:
+    """进程内共享的连接池客户端"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=1)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            s.headers.update(HEADERS)
+            _session = s
+        return _session
+
+
+def remember_endpoint(url: str, keyword: str):
+    """记录浏览器流程中返回了搜索结果的接口地址（需要能找到关键词参数）"""
+    global _endpoint
+    params = parse_qsl(urlsplit(url).query, keep_blank_values=True)
+    keyword_param = next((k for k, v in params if v == keyword), None)
+    if keyword_param is None or (_endpoint and _endpoint[0] == url):
+        return
+    _endpoint = (url, keyword_param)
+    try:
+        os.makedirs(os.path.dirname(ENDPOINT_FILE), exist_ok=True)
+        with open(ENDPOINT_FILE, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "keyword_param": keyword_param}, f, ensure_ascii=False)
+    except OSError:
+        pass
+
+
+def _load_endpoint():
+    global _endpoint
+    if _endpoint is None and os.path.exists(ENDPOINT_FILE):
+        try:
+            with open(ENDPOINT_FILE, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            _endpoint = (saved["url"], saved["keyword_param"])
+        except (OSError, ValueError, KeyError):
+            pass
+    return _endpoint
+
+
+def build_url(keyword: str, page: int):
+    """按优先级选接口地址，填入关键词和页码；返回 (url, 是否支持翻页)，地址未知返回 (None, False)"""
+    override = os.environ.get("FUTU_SEARCH_API")
+    if override:
+        return override.format(keyword=keyword, page=page), "{page}" in override
+
+    learned = _load_endpoint()
+    if learned is None:
+        return None, False
+
+    url, keyword_param = learned
+    parts = urlsplit(url)
+    params = []
+    paged = False
+    for k, v in parse_qsl(parts.query, keep_blank_values=True):
+        if k == keyword_param:
+            v = keyword
+        elif k in PAGE_PARAMS:
+            v = str(page)
+            paged = True
+        params.append((k, v))
+    return urlunsplit(parts._replace(query=urlencode(params))), paged
+
+
+def fetch_pages(keyword: str, parse, results: dict, target_count: int, max_pages: int = 5, timeout: float = 10,
+                watermark=None) -> bool:
+    """逐页请求接口，每页交给 parse(data) 解析进 results
+
+    watermark 为增量状态：每页解析后删掉已采集过的条目，碰到已知条目即停止翻页
+    返回 True 表示接口可用（至少一页 code == 0）；网络错误、非 JSON、code != 0 返回 False
+    """
+    ok = False
+    seen = set()
+    s = session()
+    for page in range(1, max_pages + 1):
+        url, paged = build_url(keyword, page)
+        if url is None:
+            return False
+        try:
+            # 第一页相当于浏览器流程的打开 + 搜索，之后每页相当于一轮翻页
+            with phases.phase("search" if page == 1 else "scroll"):
+                resp = s.get(url, timeout=timeout)
+                resp.raise_for_status()
+                data = resp.json()
+        except (requests.RequestException, ValueError):
+            return ok
+        source = phases.current_source()
+        if source is not None:
+            route_totals.add(source, "bytes_allowed", len(resp.content))
+        if not isinstance(data, dict) or data.get("code", 0) != 0:
+            return ok
+        ok = True
+
+        before = len(results)
+        with phases.phase("extract"):
+            parse(data)
+        if watermark is not None:
+            watermark.tick()
+            watermark.prune_known(results, seen)
+            if watermark.should_stop():
+                break
+        if not paged or len(results) >= target_count or len(results) == before:
+            break
+    return ok
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+富途新闻 + 研报组采集
+两个爬虫的浏览器流程只差子标签和解析的字段：这里在同一个会话里只搜索一次，
+再依次切到 新闻、研报 子标签各自滚动采集，结果按数据源分开返回。
+
+搜索响应（同时带 news / report）两边都解析；切到某个子标签后，接口响应只交给该数据源，
+与两个爬虫各自运行时看到的响应一致。
+"""
+
+import os
+import re
+import sys
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers import futu_api, futu_report_scraper, futu_scraper, phases
+from scrapers.browser_pool import lease_context
+from scrapers.futu_session import FutuSession
+from scrapers.registry import register_group
+from scrapers.supervisor import supervisor
+
+# (数据源, 子标签, 接口 URL 模式, parse_api, parse_dom)，按采集顺序
+TABS = (
+    ("futu", "新闻", r"search|news", futu_scraper.parse_api, futu_scraper.parse_dom),
+    ("futu_report", "研报", r"search|report|research", futu_report_scraper.parse_api, futu_report_scraper.parse_dom),
+)
+
+
+@register_group("futu_search", ("futu", "futu_report"), session=FutuSession)
+def collect_futu(keyword: str, target_count: int = 50, session=None, context=None, watermarks=None) -> dict:
+    """一次搜索采集 新闻 和 研报，返回 {"futu": [...], "futu_report": [...]}；
+    session 为浏览器池常驻的搜索会话，没有时在 context（独立运行时为空）上建一次性会话，
+    watermarks 为 {数据源: 增量状态}"""
+    if session is not None:
+        return _collect(session, keyword, target_count, watermarks or {})
+
+    # 独立运行时启动前回收之前崩溃的运行残留的浏览器
+    if context is None:
+        supervisor.reap_orphans()
+
+    with lease_context(context) as ctx:
+        session = FutuSession(context=ctx)
+        try:
+            return _collect(session, keyword, target_count, watermarks or {})
+        finally:
+            session.close()
+
+
+def _collect(session, keyword: str, target_count: int, watermarks: dict) -> dict:
+    results = {source: {} for source, *_ in TABS}
+    active = []  # 当前子标签对应的数据源；为空时还在搜索，响应交给所有数据源
+
+    # API拦截器
+    def on_response(response):
+        try:
+            if response.status != 200:
+                return
+            url = response.url
+            data = None
+            for source, _, pattern, parse_api, _ in TABS:
+                if (active and source != active[0]) or re.search(pattern, url) is None:
+                    continue
+                if data is None:
+                    data = response.json()
+                before = len(results[source])
+                parse_api(data, results[source], keyword)
+                # 记下真实接口地址，供下次直连
+                if len(results[source]) > before:
+                    futu_api.remember_endpoint(url, keyword)
+        except Exception:
+            pass
+
+    try:
+        session.prepare("futu")
+        with session.listening(on_response):
+            session.search(keyword, "futu")
+            for source, sub, pattern, _, parse_dom in TABS:
+                active[:] = [source]
+                # 切标签之后的阶段耗时、流量记在各自数据源名下
+                with phases.tracking(source):
+                    try:
+                        session.open_tab(sub, pattern, source)
+                        session.harvest(results[source], parse_dom, keyword, target_count,
+                                        watermarks.get(source), source)
+                    except Exception as e:
+                        print(f"❌ {sub}: {e}")
+                        session.broken = True  # 下次使用前重新打开页面
+    except KeyboardInterrupt:
+        print("\n🛑 用户中断")
+    except Exception as e:
+        print(f"❌ 错误: {e}")
+        session.broken = True
+    finally:
+        if session.route_stats is not None:
+            print(session.route_stats.summary())
+
+    return {source: list(items.values()) for source, items in results.items()}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("用法: python futu_combined.py <关键词> [数量] [--json]")
+        print("示例: python futu_combined.py 小米集团 50")
+        sys.exit(1)
+
+    keyword = sys.argv[1]
+    limit = next((int(a) for a in sys.argv[2:] if a.isdigit()), 20)
+    data = collect_futu(keyword, limit)
+
+    if "--json" in sys.argv:
+        print(json.dumps(data, ensure_ascii=False))
+        return
+    for source, items in data.items():
+        print(f"✅ {source}: {len(items)} 条")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,19 @@
 关键: 使用 dispatchEvent 触发点击，子Tab选择器是 web_search-sec-tab-li
 """
 
+import os
 import sys
 import time
 import signal
 from datetime import datetime
-from playwright.sync_api import sync_playwright
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers import futu_api
+from scrapers.browser_pool import lease_context
+from scrapers.futu_session import FutuSession
+from scrapers.supervisor import supervisor
+from scrapers.registry import register
 
 # 全局浏览器引用，用于信号处理
 _browser = None
@@ -25,157 +33,77 @@ def signal_handler(signum, frame):
     sys.exit(1)
 
 
-# 注册信号处理器
-signal.signal(signal.SIGTERM, signal_handler)
-signal.signal(signal.SIGINT, signal_handler)
-
+def fetch_futu_direct(keyword: str, target_count: int = 50, watermark=None) -> list:
+    """直连搜索接口（不启动浏览器），接口不可用时返回空列表；watermark 为增量状态"""
+    results = {}
+    ok = futu_api.fetch_pages(
+        keyword, lambda data: parse_api(data, results, keyword), results, target_count,
+        watermark=watermark,
+    )
+    if ok:
+        print(f"⚡ 接口直连: {len(results)} 条")
+    return list(results.values())
 
-def kill_existing_browsers():
-    """清理可能残留的浏览器进程"""
-    import subprocess
 
-    try:
-        # 杀掉残留的 chromium 进程
-        subprocess.run(
-            ["pkill", "-9", "-f", "chromium"], capture_output=True, timeout=5
-        )
-        subprocess.run(["pkill", "-9", "-f", "chrome"], capture_output=True, timeout=5)
-        time.sleep(0.5)
-    except:
-        pass
+@register("futu", name="富途新闻", time="~17秒", direct=fetch_futu_direct, incremental=True, session=FutuSession)
+def scrape_futu(keyword: str, target_count: int = 50, timeout: int = 120, context=None, watermark=None, session=None):
+    """采集富途资讯 - 资讯>新闻子栏，session 为浏览器池常驻的搜索会话（换关键词不重新打开页面），
+    没有会话时在 context（浏览器池租用的上下文，独立运行时为空）上建一次性会话，
+    watermark 为增量状态（碰到上次已采集的条目即停止滚动）"""
+    global _browser
+    if session is not None:
+        return collect_news(session, keyword, target_count, watermark)
 
+    # 独立运行时启动前回收之前崩溃的运行残留的浏览器（只结束登记者已退出的，不影响并发运行的采集）
+    if context is None:
+        supervisor.reap_orphans()
 
-def scrape_futu(keyword: str, target_count: int = 50, timeout: int = 120):
-    """采集富途资讯 - 资讯>新闻子栏"""
-    results = {}
-    global _browser
+    with lease_context(context) as ctx:
+        if context is None:
+            _browser = ctx.browser
+        session = FutuSession(context=ctx)
+        try:
+            return collect_news(session, keyword, target_count, watermark)
+        finally:
+            session.close()
 
-    # 启动前清理残留浏览器
-    kill_existing_browsers()
 
-    with sync_playwright() as p:
-        print("🚀 启动浏览器...")
-        browser = p.chromium.launch(headless=True, args=["--no-sandbox"])
-        _browser = browser
-        context = browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0",
-        )
-        page = context.new_page()
-
-        # API拦截器
-        def on_response(response):
-            try:
-                if response.status == 200:
-                    url = response.url
-                    if "search" in url or "news" in url:
-                        try:
-                            data = response.json()
-                            parse_api(data, results, keyword)
-                        except:
-                            pass
-            except:
-                pass
-
-        page.on("response", on_response)
+def collect_news(session, keyword: str, target_count: int = 50, watermark=None) -> list:
+    """在会话页面上搜索并滚动采集 资讯>新闻"""
+    results = {}
 
+    # API拦截器
+    def on_response(response):
         try:
-            # 1. 访问首页
-            print("🌍 访问: https://news.futunn.com/main/live")
-            page.goto(
-                "https://news.futunn.com/main/live",
-                wait_until="domcontentloaded",
-                timeout=60000,
-            )
-            time.sleep(3)
-
-            # 2. 输入搜索词
-            print(f"🔍 搜索: {keyword}")
-            search = page.locator("input.web_search-input").first
-            search.click(force=True)
-            time.sleep(0.3)
-            search.fill(keyword)
-            time.sleep(3)
-
-            # 3. 使用JS点击资讯Tab (关键: dispatchEvent)
-            print("👉 点击 '资讯' Tab...")
-            page.evaluate("""() => {
-                var tabs = document.querySelectorAll('.web_search-tab-li');
-                for (var i = 0; i < tabs.length; i++) {
-                    if (tabs[i].innerText && tabs[i].innerText.indexOf('资讯') >= 0) {
-                        var event = new MouseEvent('click', {
-                            view: window, bubbles: true, cancelable: true
-                        });
-                        tabs[i].dispatchEvent(event);
-                        return;
-                    }
-                }
-            }""")
-            time.sleep(2)
-
-            # 4. 点击新闻子Tab (class: web_search-sec-tab-li)
-            print("👉 点击 '新闻' 子Tab...")
-            page.evaluate("""() => {
-                var tabs = document.querySelectorAll('.web_search-sec-tab-li');
-                for (var i = 0; i < tabs.length; i++) {
-                    if (tabs[i].innerText && tabs[i].innerText.trim() === '新闻') {
-                        var event = new MouseEvent('click', {
-                            view: window, bubbles: true, cancelable: true
-                        });
-                        tabs[i].dispatchEvent(event);
-                        return;
-                    }
-                }
-            }""")
-            time.sleep(2)
-
-            # 检查弹窗状态
-            popup = page.evaluate("""() => {
-                var panel = document.querySelector('.web_search-res-panel');
-                return panel ? panel.offsetHeight > 0 : false;
-            }""")
-
-            if popup:
-                print(f"✅ 弹窗打开，开始滚动采集 (目标: {target_count})...")
-                no_new = 0
-
-                for i in range(100):
-                    prev = len(results)
-
-                    # 采集DOM
-                    parse_dom(page, results, keyword)
-
-                    curr = len(results)
-                    print(f"📊 [第{i + 1}轮] 总数: {curr} (+{curr - prev})")
-
-                    if curr >= target_count:
-                        print(f"✅ 达到目标")
-                        break
-
-                    if curr == prev:
-                        no_new += 1
-                    else:
-                        no_new = 0
-
-                    if no_new >= 10:
-                        print("🛑 无更多数据")
-                        break
-
-                    # 滚动弹窗内容
-                    page.evaluate("""() => {
-                        var panel = document.querySelector('.web_search-res-panel');
-                        if (panel) panel.scrollTop += 500;
-                    }""")
-                    time.sleep(1)
-            else:
-                print("⚠️ 弹窗已关闭")
+            if response.status == 200:
+                url = response.url
+                if "search" in url or "news" in url:
+                    try:
+                        data = response.json()
+                        before = len(results)
+                        parse_api(data, results, keyword)
+                        # 记下真实接口地址，供下次直连
+                        if len(results) > before:
+                            futu_api.remember_endpoint(url, keyword)
+                    except:
+                        pass
+        except:
+            pass
 
-        except KeyboardInterrupt:
-            print("\n🛑 用户中断")
-        except Exception as e:
-            print(f"❌ 错误: {e}")
-        finally:
-            browser.close()
+    try:
+        session.prepare("futu")
+        with session.listening(on_response):
+            session.search(keyword, "futu")
+            session.open_tab("新闻", r"search|news", "futu")
+            session.harvest(results, parse_dom, keyword, target_count, watermark, "futu")
+    except KeyboardInterrupt:
+        print("\n🛑 用户中断")
+    except Exception as e:
+        print(f"❌ 错误: {e}")
+        session.broken = True  # 下次使用前重新打开页面
+    finally:
+        if session.route_stats is not None:
+            print(session.route_stats.summary())
 
     return list(results.values())
 
@@ -208,7 +136,7 @@ def parse_api(data, results, keyword):
         if uid in results:
             continue
 
-        ts = item.get("time") or item.get("publishTime") or 0
+        ts = item.get("time") or item.get("publishTime") or item.get("timestamp") or 0
         try:
             if isinstance(ts, (int, float)) and ts > 1000000000:
                 time_str = datetime.fromtimestamp(int(ts)).strftime("%Y-%m-%d %H:%M")
@@ -219,6 +147,7 @@ def parse_api(data, results, keyword):
 
         results[uid] = {
             "title": title,
+            "id": item.get("newsUniqueId") or "",
             "url": item.get("url", ""),
             "time": time_str,
             "source": "API",
@@ -268,8 +197,12 @@ def parse_dom(page, results, keyword):
 
 
 def main():
+    # 注册信号处理器（仅命令行运行时；被服务端导入时不接管进程信号）
+    signal.signal(signal.SIGTERM, signal_handler)
+    signal.signal(signal.SIGINT, signal_handler)
+
     if len(sys.argv) < 2:
-        print("用法: python futu_scraper.py <关键词> [数量] [--json]")
+        print("用法: python futu_scraper.py <关键词> [数量] [--json] [--browser]")
         print("示例: python futu_scraper.py 小米集团 50")
         sys.exit(1)
 
@@ -277,13 +210,21 @@ def main():
     keyword = sys.argv[1]
     limit = 20
     json_mode = False
+    browser_only = False
 
     for arg in sys.argv[2:]:
         if arg == "--json":
             json_mode = True
+        elif arg == "--browser":
+            browser_only = True
         elif arg.isdigit():
             limit = int(arg)
 
+    def collect():
+        """先直连接口，拿不到数据再走浏览器"""
+        data = [] if browser_only else fetch_futu_direct(keyword, limit)
+        return data or scrape_futu(keyword, limit)
+
     if keyword == "01810":
         keyword = "小米集团"
 
@@ -294,7 +235,7 @@ def main():
 
         old_stdout = sys_module.stdout
         sys_module.stdout = io.StringIO()
-        data = scrape_futu(keyword, limit)
+        data = collect()
         sys_module.stdout = old_stdout
         print(json_lib.dumps(data, ensure_ascii=False))
         return
@@ -305,7 +246,7 @@ def main():
     print(f"{'=' * 50}")
 
     start = time.time()
-    data = scrape_futu(keyword, limit)
+    data = collect()
     elapsed = time.time() - start
 
     if data:
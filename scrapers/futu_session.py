@@ -0,0 +1,250 @@
+"""
+富途常驻搜索会话
+富途新闻 / 研报的浏览器流程前几秒都花在同一段前奏上：打开直播页、等搜索框、输入关键词、点"资讯"。
+浏览器池每个工作线程保留一个停在直播页的会话（BrowserPool.run(..., session=FutuSession)），
+换关键词时只重填搜索框、重新切标签；页面异常或过旧时才重新打开，会话整体按时长 / 次数回收。
+
+    FUTU_SESSION_REFRESH   页面打开超过该秒数后，下次搜索前重新打开（默认 300）
+    FUTU_SESSION_MAX_AGE   会话（BrowserContext）存活超过该秒数后回收重建（默认 1800）
+    FUTU_SESSION_MAX_USES  会话搜索超过该次数后回收重建（默认 100）
+
+命令行独立运行或没有会话时，爬虫在租用的 context 上建一次性会话，流程与常驻会话相同。
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+from scrapers import phases, router, sites, waits
+from scrapers.browser_pool import new_context
+
+REFRESH_SECONDS = float(os.environ.get("FUTU_SESSION_REFRESH", "300"))
+MAX_AGE = float(os.environ.get("FUTU_SESSION_MAX_AGE", "1800"))
+MAX_USES = int(os.environ.get("FUTU_SESSION_MAX_USES", "100"))
+
+SEARCH_INPUT = "input.web_search-input"
+
+# 按文字点击标签（关键: dispatchEvent，直接 click 不触发富途的处理函数）
+CLICK_TAB_JS = """([selector, text, exact]) => {
+    var tabs = document.querySelectorAll(selector);
+    for (var i = 0; i < tabs.length; i++) {
+        var t = (tabs[i].innerText || '').trim();
+        if (exact ? t === text : t.indexOf(text) >= 0) {
+            var event = new MouseEvent('click', {
+                view: window, bubbles: true, cancelable: true
+            });
+            tabs[i].dispatchEvent(event);
+            return true;
+        }
+    }
+    return false;
+}"""
+
+
+class SessionStats:
+    """常驻会话的复用情况"""
+
+    FIELDS = ("created", "searches", "reused", "navigations", "retries", "recycled")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def add(self, field: str):
+        with self._lock:
+            self._counts[field] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+
+session_stats = SessionStats()
+
+
+class FutuSession:
+    """停在富途直播页的搜索页面；browser 给出时自建并持有 context，否则使用调用方的 context（一次性）"""
+
+    def __init__(self, browser=None, context=None):
+        self.owns_context = context is None
+        self.context = new_context(browser) if context is None else context
+        self.page = None
+        self.route_stats = None
+        self.created = time.time()
+        self.loaded_at = 0.0
+        self.searches = 0
+        self.broken = False
+        self.keyword = None
+        self.shown = None  # 结果面板当前显示的 (关键词, 子标签)
+        if self.owns_context:
+            session_stats.add("created")
+
+    # ---------- 生命周期 ----------
+
+    def usable(self) -> bool:
+        """浏览器池每次复用前调用：超过存活时长或搜索次数的会话回收重建"""
+        if time.time() - self.created < MAX_AGE and self.searches < MAX_USES:
+            return True
+        session_stats.add("recycled")
+        return False
+
+    def close(self):
+        try:
+            if self.page is not None:
+                self.page.close()
+            if self.owns_context:
+                self.context.close()
+        except Exception:
+            pass
+        self.page = None
+
+    def healthy(self) -> bool:
+        """页面还在、停在直播页、搜索框存在，且打开时间不超过 REFRESH_SECONDS"""
+        page = self.page
+        if page is None or self.broken or page.is_closed():
+            return False
+        if time.time() - self.loaded_at > REFRESH_SECONDS:
+            return False
+        if not page.url.startswith(sites.site_url("futu", "/main/live")):
+            return False
+        try:
+            return waits.count(page, SEARCH_INPUT) > 0
+        except Exception:
+            return False
+
+    def _navigate(self, label: str):
+        if self.page is None or self.page.is_closed():
+            self.page = self.context.new_page()
+            self.page.on("crash", lambda _: setattr(self, "broken", True))
+            self.route_stats = router.install(self.page, "futu")
+        url = sites.site_url("futu", "/main/live")
+        print(f"🌍 访问: {url}")
+        with phases.phase("navigate"):
+            self.page.goto(url, wait_until="domcontentloaded", timeout=60000)
+            waits.wait_for_selector(self.page, SEARCH_INPUT, timeout=8, label=f"{label}.load")
+        self.loaded_at = time.time()
+        self.broken = False
+        self.shown = None
+        session_stats.add("navigations")
+
+    # ---------- 操作 ----------
+
+    @contextmanager
+    def listening(self, handler):
+        """本次采集期间监听搜索接口响应"""
+        page = self.page
+        page.on("response", handler)
+        try:
+            yield
+        finally:
+            try:
+                page.remove_listener("response", handler)
+            except Exception:
+                pass
+
+    def prepare(self, label: str):
+        """需要时打开 / 重新打开直播页，返回页面"""
+        if self.healthy():
+            session_stats.add("reused")
+        else:
+            self._navigate(label)
+        return self.page
+
+    def search(self, keyword: str, label: str) -> bool:
+        """重填搜索框（fill 会替换原有内容），等搜索标签出现；没出现时重新打开页面再试一次"""
+        self.searches += 1
+        session_stats.add("searches")
+        for attempt in range(2):
+            print(f"🔍 搜索: {keyword}")
+            with phases.phase("search"):
+                search = self.page.locator(SEARCH_INPUT).first
+                search.click(force=True)
+                with waits.expect_response(self.page, r"search", timeout=5, label=f"{label}.search"):
+                    search.fill(keyword)
+                if waits.wait_for_selector(self.page, ".web_search-tab-li", timeout=3, label=f"{label}.tabs"):
+                    self.keyword = keyword
+                    return True
+            if attempt == 0:
+                session_stats.add("retries")
+                self._navigate(label)
+        self.broken = True
+        return False
+
+    def open_tab(self, sub: str, pattern: str, label: str):
+        """点"资讯"再点子标签 sub，等结果面板换成本次搜索的内容"""
+        print(f"👉 点击 '资讯' > '{sub}'...")
+        page = self.page
+        with phases.phase("tab"):
+            page.evaluate(CLICK_TAB_JS, [".web_search-tab-li", "资讯", False])
+            waits.wait_for_selector(page, ".web_search-sec-tab-li", timeout=4, label=f"{label}.tab")
+        with phases.phase("tab"):
+            prev = waits.first_text(page, ".web_search-res-panel a")
+            with waits.expect_response(page, pattern, timeout=3, label=f"{label}.subtab"):
+                page.evaluate(CLICK_TAB_JS, [".web_search-sec-tab-li", sub, True])
+            if prev and self.shown != (self.keyword, sub):
+                # 常驻会话里面板还留着上一次的结果，等它被替换（同一关键词、同一标签时内容本来就一样）
+                waits.wait_for_text_change(page, ".web_search-res-panel a", prev, timeout=3, label=f"{label}.refresh")
+            page.evaluate("""() => {
+                var panel = document.querySelector('.web_search-res-panel');
+                if (panel) panel.scrollTop = 0;
+            }""")
+        self.shown = (self.keyword, sub)
+
+    def harvest(self, results: dict, parse_dom, keyword: str, target_count: int, watermark=None, label: str = "futu"):
+        """结果面板打开时逐轮 parse_dom 提取并滚动面板，直到达到目标、连续无新条目或碰到水位线"""
+        page = self.page
+
+        # 检查弹窗状态
+        popup = page.evaluate("""() => {
+            var panel = document.querySelector('.web_search-res-panel');
+            return panel ? panel.offsetHeight > 0 : false;
+        }""")
+
+        if popup:
+            print(f"✅ 弹窗打开，开始滚动采集 (目标: {target_count})...")
+            no_new = 0
+            known = set()
+
+            for i in range(100):
+                prev = len(results)
+
+                # 采集DOM
+                with phases.phase("extract"):
+                    parse_dom(page, results, keyword)
+                if watermark is not None:
+                    watermark.tick()
+                    watermark.prune_known(results, known)
+
+                curr = len(results)
+                print(f"📊 [第{i + 1}轮] 总数: {curr} (+{curr - prev})")
+
+                if curr >= target_count:
+                    print("✅ 达到目标")
+                    break
+
+                if watermark is not None and watermark.should_stop():
+                    print("⏹️ 已到上次采集位置")
+                    break
+
+                if curr == prev:
+                    no_new += 1
+                else:
+                    no_new = 0
+
+                if no_new >= 10:
+                    print("🛑 无更多数据")
+                    break
+
+                # 滚动弹窗内容，等待新链接渲染
+                with phases.phase("scroll"):
+                    prev_links = waits.count(page, ".web_search-res-panel a")
+                    page.evaluate("""() => {
+                        var panel = document.querySelector('.web_search-res-panel');
+                        if (panel) panel.scrollTop += 500;
+                    }""")
+                    waits.wait_for_count_growth(
+                        page, ".web_search-res-panel a", prev_links, timeout=1, label=f"{label}.scroll"
+                    )
+        else:
+            print("⚠️ 弹窗已关闭")
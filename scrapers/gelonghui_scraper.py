@@ -5,29 +5,71 @@ URL: https://www.gelonghui.com/search?keyword=关键词&type=news
 按页面顺序采集（已按时间倒序排列）
 """
 
+import os
 import sys
 import time
 from datetime import datetime
-from playwright.sync_api import sync_playwright
 
-def scrape_gelonghui(keyword: str, target_count: int = 20):
-    """采集格隆汇新闻 - 按页面顺序（最新在前）"""
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers import phases, router, sites, waits
+from scrapers.browser_pool import lease_context
+from scrapers.registry import register
+
+# 按 DOM 顺序取新闻链接：首行为标题，时间取"格隆汇X月X日"或"MM-DD HH:MM"
+EXTRACT_JS = """(targetCount) => {
+    var results = [];
+
+    // 按DOM顺序获取新闻链接
+    var links = document.querySelectorAll('a[href*="/news/"]');
+
+    links.forEach(function(a) {
+        var text = a.innerText || '';
+        if (text.length > 20 && text.length < 500) {
+            var lines = text.split('\\n');
+            var title = lines[0].trim();
+
+            // 提取时间
+            var time = '';
+            var match = text.match(/格隆汇(\\d{1,2}月\\d{1,2}日)/);
+            if (match) {
+                time = match[1];
+            } else {
+                match = text.match(/(\\d{1,2}-\\d{1,2}\\s+\\d{1,2}:\\d{1,2})/);
+                if (match) time = match[1];
+            }
+
+            if (title.length > 5) {
+                results.push({
+                    title: title.substring(0, 150),
+                    time: time,
+                    url: a.href
+                });
+            }
+        }
+    });
+
+    return results;
+}"""
+
+
+@register("gelonghui", name="格隆汇", time="~7秒", incremental=True)
+def scrape_gelonghui(keyword: str, target_count: int = 20, context=None, watermark=None):
+    """采集格隆汇新闻 - 按页面顺序（最新在前），context 为浏览器池租用的上下文，
+    watermark 为增量状态（碰到上次已采集的条目即停止滚动）"""
     results = []
     
-    with sync_playwright() as p:
-        print("🚀 启动浏览器...")
-        browser = p.chromium.launch(headless=True, args=['--no-sandbox'])
-        page = browser.new_page(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0'
-        )
+    with lease_context(context) as ctx:
+        page = ctx.new_page()
+        route_stats = router.install(page, "gelonghui")
         
         try:
             # 访问搜索页
-            url = f"https://www.gelonghui.com/search?keyword={keyword}&type=news"
+            url = sites.site_url("gelonghui", f"/search?keyword={keyword}&type=news")
             print(f"🌍 访问: {url}")
-            page.goto(url, wait_until='domcontentloaded', timeout=60000)
-            time.sleep(5)
+            with phases.phase("navigate"):
+                page.goto(url, wait_until='domcontentloaded', timeout=60000)
+                waits.wait_for_selector(page, 'a[href*="/news/"]', timeout=10, label='gelonghui.results')
             
             seen = set()
             
@@ -35,61 +77,41 @@ def scrape_gelonghui(keyword: str, target_count: int = 20):
             print(f"📊 采集新闻 (目标: {target_count})...")
             
             for scroll_round in range(10):
-                items = page.evaluate("""(targetCount) => {
-                    var results = [];
-                    
-                    // 按DOM顺序获取新闻链接
-                    var links = document.querySelectorAll('a[href*="/news/"]');
-                    
-                    links.forEach(function(a) {
-                        var text = a.innerText || '';
-                        if (text.length > 20 && text.length < 500) {
-                            var lines = text.split('\\n');
-                            var title = lines[0].trim();
-                            
-                            // 提取时间
-                            var time = '';
-                            var match = text.match(/格隆汇(\\d{1,2}月\\d{1,2}日)/);
-                            if (match) {
-                                time = match[1];
-                            } else {
-                                match = text.match(/(\\d{1,2}-\\d{1,2}\\s+\\d{1,2}:\\d{1,2})/);
-                                if (match) time = match[1];
-                            }
-                            
-                            if (title.length > 5) {
-                                results.push({
-                                    title: title.substring(0, 150),
-                                    time: time,
-                                    url: a.href
-                                });
-                            }
-                        }
-                    });
-                    
-                    return results;
-                }""", target_count)
+                with phases.phase("extract"):
+                    items = page.evaluate(EXTRACT_JS, target_count)
                 
+                fresh = []
                 for item in items:
                     uid = item['title'][:30]
                     if uid not in seen:
                         seen.add(uid)
-                        results.append(item)
+                        fresh.append(item)
+                if watermark is not None:
+                    watermark.tick()
+                    fresh = watermark.split(fresh)
+                results.extend(fresh)
                 
                 print(f"📊 [第{scroll_round+1}轮] 采集: {len(results)} 条")
                 
                 if len(results) >= target_count:
                     break
                 
-                # 滚动加载更多
-                page.keyboard.press("End")
-                page.mouse.wheel(0, 1000)
-                time.sleep(2)
+                if watermark is not None and watermark.should_stop():
+                    print("⏹️ 已到上次采集位置")
+                    break
+                
+                # 滚动加载更多，等待新链接出现
+                with phases.phase("scroll"):
+                    prev_links = waits.count(page, 'a[href*="/news/"]')
+                    page.keyboard.press("End")
+                    page.mouse.wheel(0, 1000)
+                    waits.wait_for_count_growth(page, 'a[href*="/news/"]', prev_links, timeout=4, label='gelonghui.scroll')
             
         except Exception as e:
             print(f"❌ 错误: {e}")
         finally:
-            browser.close()
+            print(route_stats.summary())
+            page.close()
     
     # 返回前N条（保持页面顺序）
     return results[:target_count]
@@ -0,0 +1,91 @@
+"""
+采集阶段计时
+爬虫用 with phase("navigate"): ... 标出各阶段，基准测试用 collect() 收集当前线程一次运行的各阶段耗时；
+服务端用 tracking(数据源) 标出当前线程在为哪个数据源采集，各阶段耗时交给 set_observer 登记的回调（/metrics）。
+既没有收集器也没有在 tracking 中时，phase 只多两次属性查找，不计时。
+
+阶段名：
+    launch    启动浏览器 / 创建上下文
+    navigate  打开页面并等到首屏结果
+    search    输入关键词并等待搜索响应
+    tab       切换标签 / 子标签
+    scroll    一轮滚动、加载更多或翻页（每轮记一次）
+    extract   从页面提取条目（每次提取记一次）
+    serialize 结果转为 JSON
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+
+PHASES = ("launch", "navigate", "search", "tab", "scroll", "extract", "serialize")
+
+_local = threading.local()
+_observer = None  # (数据源, 阶段, 秒) -> None
+
+
+class PhaseRecord:
+    """一次运行的各阶段耗时（秒），同一阶段可出现多次"""
+
+    def __init__(self):
+        self.durations = {}
+
+    def add(self, name: str, seconds: float):
+        self.durations.setdefault(name, []).append(seconds)
+
+    def totals(self) -> dict:
+        return {name: sum(values) for name, values in self.durations.items()}
+
+    def counts(self) -> dict:
+        return {name: len(values) for name, values in self.durations.items()}
+
+
+def set_observer(fn):
+    """登记阶段耗时回调，None 取消"""
+    global _observer
+    _observer = fn
+
+
+def current_source():
+    return getattr(_local, "source", None)
+
+
+@contextmanager
+def phase(name: str):
+    record = getattr(_local, "record", None)
+    source = getattr(_local, "source", None)
+    if record is None and source is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if record is not None:
+            record.add(name, elapsed)
+        observer = _observer
+        if source is not None and observer is not None:
+            observer(source, name, elapsed)
+
+
+@contextmanager
+def tracking(source):
+    """当前线程接下来的阶段耗时记在 source 名下（source 为 None 时不记）"""
+    previous = getattr(_local, "source", None)
+    _local.source = source
+    try:
+        yield
+    finally:
+        _local.source = previous
+
+
+@contextmanager
+def collect():
+    """在当前线程收集阶段耗时：with collect() as record: ..."""
+    previous = getattr(_local, "record", None)
+    record = _local.record = PhaseRecord()
+    try:
+        yield record
+    finally:
+        _local.record = previous
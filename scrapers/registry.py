@@ -0,0 +1,78 @@
+"""
+爬虫插件注册表
+各爬虫模块用 @register 声明自己，服务端按统一签名直接调用：
+    func(keyword: str, limit: int, context=None) -> list[dict]
+返回的每条都是 JSON 可序列化的 dict（title / summary / time / url ...）
+
+可选的 direct(keyword, limit) -> list 为不需要浏览器的直连路径，
+服务端先调用它，返回空列表时再租用浏览器运行 func
+
+incremental=True 的爬虫（及其 direct）额外接受 watermark 参数（service.watermarks.Run），
+增量模式下只返回新条目，并在碰到已知条目时提前停止滚动/翻页
+
+session 为可选的常驻会话工厂（见 scrapers/futu_session.py）：给出时服务端在浏览器池中
+保留会话跨关键词复用，调用 func(keyword, limit, session=会话) 而不是传 context
+
+@register_group 声明共用一次搜索的一组数据源（富途新闻 / 研报）：
+    func(keyword, limit, session=None, context=None, watermarks=None) -> {数据源: list[dict]}
+watermarks 为 {数据源: watermark}。同组数据源都要走浏览器时，服务端只运行一次组采集，
+结果仍按数据源分别返回、缓存和统计
+"""
+
+import importlib
+
+# 加载顺序即控制台展示顺序
+SCRAPER_MODULES = [
+    "scrapers.toutiao_scraper",
+    "scrapers.cls_scraper",
+    "scrapers.wallstreet_scraper",
+    "scrapers.futu_scraper",
+    "scrapers.futu_report_scraper",
+    "scrapers.futu_combined",
+    "scrapers.gelonghui_scraper",
+    "scrapers.eastmoney_scraper",
+]
+
+REGISTRY = {}
+GROUPS = {}
+
+
+def register(key: str, name: str, time: str, direct=None, incremental: bool = False, session=None):
+    """注册爬虫：key 为数据源标识，name 为展示名，time 为预计耗时，direct 为可选直连路径，
+    incremental 表示支持 watermark 参数，session 为可选的常驻会话工厂"""
+
+    def decorator(func):
+        REGISTRY[key] = {
+            "name": name,
+            "time": time,
+            "func": func,
+            "direct": direct,
+            "incremental": incremental,
+            "session": session,
+        }
+        return func
+
+    return decorator
+
+
+def register_group(key: str, sources: tuple, session=None):
+    """注册组采集：key 为组标识，sources 为组内数据源（须已用 @register 注册），session 为可选的常驻会话工厂"""
+
+    def decorator(func):
+        GROUPS[key] = {"sources": tuple(sources), "func": func, "session": session}
+        return func
+
+    return decorator
+
+
+def load_all() -> dict:
+    """导入所有爬虫模块，返回 {key: {"name", "time", "func", "direct", "incremental", "session", "group"}}
+    （按 SCRAPER_MODULES 顺序；group 为所属组标识，没有为 None，组的定义见 GROUPS）"""
+    for module in SCRAPER_MODULES:
+        importlib.import_module(module)
+    for spec in REGISTRY.values():
+        spec.setdefault("group", None)
+    for key, group in GROUPS.items():
+        for source in group["sources"]:
+            REGISTRY[source]["group"] = key
+    return REGISTRY
@@ -0,0 +1,146 @@
+"""
+请求路由：按数据源策略拦截无关资源
+默认拦截图片 / 媒体 / 字体和统计追踪域名；xhr / fetch / script / document 只按域名判断，
+allow_hosts 优先于 deny_hosts，保证富途的搜索接口（on_response 依赖）不会被拦。
+
+离线模式（设置了 SCRAPER_BASE_URL）只放行夹具服务器，其余请求不论类型一律拦截。
+
+每次运行返回一个 RouteStats，统计放行 / 拦截的请求数和放行字节数
+（字节数取响应头 content-length，避免每个请求额外一次驱动调用）。
+全局统计记在当前线程正在采集的数据源名下（phases.tracking），
+多个数据源共用的常驻页面（富途会话）因此仍按数据源分开统计。
+"""
+
+import os
+import threading
+from urllib.parse import urlsplit
+
+from scrapers import phases, sites
+
+# 统计 / 广告 / 埋点域名
+TRACKER_HOSTS = {
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "hm.baidu.com",
+    "cnzz.com",
+    "umeng.com",
+    "growingio.com",
+    "sensorsdata.cn",
+    "zhugeio.com",
+    "mcs.snssdk.com",
+    "log.snssdk.com",
+    "bat.bing.com",
+    "connect.facebook.net",
+}
+
+DEFAULT_POLICY = {
+    "block_types": {"image", "media", "font"},
+    "deny_hosts": TRACKER_HOSTS,
+    "allow_hosts": set(),
+}
+
+FUTU_HOSTS = {"futunn.com", "futustatic.com", "futuhn.com", "futu5.com", "moomoo.com"}
+
+# 各数据源在默认策略上的覆盖
+SOURCE_POLICIES = {
+    "futu": {"allow_hosts": FUTU_HOSTS},
+    "futu_report": {"allow_hosts": FUTU_HOSTS},
+}
+
+# ROUTE_BLOCKING=0 关闭拦截（只统计不拦截）
+BLOCKING_ENABLED = os.environ.get("ROUTE_BLOCKING", "1") != "0"
+
+
+def policy_for(source: str) -> dict:
+    policy = dict(DEFAULT_POLICY)
+    policy.update(SOURCE_POLICIES.get(source, {}))
+    return policy
+
+
+def _host_in(host: str, domains) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+def should_block(policy: dict, resource_type: str, url: str) -> bool:
+    host = (urlsplit(url).hostname or "").lower()
+    if _host_in(host, policy["allow_hosts"]):
+        return resource_type in policy["block_types"]
+    if _host_in(host, policy["deny_hosts"]):
+        return True
+    return resource_type in policy["block_types"]
+
+
+class RouteStats:
+    """单次运行的放行 / 拦截计数，同时累加到全局统计"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.allowed = 0
+        self.blocked = 0
+        self.bytes_allowed = 0
+        self.blocked_by_type = {}
+
+    def summary(self) -> str:
+        return (
+            f"🚦 放行 {self.allowed} / 拦截 {self.blocked} 个请求，"
+            f"下载 {self.bytes_allowed / 1024:.0f}KB"
+        )
+
+
+class _Totals:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_source = {}
+
+    def add(self, source: str, field: str, n: int = 1, resource_type: str = None):
+        with self._lock:
+            s = self._by_source.setdefault(
+                source, {"allowed": 0, "blocked": 0, "bytes_allowed": 0, "blocked_by_type": {}}
+            )
+            s[field] += n
+            if resource_type:
+                s["blocked_by_type"][resource_type] = s["blocked_by_type"].get(resource_type, 0) + n
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {k: dict(v, blocked_by_type=dict(v["blocked_by_type"])) for k, v in self._by_source.items()}
+
+
+route_totals = _Totals()
+
+
+def install(page, source: str) -> RouteStats:
+    """在页面上安装路由，返回本次运行的统计"""
+    policy = policy_for(source)
+    stats = RouteStats(source)
+    offline_host = sites.offline_host()
+
+    def handle(route):
+        request = route.request
+        if offline_host and (urlsplit(request.url).hostname or "") != offline_host:
+            blocked = True
+        else:
+            blocked = BLOCKING_ENABLED and should_block(policy, request.resource_type, request.url)
+        if blocked:
+            stats.blocked += 1
+            stats.blocked_by_type[request.resource_type] = stats.blocked_by_type.get(request.resource_type, 0) + 1
+            route_totals.add(phases.current_source() or source, "blocked", resource_type=request.resource_type)
+            route.abort()
+        else:
+            stats.allowed += 1
+            route_totals.add(phases.current_source() or source, "allowed")
+            route.continue_()
+
+    def on_response(response):
+        try:
+            size = int(response.headers.get("content-length", 0))
+        except ValueError:
+            size = 0
+        stats.bytes_allowed += size
+        route_totals.add(phases.current_source() or source, "bytes_allowed", size)
+
+    page.route("**/*", handle)
+    page.on("response", on_response)
+    return stats
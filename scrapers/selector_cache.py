@@ -0,0 +1,178 @@
+"""
+选择器学习缓存
+财联社、今日头条的提取逻辑都有一串候选选择器，按顺序试到第一个能提取出新闻的为止。
+这里按数据源记住上次命中的选择器，下次先试它，未命中才按原顺序走完整条候选链；
+同时统计每个选择器的尝试次数、命中次数和耗时，持久化到 JSON 以便重启后沿用。
+学习到的选择器变化（或清除）时立即写盘；只有统计变化时留在内存，进程退出时一并写入。
+"""
+
+import os
+import json
+import time
+import atexit
+import threading
+
+# 持久化文件，可用环境变量 SELECTOR_CACHE_FILE 覆盖
+SELECTOR_CACHE_FILE = os.environ.get(
+    "SELECTOR_CACHE_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output", "selector_cache.json"),
+)
+
+
+def _new_source() -> dict:
+    return {
+        "winner": None,     # 上次命中的选择器
+        "lookups": 0,       # 提取次数
+        "hits": 0,          # 第一个尝试的（学习到的）选择器直接命中
+        "misses": 0,        # 需要走候选链（含全部未命中）
+        "exhausted": 0,     # 候选链全部未命中，交给调用方兜底
+        "selectors": {},
+    }
+
+
+def _new_selector() -> dict:
+    return {"attempts": 0, "successes": 0, "total_ms": 0.0, "last_items": 0, "last_used": None}
+
+
+class SelectorCache:
+    """按数据源记录选择器命中情况（线程安全，命中的选择器变化时落盘）"""
+
+    def __init__(self, path: str = SELECTOR_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = None
+        self._dirty = False  # 有尚未写盘的统计
+        atexit.register(self.flush)
+
+    def _load(self) -> dict:
+        if self._data is None:
+            self._data = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self._data = json.load(f)
+                except (OSError, ValueError):
+                    pass
+        return self._data
+
+    def flush(self):
+        """把尚未写盘的统计写入文件"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _save(self):
+        """调用方持锁"""
+        self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def ordered(self, source: str, chain: list) -> list:
+        """学习到的选择器排在最前，其余保持候选链原顺序"""
+        with self._lock:
+            winner = self._load().get(source, {}).get("winner")
+        if winner in chain:
+            return [winner] + [s for s in chain if s != winner]
+        return list(chain)
+
+    def record(self, source: str, attempts: list, winner):
+        """
+        记录一次提取
+        attempts: 按尝试顺序的 [(selector, 耗时秒, 提取条数)]
+        winner: 命中的选择器，全部未命中为 None
+        """
+        with self._lock:
+            entry = self._load().setdefault(source, _new_source())
+            learned = entry["winner"]
+            entry["lookups"] += 1
+            if winner is not None and attempts and attempts[0][0] == winner == learned:
+                entry["hits"] += 1
+            else:
+                entry["misses"] += 1
+            if winner is None:
+                entry["exhausted"] += 1
+
+            now = time.time()
+            for selector, elapsed, items in attempts:
+                stat = entry["selectors"].setdefault(selector, _new_selector())
+                stat["attempts"] += 1
+                stat["total_ms"] = round(stat["total_ms"] + elapsed * 1000, 1)
+                stat["last_items"] = items
+                stat["last_used"] = now
+                if selector == winner:
+                    stat["successes"] += 1
+
+            if winner is not None and winner != learned:
+                entry["winner"] = winner
+                self._save()
+            else:
+                self._dirty = True
+
+    def walk(self, source: str, chain: list, extract):
+        """
+        按学习到的顺序逐个尝试，extract(selector) 返回提取结果列表（空表示未命中）
+        返回 (命中的选择器或 None, 结果列表)
+        """
+        attempts = []
+        winner, results = None, []
+        for selector in self.ordered(source, chain):
+            start = time.perf_counter()
+            try:
+                results = extract(selector)
+            except Exception:
+                results = []
+            attempts.append((selector, time.perf_counter() - start, len(results)))
+            if results:
+                winner = selector
+                break
+        self.record(source, attempts, winner)
+        return winner, results
+
+    def snapshot(self) -> dict:
+        """各数据源的命中率与各选择器平均耗时"""
+        with self._lock:
+            data = self._load()
+            out = {}
+            for source, entry in data.items():
+                lookups = entry["lookups"]
+                out[source] = {
+                    "winner": entry["winner"],
+                    "lookups": lookups,
+                    "hits": entry["hits"],
+                    "misses": entry["misses"],
+                    "exhausted": entry["exhausted"],
+                    "hit_rate": round(entry["hits"] / lookups, 3) if lookups else 0.0,
+                    "selectors": {
+                        selector: {
+                            "attempts": s["attempts"],
+                            "successes": s["successes"],
+                            "success_rate": round(s["successes"] / s["attempts"], 3) if s["attempts"] else 0.0,
+                            "avg_ms": round(s["total_ms"] / s["attempts"], 1) if s["attempts"] else 0.0,
+                            "last_items": s["last_items"],
+                            "last_used": s["last_used"],
+                        }
+                        for selector, s in entry["selectors"].items()
+                    },
+                }
+            return out
+
+    def reset(self, source: str = None) -> bool:
+        """清除某个数据源（或全部）的学习结果；数据源不存在返回 False"""
+        with self._lock:
+            data = self._load()
+            if source is None:
+                data.clear()
+            elif data.pop(source, None) is None:
+                return False
+            self._save()
+            return True
+
+
+# 进程内共享实例
+selector_cache = SelectorCache()
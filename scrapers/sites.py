@@ -0,0 +1,35 @@
+"""
+各数据源站点根地址
+设置 SCRAPER_BASE_URL（如 http://127.0.0.1:8765）后，所有站点改为 {SCRAPER_BASE_URL}/{站点}，
+用于指向离线夹具服务器（bench/fixture_server.py）；此时路由只放行夹具服务器，其余请求一律拦截。
+"""
+
+import os
+from urllib.parse import urlsplit
+
+SITES = {
+    "toutiao": "https://so.toutiao.com",
+    "cls": "https://www.cls.cn",
+    "wallstreet": "https://wallstreetcn.com",
+    "futu": "https://news.futunn.com",
+    "gelonghui": "https://www.gelonghui.com",
+    "eastmoney": "https://so.eastmoney.com",
+}
+
+
+def base_override() -> str:
+    """每次调用时读取，基准测试可在导入爬虫之后再设置"""
+    return os.environ.get("SCRAPER_BASE_URL", "").rstrip("/")
+
+
+def site_url(site: str, path: str = "") -> str:
+    """站点根地址 + 路径（path 以 / 开头）"""
+    override = base_override()
+    root = f"{override}/{site}" if override else SITES[site]
+    return root + path
+
+
+def offline_host():
+    """离线模式下夹具服务器的主机名，未设置时为 None"""
+    override = base_override()
+    return urlsplit(override).hostname if override else None
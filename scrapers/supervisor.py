@@ -0,0 +1,320 @@
+"""
+浏览器进程监管
+只管本服务（本进程）启动的浏览器，取代原先的 pkill -9 -f chromium（会误杀并发运行的其他采集）：
+
+    - 每个浏览器启动后登记其主进程（Playwright 在 Linux 上以独立进程组启动 Chromium，按进程组结束）
+      并写入 BROWSER_PID_DIR/<本进程 PID>.json
+    - 回收孤儿：登记者进程已退出（崩溃的服务 / 命令行运行）或 Playwright 驱动已退出而浏览器还活着的，
+      才强制结束；结束前核对进程启动时间和命令行，避免 PID 复用后误杀
+    - 每个任务有墙钟上限，超时由看门狗线程强制结束该任务所在的浏览器，工作线程随后重新启动浏览器
+
+进程信息读 /proc，仅 Linux 有效，其他平台登记为空、不做回收。
+"""
+
+import os
+import json
+import signal
+import threading
+import time
+
+PID_DIR = os.environ.get(
+    "BROWSER_PID_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output", "browsers"),
+)
+
+# 单个浏览器任务的墙钟上限（秒），0 表示不限
+DEFAULT_JOB_TIMEOUT = float(os.environ.get("BROWSER_JOB_TIMEOUT", "150"))
+
+# 看门狗检查间隔（秒）；每隔 ORPHAN_EVERY 次顺带检查孤儿
+WATCH_INTERVAL = 1.0
+ORPHAN_EVERY = 30
+
+
+# ========== /proc 进程工具（仅 Linux，其他平台返回空） ==========
+
+
+def child_pids(pid: int) -> set:
+    """pid 的直接子进程"""
+    children = set()
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return children
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                stat = f.read()
+            # 第二个字段 comm 可能含空格，从最后一个 ')' 之后解析
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.add(int(entry))
+    return children
+
+
+def descendant_pids(pid: int) -> set:
+    """pid 的所有后代进程"""
+    result = set()
+    stack = [pid]
+    while stack:
+        for child in child_pids(stack.pop()):
+            if child not in result:
+                result.add(child)
+                stack.append(child)
+    return result
+
+
+def rss_bytes(pids) -> int:
+    """进程集合的常驻内存之和"""
+    page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/statm", "r") as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+def start_time(pid: int):
+    """进程启动时间（开机后的时钟滴答数），进程不存在或已成僵尸返回 None"""
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    if fields[0] == "Z":
+        return None
+    return int(fields[19])
+
+
+def is_browser(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            cmdline = f.read().split(b"\0")[0].decode("utf-8", errors="replace")
+    except OSError:
+        return False
+    name = os.path.basename(cmdline)
+    return "chrom" in name or "headless_shell" in name
+
+
+def browser_roots(driver_pid: int) -> set:
+    """Playwright 驱动启动的浏览器主进程"""
+    return {pid for pid in child_pids(driver_pid) if is_browser(pid)} if driver_pid else set()
+
+
+def _pid_alive(pid: int) -> bool:
+    return start_time(pid) is not None
+
+
+# ========== 监管 ==========
+
+
+class _Job:
+    def __init__(self, pid: int, label: str, timeout: float, deadline):
+        self.pid = pid
+        self.label = label
+        self.timeout = timeout
+        self.deadline = deadline
+        self.killed = False
+
+
+class BrowserSupervisor:
+    """登记本进程启动的浏览器，回收孤儿，按任务墙钟上限强制结束"""
+
+    def __init__(self, pid_dir: str = PID_DIR, job_timeout: float = DEFAULT_JOB_TIMEOUT):
+        self.pid_dir = pid_dir
+        self.job_timeout = job_timeout
+        self._lock = threading.Lock()
+        self._browsers = {}  # 浏览器主进程 PID -> {"driver", "started", "group", "owner"}
+        self._jobs = set()
+        self._watchdog = None
+        self.killed_jobs = 0
+        self.reaped_orphans = 0
+
+    # ---------- 登记 ----------
+
+    def track(self, driver_pid: int, owner: str, before: set = frozenset()) -> set:
+        """登记驱动 driver_pid 新启动的浏览器（before 为启动前已有的子进程），返回登记的 PID"""
+        found = browser_roots(driver_pid) - set(before)
+        with self._lock:
+            for pid in found:
+                started = start_time(pid)
+                if started is None:
+                    continue
+                try:
+                    group = os.getpgid(pid) == pid
+                except OSError:
+                    group = False
+                self._browsers[pid] = {"driver": driver_pid, "started": started, "group": group, "owner": owner}
+            self._save()
+        self._ensure_watchdog()
+        return found
+
+    def untrack(self, pids):
+        with self._lock:
+            for pid in pids:
+                self._browsers.pop(pid, None)
+            self._save()
+
+    def _save(self):
+        """本进程登记的浏览器写入 <PID_DIR>/<pid>.json，供其他进程（或重启后的本服务）回收；调用方持锁"""
+        path = os.path.join(self.pid_dir, f"{os.getpid()}.json")
+        try:
+            if not self._browsers:
+                if os.path.exists(path):
+                    os.remove(path)
+                return
+            os.makedirs(self.pid_dir, exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"owner_started": start_time(os.getpid()),
+                           "browsers": {str(k): v for k, v in self._browsers.items()}}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️ 写入浏览器登记失败: {e}")
+
+    # ---------- 结束进程 ----------
+
+    def _kill(self, pid: int, entry: dict) -> bool:
+        """核对启动时间和命令行后强制结束浏览器（整个进程组或进程树），返回是否真的结束了"""
+        if start_time(pid) != entry["started"] or not is_browser(pid):
+            return False
+        try:
+            if entry["group"]:
+                os.killpg(pid, signal.SIGKILL)
+            else:
+                for p in descendant_pids(pid) | {pid}:
+                    os.kill(p, signal.SIGKILL)
+        except ProcessLookupError:
+            return False
+        except OSError as e:
+            print(f"⚠️ 结束浏览器 {pid} 失败: {e}")
+            return False
+        return True
+
+    # ---------- 任务墙钟上限 ----------
+
+    def start_job(self, pids, label: str = "", timeout: float = None) -> _Job:
+        """登记一个在浏览器 pids 上运行的任务，超过 timeout 秒由看门狗结束浏览器"""
+        timeout = self.job_timeout if timeout is None else timeout
+        pid = min(pids) if pids else None
+        job = _Job(pid, label, timeout, time.time() + timeout if timeout and pid else None)
+        with self._lock:
+            self._jobs.add(job)
+        if job.deadline is not None:
+            self._ensure_watchdog()
+        return job
+
+    def end_job(self, job: _Job) -> bool:
+        """任务结束，返回是否被强制结束过"""
+        with self._lock:
+            self._jobs.discard(job)
+        return job.killed
+
+    def kill_job(self, job: _Job, reason: str = "超时") -> bool:
+        """立即结束任务所在的浏览器（调用方等待超时、看门狗到期）"""
+        with self._lock:
+            if job.killed or job.pid is None:
+                return False
+            entry = self._browsers.get(job.pid)
+            job.killed = True
+        if entry is None or not self._kill(job.pid, entry):
+            return False
+        with self._lock:
+            self.killed_jobs += 1
+        print(f"⏱️ {job.label or '浏览器任务'} {reason}，已结束浏览器 {job.pid}")
+        return True
+
+    # ---------- 孤儿回收 ----------
+
+    def reap_orphans(self) -> int:
+        """回收孤儿浏览器：登记者进程已退出的（读其他进程留下的登记文件），
+        以及本进程登记、但 Playwright 驱动已退出的；返回结束的浏览器数"""
+        reaped = 0
+        try:
+            names = os.listdir(self.pid_dir)
+        except OSError:
+            names = []
+        for name in names:
+            if not name.endswith(".json") or name == f"{os.getpid()}.json":
+                continue
+            path = os.path.join(self.pid_dir, name)
+            try:
+                owner = int(name[:-5])
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if start_time(owner) is not None and start_time(owner) == data.get("owner_started"):
+                continue  # 登记者还在运行，浏览器归它管
+            for pid, entry in data.get("browsers", {}).items():
+                if self._kill(int(pid), entry):
+                    reaped += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+        with self._lock:
+            orphans = [(pid, e) for pid, e in self._browsers.items() if not _pid_alive(e["driver"])]
+        for pid, entry in orphans:
+            if self._kill(pid, entry):
+                reaped += 1
+        if orphans:
+            self.untrack([pid for pid, _ in orphans])
+
+        if reaped:
+            with self._lock:
+                self.reaped_orphans += reaped
+            print(f"🧹 回收孤儿浏览器 {reaped} 个")
+        return reaped
+
+    def _ensure_watchdog(self):
+        with self._lock:
+            if self._watchdog is not None:
+                return
+            self._watchdog = threading.Thread(target=self._watch, name="browser-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def _watch(self):
+        ticks = 0
+        while True:
+            time.sleep(WATCH_INTERVAL)
+            now = time.time()
+            with self._lock:
+                expired = [j for j in self._jobs if j.deadline is not None and now > j.deadline and not j.killed]
+            for job in expired:
+                self.kill_job(job, f"超过 {job.timeout:.0f} 秒")
+            ticks += 1
+            if ticks % ORPHAN_EVERY == 0:
+                try:
+                    self.reap_orphans()
+                except Exception as e:
+                    print(f"⚠️ 回收孤儿浏览器失败: {e}")
+
+    # ---------- 统计 ----------
+
+    def stats(self) -> dict:
+        with self._lock:
+            browsers = dict(self._browsers)
+            running = len(self._jobs)
+        processes = set()
+        for pid in browsers:
+            if _pid_alive(pid):
+                processes |= {pid} | descendant_pids(pid)
+        return {
+            "browsers": sum(1 for pid in browsers if _pid_alive(pid)),
+            "processes": len(processes),
+            "running_jobs": running,
+            "job_timeout": self.job_timeout,
+            "killed_jobs": self.killed_jobs,
+            "reaped_orphans": self.reaped_orphans,
+        }
+
+
+supervisor = BrowserSupervisor()
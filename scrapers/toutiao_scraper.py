@@ -11,7 +11,13 @@ import time
 import os
 import urllib.parse
 from datetime import datetime, timedelta
-from playwright.sync_api import sync_playwright
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers import debug_capture, phases, router, sites, waits
+from scrapers.browser_pool import lease_context
+from scrapers.registry import register
+from scrapers.selector_cache import selector_cache
 
 
 def parse_time(text: str) -> datetime:
@@ -43,184 +49,216 @@ def parse_time(text: str) -> datetime:
     return datetime(2000, 1, 1)
 
 
+# 尝试多种可能的新闻卡片选择器（按优先级）
+CARD_SELECTORS = [
+    'div.result-content',          # 搜索结果卡片
+    'div[class*="result"]',
+    'div[class*="feed-card"]',
+    'div[class*="card"]',
+    'article',
+]
+
+# 标题（通常是 a 标签或 h 标签），至少 20 字才算标题
+TITLE_SELECTORS = ['a', 'h1', 'h2', 'h3', '[class*="title"]']
+
+SOURCE_SELECTOR = '[class*="source"], [class*="author"], [class*="name"]'
+
+TIME_PATTERNS = [
+    r'\d+分钟前', r'\d+小时前', r'\d+天前',
+    r'昨天', r'前天',
+    r'\d{4}年\d{1,2}月\d{1,2}日',
+    r'\d{1,2}月\d{1,2}日'
+]
+
+# 页内一次性提取所有卡片：按给定顺序逐个选择器尝试，命中（>2 个卡片且有标题）即返回，
+# 同时带回每个尝试过的选择器的耗时和提取条数，供选择器缓存统计
+EXTRACT_JS = """
+([cardSelectors, titleSelectors, sourceSelector]) => {
+    const text = (el) => (el && el.innerText || '').trim();
+    const attempts = [];
+    for (const selector of cardSelectors) {
+        const start = performance.now();
+        let cards;
+        try { cards = Array.from(document.querySelectorAll(selector)); } catch (e) { cards = []; }
+        const items = [];
+        if (cards.length > 2) {
+            for (const card of cards) {
+                let title = '';
+                for (const ts of titleSelectors) {
+                    const t = text(card.querySelector(ts));
+                    if (t.length > 20) { title = t; break; }
+                }
+                if (!title) continue;
+                const link = card.querySelector('a');
+                items.push({
+                    title: title,
+                    href: link ? (link.getAttribute('href') || '') : '',
+                    source: text(card.querySelector(sourceSelector)).slice(0, 50),
+                    text: card.innerText || '',
+                });
+            }
+        }
+        attempts.push([selector, performance.now() - start, items.length]);
+        if (items.length > 0) {
+            return {selector: selector, total: cards.length, items: items, attempts: attempts};
+        }
+    }
+    return {selector: null, total: 0, items: [], attempts: attempts};
+}
+"""
+
+
+def normalize_url(url: str) -> str:
+    if url and not url.startswith('http'):
+        if url.startswith('//'):
+            return 'https:' + url
+        return 'https://www.toutiao.com' + url
+    return url
+
+
+def find_time(card_text: str):
+    """在整个卡片文本中搜索时间，返回 (time_text, datetime)"""
+    for pattern in TIME_PATTERNS:
+        match = re.search(pattern, card_text)
+        if match:
+            return match.group(), parse_time(match.group())
+    return "", datetime(2000, 1, 1)
+
+
 def extract_news_from_dom(page) -> list:
-    """从 DOM 结构直接提取新闻"""
-    news = []
+    """从 DOM 结构直接提取新闻（单次 evaluate 取回所有卡片，Python 端只做规整）
+    卡片选择器按选择器缓存学习到的顺序尝试，上次命中的优先"""
+    chain = selector_cache.ordered("toutiao", CARD_SELECTORS)
+    try:
+        with phases.phase("extract"):
+            raw = page.evaluate(EXTRACT_JS, [chain, TITLE_SELECTORS, SOURCE_SELECTOR])
+    except Exception as e:
+        print(f"    ⚠️ DOM 提取失败: {e}")
+        return []
     
-    # 尝试多种可能的新闻卡片选择器
-    card_selectors = [
-        'div.result-content',          # 搜索结果卡片
-        'div[class*="result"]',
-        'div[class*="feed-card"]',
-        'div[class*="card"]',
-        'article',
-    ]
+    selector_cache.record(
+        "toutiao", [(sel, ms / 1000, n) for sel, ms, n in raw['attempts']], raw['selector'])
+    if raw['selector']:
+        print(f"    使用选择器: {raw['selector']} (找到 {raw['total']} 个)")
     
-    for selector in card_selectors:
-        try:
-            cards = page.locator(selector).all()
-            if len(cards) > 2:
-                print(f"    使用选择器: {selector} (找到 {len(cards)} 个)")
-                
-                for card in cards:
-                    try:
-                        # 提取标题（通常是 a 标签或 h 标签）
-                        title = ""
-                        title_selectors = ['a', 'h1', 'h2', 'h3', '[class*="title"]']
-                        for ts in title_selectors:
-                            try:
-                                title_elem = card.locator(ts).first
-                                if title_elem.count() > 0:
-                                    t = title_elem.inner_text().strip()
-                                    if len(t) > 20:  # 标题至少20字
-                                        title = t
-                                        break
-                            except:
-                                continue
-                        
-                        if not title or len(title) < 15:
-                            continue
-                        
-                        # 提取链接
-                        url = ""
-                        try:
-                            link = card.locator('a').first
-                            if link.count() > 0:
-                                url = link.get_attribute('href') or ""
-                                if url and not url.startswith('http'):
-                                    if url.startswith('//'):
-                                        url = 'https:' + url
-                                    else:
-                                        url = 'https://www.toutiao.com' + url
-                        except:
-                            pass
-                        
-                        # 提取来源
-                        source = ""
-                        try:
-                            source_elem = card.locator('[class*="source"], [class*="author"], [class*="name"]').first
-                            if source_elem.count() > 0:
-                                source = source_elem.inner_text().strip()[:50]
-                        except:
-                            pass
-                        
-                        # 提取时间
-                        time_text = ""
-                        time_obj = datetime(2000, 1, 1)
-                        try:
-                            # 整个卡片的文本中搜索时间
-                            card_text = card.inner_text()
-                            time_patterns = [
-                                r'\d+分钟前', r'\d+小时前', r'\d+天前',
-                                r'昨天', r'前天',
-                                r'\d{4}年\d{1,2}月\d{1,2}日',
-                                r'\d{1,2}月\d{1,2}日'
-                            ]
-                            for pattern in time_patterns:
-                                match = re.search(pattern, card_text)
-                                if match:
-                                    time_text = match.group()
-                                    time_obj = parse_time(time_text)
-                                    break
-                        except:
-                            pass
-                        
-                        news.append({
-                            'title': title,
-                            'url': url,
-                            'source': source,
-                            'time': time_obj,
-                            'time_text': time_text,
-                        })
-                    except Exception as e:
-                        continue
-                
-                if len(news) > 0:
-                    break  # 找到了就不再尝试其他选择器
-        except:
+    news = []
+    for item in raw['items']:
+        if len(item['title']) < 15:
             continue
-    
+        time_text, time_obj = find_time(item['text'])
+        news.append({
+            'title': item['title'],
+            'url': normalize_url(item['href']),
+            'source': item['source'],
+            'time': time_obj,
+            'time_text': time_text,
+        })
     return news
 
 
-def scrape(keyword: str, pages: int = 5) -> list:
+# 搜索结果卡片（用于判断切换标签 / 翻页后内容已替换）
+RESULT_SELECTOR = 'div.result-content, div[class*="result"]'
+
+
+def turn_page(page, number: int):
+    """点页码翻页，找不到页码时点"下一页"；两者都失败时抛出异常"""
+    prev_first = waits.first_text(page, RESULT_SELECTOR)
+    try:
+        page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+        page.click(f'a:text-is("{number}")', timeout=5000)
+    except:
+        page.click('text=下一页', timeout=3000)
+    waits.wait_for_text_change(page, RESULT_SELECTOR, prev_first, timeout=6, label='toutiao.page')
+
+
+def scrape(keyword: str, pages: int = 5, context=None) -> list:
+    """爬取今日头条资讯，context 为浏览器池租用的上下文"""
     all_news = []
-    os.makedirs('screenshots', exist_ok=True)
     
-    with sync_playwright() as p:
-        print("🚀 启动浏览器...")
-        browser = p.chromium.launch(headless=True, args=['--no-sandbox'])
-        
-        context = browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0',
-        )
-        page = context.new_page()
-        page.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    with lease_context(context) as ctx:
+        page = ctx.new_page()
+        route_stats = router.install(page, "toutiao")
+        capture = debug_capture.start("toutiao")
+        waits.track_network(page)
         
         try:
             # 直接使用 URL 编码访问
             encoded_keyword = urllib.parse.quote(keyword)
-            url = f'https://so.toutiao.com/search?dvpf=pc&source=pagination&keyword={encoded_keyword}'
+            url = sites.site_url("toutiao", f"/search?dvpf=pc&source=pagination&keyword={encoded_keyword}")
             print(f"📄 打开: {url}")
-            page.goto(url, wait_until='domcontentloaded', timeout=60000)
-            
-            print("⏳ 等待页面加载...")
-            time.sleep(6)
+            with phases.phase("navigate"):
+                page.goto(url, wait_until='domcontentloaded', timeout=60000)
+                
+                print("⏳ 等待页面加载...")
+                waits.wait_for_selector(page, 'text=资讯', timeout=10, label='toutiao.load')
             
             print("📰 点击资讯...")
             try:
-                page.click('text=资讯', timeout=5000)
-                time.sleep(3)
+                with phases.phase("tab"):
+                    prev_first = waits.first_text(page, RESULT_SELECTOR)
+                    page.click('text=资讯', timeout=5000)
+                    waits.wait_for_text_change(page, RESULT_SELECTOR, prev_first, timeout=5, label='toutiao.tab')
                 print("✅ 已点击资讯")
             except:
                 print("⚠️ 资讯标签点击失败")
             
             for page_num in range(1, pages + 1):
                 print(f"\n📖 第 {page_num} 页...")
-                time.sleep(2)
-                
-                # 截图（用于调试）
-                try:
-                    page.screenshot(path=f'screenshots/dom_page_{page_num}.png')
-                    print(f"  📷 截图: dom_page_{page_num}.png")
-                except:
-                    pass
+                waits.wait_for_network_idle(page, quiet_ms=500, timeout=3, label='toutiao.idle')
                 
                 # DOM 解析提取新闻
                 page_news = extract_news_from_dom(page)
                 print(f"  📰 提取: {len(page_news)} 条")
                 all_news.extend(page_news)
                 
-                # 保存提取结果（调试用）
-                with open(f'screenshots/dom_page_{page_num}.json', 'w', encoding='utf-8') as f:
-                    json.dump([{'title': n['title'], 'source': n['source'], 'time': n['time_text']} 
-                               for n in page_news], f, ensure_ascii=False, indent=2)
+                # 调试快照：页面 + 提取结果（只在整体失败时落盘）
+                capture.snapshot(page, f"page_{page_num}",
+                                 [{'title': n['title'], 'source': n['source'], 'time': n['time_text']}
+                                  for n in page_news])
                 
                 if page_num < pages:
                     print(f"  ➡️ 翻页...")
                     try:
-                        page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                        time.sleep(1)
-                        page.click(f'a:text-is("{page_num + 1}")', timeout=5000)
-                        time.sleep(3)
+                        with phases.phase("scroll"):
+                            turn_page(page, page_num + 1)
                     except:
-                        try:
-                            page.click('text=下一页', timeout=3000)
-                            time.sleep(3)
-                        except:
-                            print("  ⚠️ 翻页失败")
-                            break
+                        print("  ⚠️ 翻页失败")
+                        break
             
         except Exception as e:
             print(f"❌ 错误: {e}")
+            capture.fail(e)
         finally:
-            browser.close()
-            print("\n🔒 浏览器关闭")
+            capture.finish(page, len(all_news))
+            print(route_stats.summary())
+            page.close()
     
     return all_news
 
 
+def to_json_items(all_news: list) -> list:
+    """去重、格式化时间，转换为 JSON 可序列化格式（最新 20 条）"""
+    output = []
+    seen = set()
+    for n in all_news:
+        key = n['title'][:40]
+        if key not in seen:
+            seen.add(key)
+            output.append({
+                'title': n['title'],
+                'time': n['time'].strftime('%Y-%m-%d %H:%M') if hasattr(n['time'], 'strftime') and n['time'].year > 2000 else '',
+                'url': n.get('url', '')
+            })
+    output.sort(key=lambda x: x['time'], reverse=True)
+    return output[:20]
+
+
+@register("toutiao", name="今日头条", time="~65秒")
+def collect(keyword: str, limit: int = 20, context=None) -> list:
+    """统一接口（固定采集前 5 页）"""
+    return to_json_items(scrape(keyword, context=context))
+
+
 def main():
     # 解析参数: keyword [limit] [--json]
     keyword = "小米集团"
@@ -239,20 +277,7 @@ def main():
         sys_module.stdout = io.StringIO()
         all_news = scrape(keyword)
         sys_module.stdout = old_stdout
-        # 转换为 JSON 可序列化格式
-        output = []
-        seen = set()
-        for n in all_news:
-            key = n['title'][:40]
-            if key not in seen:
-                seen.add(key)
-                output.append({
-                    'title': n['title'],
-                    'time': n['time'].strftime('%Y-%m-%d %H:%M') if hasattr(n['time'], 'strftime') and n['time'].year > 2000 else '',
-                    'url': n.get('url', '')
-                })
-        output.sort(key=lambda x: x['time'], reverse=True)
-        print(json.dumps(output[:20], ensure_ascii=False))
+        print(json.dumps(to_json_items(all_news), ensure_ascii=False))
         return
     
     # 普通模式
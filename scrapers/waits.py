@@ -0,0 +1,193 @@
+"""
+事件驱动的等待
+用具体的就绪信号（元素出现、条目数增长、内容变化、匹配的 XHR 返回、网络静默）
+代替固定 time.sleep，每种等待都有上限，并记录实际耗时。
+
+所有函数超时不抛异常，返回 True/False 表示信号是否出现，
+调用方按原逻辑继续（与原先 sleep 后继续执行一致）。
+"""
+
+import re
+import time
+import threading
+import weakref
+from contextlib import contextmanager
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+
+class WaitStats:
+    """按标签统计等待的实际耗时"""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, label: str, elapsed: float, ok: bool):
+        with self._lock:
+            s = self._stats.setdefault(
+                label, {"count": 0, "timeouts": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+            )
+            s["count"] += 1
+            s["timeouts"] += 0 if ok else 1
+            s["total"] += elapsed
+            s["max"] = max(s["max"], elapsed)
+            s["last"] = elapsed
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                label: {
+                    "count": s["count"],
+                    "timeouts": s["timeouts"],
+                    "avg_ms": round(s["total"] / s["count"] * 1000, 1),
+                    "max_ms": round(s["max"] * 1000, 1),
+                    "last_ms": round(s["last"] * 1000, 1),
+                }
+                for label, s in self._stats.items()
+            }
+
+
+wait_stats = WaitStats()
+
+
+def _timed(label: str, fn) -> bool:
+    start = time.time()
+    try:
+        fn()
+        ok = True
+    except Exception:
+        ok = False
+    wait_stats.record(label, time.time() - start, ok)
+    return ok
+
+
+def wait_for_selector(page, selector: str, timeout: float = 10, label: str = "selector") -> bool:
+    """等待元素出现（CSS 可用逗号写多个候选）"""
+    return _timed(
+        label,
+        lambda: page.wait_for_selector(selector, state="attached", timeout=timeout * 1000),
+    )
+
+
+def wait_for_count_growth(page, selector: str, prev_count: int, timeout: float = 5, label: str = "count") -> bool:
+    """等待匹配元素数量超过 prev_count（加载更多 / 滚动加载）"""
+    return _timed(
+        label,
+        lambda: page.wait_for_function(
+            "([sel, n]) => document.querySelectorAll(sel).length > n",
+            arg=[selector, prev_count],
+            timeout=timeout * 1000,
+        ),
+    )
+
+
+def wait_for_text_change(page, selector: str, prev_text: str, timeout: float = 5, label: str = "text") -> bool:
+    """等待首个匹配元素的文本不同于 prev_text（翻页后内容替换）"""
+    return _timed(
+        label,
+        lambda: page.wait_for_function(
+            """([sel, prev]) => {
+                var el = document.querySelector(sel);
+                return el && el.innerText !== prev;
+            }""",
+            arg=[selector, prev_text],
+            timeout=timeout * 1000,
+        ),
+    )
+
+
+def count(page, selector: str) -> int:
+    return page.evaluate("(sel) => document.querySelectorAll(sel).length", selector)
+
+
+def first_text(page, selector: str) -> str:
+    return page.evaluate(
+        "(sel) => { var el = document.querySelector(sel); return el ? el.innerText : ''; }",
+        selector,
+    )
+
+
+@contextmanager
+def expect_response(page, pattern: str, timeout: float = 5, label: str = "response"):
+    """包住一次操作，等待其触发的、URL 匹配 pattern 的 200 响应完成
+
+    with expect_response(page, r"search", label="futu.tab"):
+        page.evaluate(click_js)
+
+    只有等待响应超时按未出现处理；操作本身抛出的异常原样向外抛出
+    """
+    regex = re.compile(pattern)
+    start = time.time()
+    ok = True
+    body_failed = False
+    try:
+        with page.expect_response(
+            lambda r: r.status == 200 and regex.search(r.url) is not None,
+            timeout=timeout * 1000,
+        ):
+            try:
+                yield
+            except BaseException:
+                body_failed = True
+                raise
+    except PlaywrightTimeoutError:
+        if body_failed:
+            raise
+        ok = False
+    wait_stats.record(label, time.time() - start, ok)
+
+
+# ========== 网络静默 ==========
+
+_trackers = weakref.WeakKeyDictionary()
+
+
+class _NetworkTracker:
+    """记录页面进行中的请求和最后一次网络活动时间"""
+
+    def __init__(self, page):
+        self.inflight = set()
+        self.last_activity = time.time()
+        page.on("request", self._on_start)
+        page.on("requestfinished", self._on_end)
+        page.on("requestfailed", self._on_end)
+
+    def _on_start(self, request):
+        self.inflight.add(request)
+        self.last_activity = time.time()
+
+    def _on_end(self, request):
+        self.inflight.discard(request)
+        self.last_activity = time.time()
+
+
+def track_network(page):
+    """在 goto 之前调用，让网络静默检测覆盖首屏请求"""
+    tracker = _trackers.get(page)
+    if tracker is None:
+        tracker = _NetworkTracker(page)
+        _trackers[page] = tracker
+    return tracker
+
+
+def wait_for_network_idle(page, quiet_ms: int = 500, timeout: float = 5, label: str = "idle") -> bool:
+    """等待连续 quiet_ms 毫秒没有进行中的请求"""
+    tracker = track_network(page)
+    start = time.time()
+    deadline = start + timeout
+    ok = False
+    while True:
+        now = time.time()
+        if not tracker.inflight and (now - tracker.last_activity) * 1000 >= quiet_ms:
+            ok = True
+            break
+        if now >= deadline:
+            break
+        # 同步 API 只在驱动调用期间派发事件，用 wait_for_timeout 代替 time.sleep
+        try:
+            page.wait_for_timeout(50)
+        except Exception:
+            break
+    wait_stats.record(label, time.time() - start, ok)
+    return ok
@@ -10,122 +10,160 @@ import time
 import os
 import urllib.parse
 from datetime import datetime
-from playwright.sync_api import sync_playwright
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def scrape(keyword: str) -> list:
-    """爬取华尔街见闻（直接从DOM属性提取时间）"""
+from scrapers import debug_capture, phases, router, sites, waits
+from scrapers.browser_pool import lease_context
+from scrapers.registry import register
+
+
+# 页内一次性取回所有快讯：time 的 datetime 属性、标题、正文
+EXTRACT_JS = """
+() => Array.from(document.querySelectorAll('div.live-item')).map(item => {
+    const time = item.querySelector('time.live-item_created');
+    const title = item.querySelector('div.live-item_title');
+    const content = item.querySelector('div.live-item_html');
+    return {
+        datetime: time ? (time.getAttribute('datetime') || '') : null,
+        title: title ? title.innerText.trim() : '',
+        content: content ? content.innerText.trim() : '',
+    };
+})
+"""
+
+
+def parse_datetimes(values: list) -> list:
+    """批量解析 ISO 时间（格式：2026-01-16T18:58:31.000+08:00），去掉时区和毫秒，无法解析的为 None"""
+    parsed = []
+    for value in values:
+        try:
+            parsed.append(datetime.fromisoformat(value[:19]))
+        except (TypeError, ValueError):
+            parsed.append(None)
+    return parsed
+
+
+def parse_live_items(raw: list) -> list:
+    """规整 EXTRACT_JS 的结果：丢弃无时间或过短的条目，合并标题和正文"""
     news = []
-    os.makedirs('screenshots', exist_ok=True)
-    
-    with sync_playwright() as p:
-        print("🚀 启动浏览器...")
-        browser = p.chromium.launch(headless=True, args=['--no-sandbox'])
+    times = parse_datetimes([r['datetime'] for r in raw])
+    for r, time_obj in zip(raw, times):
+        if time_obj is None:
+            continue
+        title, content = r['title'], r['content']
+        
+        # 合并标题和正文
+        full_text = title
+        if content:
+            full_text = title + "\n" + content if title else content
         
-        context = browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0.0.0',
-        )
-        page = context.new_page()
-        page.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        if len(full_text) < 10:
+            continue
+        
+        news.append({
+            'title': title,
+            'content': content,
+            'full_text': full_text[:500],  # 限制长度
+            'time': time_obj,
+        })
+    return news
+
+
+def extract_live_items(page) -> list:
+    """单次 evaluate 提取所有 live-item，时间在 Python 端批量解析"""
+    with phases.phase("extract"):
+        raw = page.evaluate(EXTRACT_JS)
+    print(f"  找到 {len(raw)} 条快讯")
+    return parse_live_items(raw)
+
+
+def scrape(keyword: str, context=None) -> list:
+    """爬取华尔街见闻（直接从DOM属性提取时间），context 为浏览器池租用的上下文"""
+    news = []
+    
+    with lease_context(context) as ctx:
+        page = ctx.new_page()
+        route_stats = router.install(page, "wallstreet")
+        capture = debug_capture.start("wallstreet")
         
         try:
             # 直接使用 URL 编码访问
             encoded_keyword = urllib.parse.quote(keyword)
-            url = f'https://wallstreetcn.com/search?q={encoded_keyword}&type=live'
+            url = sites.site_url("wallstreet", f"/search?q={encoded_keyword}&type=live")
             print(f"📄 打开: {url}")
-            page.goto(url, wait_until='domcontentloaded', timeout=60000)
-            
-            print("⏳ 等待页面加载...")
-            time.sleep(5)
+            with phases.phase("navigate"):
+                page.goto(url, wait_until='domcontentloaded', timeout=60000)
+                
+                print("⏳ 等待页面加载...")
+                waits.wait_for_selector(page, 'div.live-item', timeout=10, label='wallstreet.results')
             
             print("📰 加载更多内容...")
             
             # 多次点击"加载更多"获取更多内容
             for i in range(5):  # 点击5次
                 try:
-                    # 滚动到底部
-                    page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                    time.sleep(1)
+                    with phases.phase("scroll"):
+                        # 滚动到底部
+                        page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+                        waits.wait_for_selector(page, 'text=加载更多', timeout=1.5, label='wallstreet.scroll')
                     
-                    # 点击"加载更多"按钮
-                    load_more = page.locator('text=加载更多')
-                    if load_more.count() > 0:
-                        load_more.click(timeout=3000)
-                        time.sleep(2)
-                        print(f"  📥 第{i+1}次加载...")
-                    else:
-                        break
+                        # 点击"加载更多"按钮，等待条目增加
+                        load_more = page.locator('text=加载更多')
+                        if load_more.count() > 0:
+                            prev_items = waits.count(page, 'div.live-item')
+                            load_more.click(timeout=3000)
+                            waits.wait_for_count_growth(page, 'div.live-item', prev_items, timeout=5, label='wallstreet.more')
+                            print(f"  📥 第{i+1}次加载...")
+                        else:
+                            break
                 except:
                     break
             
-            # 最终截图
-            page.screenshot(path='screenshots/wallstreet_page.png')
-            print("📷 截图: wallstreet_page.png")
+            # 调试快照（只在提取失败时落盘）
+            capture.snapshot(page, "loaded")
             
             print("📰 提取新闻...")
             
-            # 直接选择 live-item 元素
-            items = page.locator('div.live-item').all()
-            print(f"  找到 {len(items)} 条快讯")
-            
-            for item in items:
-                try:
-                    # 从 time 元素的 datetime 属性直接获取精确时间
-                    # 格式：2026-01-16T18:58:31.000+08:00
-                    time_elem = item.locator('time.live-item_created')
-                    if time_elem.count() == 0:
-                        continue
-                    
-                    datetime_attr = time_elem.get_attribute('datetime')
-                    if not datetime_attr:
-                        continue
-                    
-                    # 解析ISO时间
-                    # 去掉时区和毫秒
-                    dt_str = datetime_attr[:19]  # 2026-01-16T18:58:31
-                    time_obj = datetime.strptime(dt_str, '%Y-%m-%dT%H:%M:%S')
-                    
-                    # 提取标题（【】内的内容）
-                    title = ""
-                    title_elem = item.locator('div.live-item_title')
-                    if title_elem.count() > 0:
-                        title = title_elem.inner_text().strip()
-                    
-                    # 提取正文内容
-                    content = ""
-                    content_elem = item.locator('div.live-item_html')
-                    if content_elem.count() > 0:
-                        content = content_elem.inner_text().strip()
-                    
-                    # 合并标题和正文
-                    full_text = title
-                    if content:
-                        full_text = title + "\n" + content if title else content
-                    
-                    if len(full_text) < 10:
-                        continue
-                    
-                    news.append({
-                        'title': title,
-                        'content': content,
-                        'full_text': full_text[:500],  # 限制长度
-                        'time': time_obj,
-                    })
-                except Exception as e:
-                    continue
+            news = extract_live_items(page)
             
             print(f"📊 共提取: {len(news)} 条")
             
         except Exception as e:
             print(f"❌ 错误: {e}")
+            capture.fail(e)
         finally:
-            browser.close()
-            print("🔒 浏览器关闭")
+            capture.finish(page, len(news))
+            print(route_stats.summary())
+            page.close()
     
     return news
 
 
+def to_json_items(all_news: list) -> list:
+    """去重、格式化时间，转换为 JSON 可序列化格式（全部输出）"""
+    output = []
+    seen = set()
+    for n in all_news:
+        key = n['title'][:40]
+        if key not in seen:
+            seen.add(key)
+            output.append({
+                'title': n['title'],
+                'summary': n.get('content', ''),  # 保留完整内容
+                'time': n['time'].strftime('%Y-%m-%d %H:%M') if hasattr(n['time'], 'strftime') else str(n['time']),
+                'url': ''
+            })
+    output.sort(key=lambda x: x['time'], reverse=True)
+    return output
+
+
+@register("wallstreet", name="华尔街见闻", time="~13秒")
+def collect(keyword: str, limit: int = 20, context=None) -> list:
+    """统一接口（快讯全部输出）"""
+    return to_json_items(scrape(keyword, context=context))
+
+
 def main():
     # 解析参数: keyword [limit] [--json]
     keyword = "小米集团"
@@ -145,21 +183,7 @@ def main():
         sys_module.stdout = io.StringIO()
         all_news = scrape(keyword)
         sys_module.stdout = old_stdout
-        # 转换为 JSON 可序列化格式
-        output = []
-        seen = set()
-        for n in all_news:
-            key = n['title'][:40]
-            if key not in seen:
-                seen.add(key)
-                output.append({
-                    'title': n['title'],
-                    'summary': n.get('content', ''),  # 保留完整内容
-                    'time': n['time'].strftime('%Y-%m-%d %H:%M') if hasattr(n['time'], 'strftime') else str(n['time']),
-                    'url': ''
-                })
-        output.sort(key=lambda x: x['time'], reverse=True)
-        print(json_lib.dumps(output, ensure_ascii=False))
+        print(json_lib.dumps(to_json_items(all_news), ensure_ascii=False))
         return
     
     # 普通模式
@@ -0,0 +1,4 @@
+"""
+服务端公共组件
+并发引擎、缓存、任务等被 app.py 复用的模块
+"""
@@ -0,0 +1,158 @@
+"""
+采集结果缓存
+键: (数据源, 规范化关键词, limit 档位)，按数据源设置 TTL，LRU 淘汰。
+过期但未超过最大陈旧时间的条目仍然立即返回（stale-while-revalidate），
+同时在后台刷新一次。
+"""
+
+import os
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+
+# 各数据源的新鲜期（秒）：快讯类短，研报类长
+DEFAULT_TTLS = {
+    "cls": 60,
+    "wallstreet": 60,
+    "toutiao": 300,
+    "gelonghui": 300,
+    "eastmoney": 300,
+    "futu": 300,
+    "futu_report": 3600,
+}
+
+# limit 向上取整到这些档位，相近的 limit 共用一份缓存
+LIMIT_BUCKETS = (20, 50, 100, 200)
+
+
+def normalize_keyword(keyword: str) -> str:
+    """全角转半角、去首尾空白、合并空白、统一小写"""
+    text = unicodedata.normalize("NFKC", keyword or "")
+    return " ".join(text.split()).casefold()
+
+
+def limit_bucket(limit: int) -> int:
+    for bucket in LIMIT_BUCKETS:
+        if limit <= bucket:
+            return bucket
+    return limit
+
+
+def parse_ttls(spec: str) -> dict:
+    """解析 "cls=30,futu_report=7200" 形式的 TTL 覆盖"""
+    ttls = {}
+    for part in (spec or "").split(","):
+        if "=" in part:
+            source, _, seconds = part.partition("=")
+            try:
+                ttls[source.strip()] = float(seconds)
+            except ValueError:
+                continue
+    return ttls
+
+
+class ResultCache:
+    """线程安全的 TTL + LRU 缓存"""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttls: dict = None,
+        default_ttl: float = 300,
+        max_stale: float = 3600,
+    ):
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_stale = max_stale
+
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ.get
+        return cls(
+            max_entries=int(env("CACHE_MAX_ENTRIES", "512")),
+            ttls=parse_ttls(env("CACHE_TTLS", "")),
+            max_stale=float(env("CACHE_MAX_STALE", "3600")),
+        )
+
+    @staticmethod
+    def make_key(source: str, keyword: str, limit: int) -> tuple:
+        return (source, normalize_keyword(keyword), limit_bucket(limit))
+
+    def ttl_for(self, source: str) -> float:
+        return self.ttls.get(source, self.default_ttl)
+
+    def peek(self, key):
+        """返回 (value, age, stale)；不存在或陈旧超限返回 None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at = entry
+            age = now - stored_at
+            ttl = self.ttl_for(key[0])
+            if age > ttl + self.max_stale:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            stale = age > ttl
+            if stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+            return value, age, stale
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def refresh(self, key, loader, submit):
+        """后台刷新（同一键同时只刷新一次）；submit 为线程池的提交函数"""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+
+        def task():
+            try:
+                value = loader()
+                if value:
+                    self.put(key, value)
+                return value
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        try:
+            submit(task)
+        except Exception:
+            with self._lock:
+                self._refreshing.discard(key)
+            raise
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshing": len(self._refreshing),
+            }
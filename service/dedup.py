@@ -0,0 +1,144 @@
+"""
+跨数据源近似重复检测
+同一条消息（如"小米集团回购2.19亿港元"）会从富途、格隆汇、东方财富、财联社各返回一份，措辞略有不同。
+合并结果时按标题聚类，每组只保留第一条（按数据源固定顺序），其余挂在它的 duplicates 下。
+
+标题切成两字词集合（与历史检索同一套分词），MinHash 签名分段建 LSH 索引，
+只对至少一段签名完全相同的候选计算精确 Jaccard，
+数千条也只需线性时间。数字不同的标题（如不同日期的回购公告）不算重复：
+较短标题里出现的数字必须都出现在较长标题里。
+"""
+
+import os
+import re
+import hashlib
+import functools
+from array import array
+
+from service.store import tokenize
+
+# DEDUP=0 关闭默认去重（请求仍可用 dedup=1 打开）；DEDUP_THRESHOLD 为判为重复的最低 Jaccard 相似度
+DEDUP_DEFAULT = os.environ.get("DEDUP", "1") != "0"
+DEFAULT_THRESHOLD = float(os.environ.get("DEDUP_THRESHOLD", "0.4"))
+
+# MinHash 签名长度与 LSH 分段：10 段 × 3 行，Jaccard 0.5 的候选命中率约 74%，0.7 约 98%，0.2 约 8%
+PERMUTATIONS = 30
+BANDS = 10
+ROWS = PERMUTATIONS // BANDS
+
+# 少于这么多个两字词的标题只做完全相同判断，避免短标题误合并
+MIN_SHINGLES = 4
+
+_NUM_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+@functools.lru_cache(maxsize=65536)
+def _shingle_hashes(shingle: str) -> tuple:
+    """单个两字词在各个哈希函数下的取值（两字词高度重复，缓存后签名只剩逐列取最小值）"""
+    return tuple(array("I", hashlib.shake_128(shingle.encode("utf-8")).digest(4 * PERMUTATIONS)))
+
+
+def signature(shingles: set) -> list:
+    """MinHash 签名：每个哈希函数下所有两字词取值的最小值"""
+    return list(map(min, zip(*map(_shingle_hashes, shingles))))
+
+
+def numbers(title: str) -> set:
+    return set(_NUM_RE.findall(title))
+
+
+class Deduper:
+    """增量聚类：逐条 add，返回所属簇的代表条目下标（新簇返回自身下标）"""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._shingles = []   # 每条的两字词集合
+        self._numbers = []
+        self._cluster = []    # 每条所属簇的代表下标
+        self._bands = [{} for _ in range(BANDS)]
+        self._exact = {}      # 短标题：规范化文本 -> 代表下标
+        self.comparisons = 0
+
+    def add(self, title: str) -> int:
+        idx = len(self._cluster)
+        grams = set(tokenize(title))
+        nums = numbers(title)
+        self._shingles.append(grams)
+        self._numbers.append(nums)
+
+        if len(grams) < MIN_SHINGLES:
+            key = " ".join(sorted(grams)) or title.strip()
+            rep = self._exact.setdefault(key, idx) if key else idx
+            self._cluster.append(rep)
+            return rep
+
+        sig = signature(grams)
+        keys = [tuple(sig[i * ROWS:(i + 1) * ROWS]) for i in range(BANDS)]
+        rep = idx
+        checked = set()
+        for band, key in zip(self._bands, keys):
+            for other in band.get(key, ()):
+                if other in checked:
+                    continue
+                checked.add(other)
+                if self._similar(idx, other):
+                    rep = self._cluster[other]
+                    break
+            if rep != idx:
+                break
+        self._cluster.append(rep)
+        # 重复条目也入索引，措辞逐步变化的转载可以串到同一簇
+        for band, key in zip(self._bands, keys):
+            band.setdefault(key, []).append(idx)
+        return rep
+
+    def filter_new(self, items: list) -> list:
+        """只保留开启新簇的条目，与之前加入的条目重复的丢弃（流式输出用）"""
+        fresh = []
+        for item in items:
+            if self.add(item.get("title") or "") == len(self._cluster) - 1:
+                fresh.append(item)
+        return fresh
+
+    def _similar(self, a: int, b: int) -> bool:
+        self.comparisons += 1
+        ga, gb = self._shingles[a], self._shingles[b]
+        inter = len(ga & gb)
+        if inter / (len(ga) + len(gb) - inter) < self.threshold:
+            return False
+        na, nb = self._numbers[a], self._numbers[b]
+        short, long_ = (na, nb) if len(ga) <= len(gb) else (nb, na)
+        return short <= long_
+
+
+def merge_duplicates(items: list, threshold: float = DEFAULT_THRESHOLD):
+    """
+    合并标准格式条目中的近似重复，返回 (去重后的列表, 统计)
+    每条输出带 sources（该簇出现过的数据源名称）和 duplicates（被合并条目的来源、标题、链接、时间）
+    """
+    deduper = Deduper(threshold)
+    out = []
+    slot = {}  # 代表下标 -> 在 out 中的位置
+    for idx, item in enumerate(items):
+        rep = deduper.add(item.get("title") or "")
+        if rep == idx:
+            slot[idx] = len(out)
+            out.append(dict(item, sources=[item.get("source", "")], duplicates=[]))
+            continue
+        head = out[slot[rep]]
+        if item.get("source", "") not in head["sources"]:
+            head["sources"].append(item.get("source", ""))
+        head["duplicates"].append(
+            {
+                "source": item.get("source", ""),
+                "title": item.get("title", ""),
+                "url": item.get("url", ""),
+                "publish_time": item.get("publish_time", ""),
+            }
+        )
+    return out, {
+        "input_count": len(items),
+        "output_count": len(out),
+        "merged": len(items) - len(out),
+        "threshold": threshold,
+    }
@@ -0,0 +1,49 @@
+"""
+并发采集引擎
+所有数据源同时启动，按完成顺序收集结果，整体耗时≈最慢的源而不是所有源之和
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# 同时运行的数据源上限（每个源一个浏览器，2GB 容器不宜过高）
+DEFAULT_MAX_WORKERS = int(os.environ.get("SCRAPER_MAX_WORKERS", "4"))
+
+
+def _timed(fn, submitted=None, on_queue=None, label=None):
+    """执行任务并记录耗时，异常作为结果返回而不是抛出；耗时不含排队，排队时长交给 on_queue"""
+    start = time.time()
+    if on_queue is not None and submitted is not None:
+        on_queue(label, start - submitted)
+    try:
+        return fn(), None, time.time() - start
+    except Exception as e:
+        return None, e, time.time() - start
+
+
+class ScrapeEngine:
+    """共享线程池，所有请求共用同一个并发上限"""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, on_queue=None):
+        self.max_workers = max(1, max_workers)
+        self.on_queue = on_queue  # (标签, 排队秒数) -> None，只统计带标签的任务
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="scrape"
+        )
+
+    def submit(self, fn, label: str = None):
+        """提交单个任务，返回 Future，结果为 (result, error, elapsed)"""
+        if label is None or self.on_queue is None:
+            return self._executor.submit(_timed, fn)
+        return self._executor.submit(_timed, fn, time.time(), self.on_queue, label)
+
+    def run_all(self, tasks: dict):
+        """并发执行 {source: callable}，按完成顺序 yield (source, result, error, elapsed)"""
+        futures = {self.submit(fn, source): source for source, fn in tasks.items()}
+        for future in as_completed(futures):
+            result, error, elapsed = future.result()
+            yield futures[future], result, error, elapsed
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
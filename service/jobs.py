@@ -0,0 +1,213 @@
+"""
+异步采集任务
+POST 创建任务立即返回 ID，各数据源作为独立子任务提交到共享线程池（不为每个任务开线程），
+完成回调更新进度；注册表有容量上限，结束的任务过期后清理。
+共用一次搜索的同组数据源（富途新闻 / 研报）合成一个子任务，结果仍按数据源记录。
+"""
+
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import CancelledError
+
+# 子任务状态
+QUEUED, RUNNING, DONE, ERROR, CANCELLED = "queued", "running", "done", "error", "cancelled"
+
+
+class JobRegistryFull(Exception):
+    """进行中的任务已达上限"""
+
+
+class Job:
+    def __init__(self, keyword: str, limit: int, sources: list):
+        self.id = uuid.uuid4().hex
+        self.keyword = keyword
+        self.limit = limit
+        self.sources = list(sources)
+        self.created_at = time.time()
+        self.finished_at = None
+        self.cancelled = False
+        self.progress = {s: {"status": QUEUED} for s in sources}
+        self.results = {}
+        self.extra = {}  # 附加元数据（如缓存命中）
+        self._futures = {}
+        # 撤销未开始的 Future 会在当前线程同步触发完成回调，需要可重入锁
+        self._lock = threading.RLock()
+
+    @property
+    def status(self) -> str:
+        if self.cancelled:
+            return CANCELLED
+        states = [p["status"] for p in self.progress.values()]
+        if all(s in (DONE, ERROR, CANCELLED) for s in states):
+            return DONE
+        if any(s != QUEUED for s in states):
+            return RUNNING
+        return QUEUED
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def _mark_running(self, source: str) -> bool:
+        with self._lock:
+            if self.cancelled:
+                return False
+            self.progress[source] = {"status": RUNNING, "started_at": time.time()}
+            return True
+
+    def _complete(self, source: str, result, error, elapsed):
+        with self._lock:
+            if self.cancelled or self.progress[source]["status"] == CANCELLED:
+                self.progress[source] = {"status": CANCELLED}
+            elif error is not None:
+                self.progress[source] = {
+                    "status": ERROR,
+                    "error": str(error),
+                    "duration_seconds": round(elapsed, 2),
+                }
+            else:
+                self.results[source] = result
+                self.progress[source] = {
+                    "status": DONE,
+                    "count": len(result),
+                    "duration_seconds": round(elapsed, 2),
+                }
+            self._check_finished()
+
+    def _check_finished(self):
+        if self.finished_at is None and all(
+            p["status"] in (DONE, ERROR, CANCELLED) for p in self.progress.values()
+        ):
+            self.finished_at = time.time()
+
+    def set_result(self, source: str, result, **extra):
+        """直接写入结果（如缓存命中），不经过线程池"""
+        with self._lock:
+            self.results[source] = result
+            self.progress[source] = dict({"status": DONE, "count": len(result)}, **extra)
+            self._check_finished()
+
+    def cancel(self):
+        with self._lock:
+            if self.finished_at is not None:
+                return False
+            self.cancelled = True
+            for source, future in self._futures.items():
+                # 尚未开始的直接撤销；已在运行的无法中断，结果丢弃
+                future.cancel()
+                if self.progress[source]["status"] in (QUEUED, RUNNING):
+                    self.progress[source] = {"status": CANCELLED}
+            self._check_finished()
+            return True
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "keyword": self.keyword,
+                "limit": self.limit,
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+                "progress": {s: dict(p) for s, p in self.progress.items()},
+                "results": {s: list(r) for s, r in self.results.items()},
+                "extra": dict(self.extra),
+            }
+
+
+class JobRegistry:
+    def __init__(self, submit, max_jobs: int = 500, ttl: float = 600):
+        self._submit = submit
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, submit):
+        env = os.environ.get
+        return cls(
+            submit,
+            max_jobs=int(env("JOB_MAX", "500")),
+            ttl=float(env("JOB_TTL", "600")),
+        )
+
+    def _evict(self):
+        """清理过期任务；仍满时淘汰最早结束的任务"""
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and now - job.finished_at > self.ttl:
+                del self._jobs[job_id]
+        if len(self._jobs) >= self.max_jobs:
+            finished = sorted(
+                (j for j in self._jobs.values() if j.finished), key=lambda j: j.finished_at
+            )
+            for job in finished[: len(self._jobs) - self.max_jobs + 1]:
+                del self._jobs[job.id]
+
+    def create(self, keyword: str, limit: int, sources: list) -> Job:
+        job = Job(keyword, limit, sources)
+        with self._lock:
+            self._evict()
+            if len(self._jobs) >= self.max_jobs:
+                raise JobRegistryFull(f"进行中的任务已达上限 {self.max_jobs}")
+            self._jobs[job.id] = job
+        return job
+
+    def start(self, job: Job, tasks: dict):
+        """提交 {source: callable} 子任务到线程池；键为数据源元组时是组任务，callable 返回 {source: 结果}"""
+        for key, fn in tasks.items():
+            members = key if isinstance(key, tuple) else (key,)
+
+            def run(members=members, fn=fn):
+                if not all([job._mark_running(source) for source in members]):
+                    raise CancelledError()
+                return fn()
+
+            future = self._submit(run)
+            with job._lock:
+                for source in members:
+                    job._futures[source] = future
+            future.add_done_callback(lambda f, key=key: self._on_done(job, key, f))
+        with job._lock:
+            job._check_finished()
+
+    @staticmethod
+    def _on_done(job: Job, key, future):
+        members = key if isinstance(key, tuple) else (key,)
+        try:
+            result, error, elapsed = future.result()
+        except CancelledError:
+            result, error, elapsed = None, CancelledError(), 0
+        if isinstance(error, CancelledError):
+            with job._lock:
+                for source in members:
+                    job.progress[source] = {"status": CANCELLED}
+                job._check_finished()
+            return
+        for source in members:
+            if error is not None:
+                job._complete(source, None, error, elapsed)
+            else:
+                job._complete(source, result[source] if isinstance(key, tuple) else result, None, elapsed)
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str):
+        job = self.get(job_id)
+        if job is None:
+            return None
+        return job.cancel()
+
+    def stats(self) -> dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            "total": len(jobs),
+            "active": sum(1 for j in jobs if not j.finished),
+            "max_jobs": self.max_jobs,
+        }
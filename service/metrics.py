@@ -0,0 +1,157 @@
+"""
+Prometheus 指标
+进程内的直方图 / 计数器，/metrics 按 Prometheus 文本格式（0.0.4）输出，不依赖 prometheus_client。
+采集阶段耗时由 scrapers.phases 上报，其余在服务端埋点；浏览器池、资源拦截等已有统计
+在输出时通过 collector 回调现取，不在热路径上重复计数。
+"""
+
+import bisect
+import threading
+
+# 页面操作（打开、点击、滚动、提取）的耗时分布（秒）
+PHASE_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# 单个数据源 / 整个请求的耗时分布（秒）
+SOURCE_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+# 服务端合并、序列化等纯计算步骤（秒）
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in values]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = SOURCE_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # 标签值 -> [各桶计数（不累计）..., 总和, 次数]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[idx] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list:
+        with self._lock:
+            series = sorted((k, list(v)) for k, v in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(values[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {values[-1]}")
+        return lines
+
+
+class Registry:
+    """指标登记处；collector(fn) 登记输出时现取的指标，fn 返回 [(名称, 类型, 说明, [(标签dict, 值)])]"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = SOURCE_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for fn in self._collectors:
+            try:
+                families = fn()
+            except Exception as e:  # 现取的统计出错不影响其余指标
+                lines.append(f"# collector {getattr(fn, '__name__', fn)} 失败: {_escape(e)}")
+                continue
+            for name, kind, help, samples in families:
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                for labels, value in samples:
+                    names = tuple(labels)
+                    lines.append(f"{name}{_labels(names, tuple(labels[n] for n in names))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+PHASE_SECONDS = registry.histogram(
+    "scraper_phase_seconds", "爬虫各阶段耗时（启动、打开、搜索、切标签、滚动/翻页、提取）",
+    ("source", "phase"), PHASE_BUCKETS,
+)
+SCRAPE_SECONDS = registry.histogram(
+    "scraper_run_seconds", "单次采集（直连或浏览器）的耗时", ("source", "outcome"),
+)
+SCRAPE_ITEMS = registry.counter("scraper_items_total", "采集到的条目数", ("source",))
+QUEUE_SECONDS = registry.histogram(
+    "scrape_queue_seconds", "数据源任务在线程池中排队等待的时间", ("source",), PHASE_BUCKETS,
+)
+SOURCE_SECONDS = registry.histogram(
+    "news_source_seconds", "请求内单个数据源的耗时（含合并等待，不含线程池排队，排队见 scrape_queue_seconds）", ("source", "outcome"),
+)
+REQUEST_SECONDS = registry.histogram(
+    "news_request_seconds", "/api/v1/news 整体耗时（流式为输出完毕）", ("mode", "stream", "outcome"),
+)
+STAGE_SECONDS = registry.histogram(
+    "news_stage_seconds", "服务端步骤耗时（merge = 合并去重，serialize = 序列化响应）", ("stage",), STAGE_BUCKETS,
+)
+
+
+def observe_phase(source: str, phase: str, seconds: float):
+    """scrapers.phases 的上报回调"""
+    PHASE_SECONDS.observe(seconds, source=source, phase=phase)
@@ -0,0 +1,344 @@
+"""
+关注列表后台刷新
+对关注列表里的每个 (关键词, 数据源) 按各自的间隔定时采集，结果经由调用方提供的 runner
+写入结果缓存和历史存储，这样 /api/v1/news 查询这些关键词时直接命中缓存。
+
+间隔自适应：一轮采集出现新条目就缩短，连续没有新条目就拉长，出错时退避，
+都限制在 [最小间隔, 最大间隔] 内；每次排期加 ±10% 抖动，新加入的关键词首轮错开，避免集中爆发。
+调度线程只负责排期，采集提交到共享线程池，同时进行中的刷新数有上限，给实时请求留出余量。
+共用一次搜索的同组数据源（富途新闻 / 研报）到期时，同一关键词下空闲的同组数据源一起交给
+group_runner 采集一次，而不是各搜一遍。
+
+WATCHLIST 为 off / 0 / 空字符串时关闭后台刷新：不读取、不写入保存的列表，也不启动调度线程。
+"""
+
+import os
+import json
+import time
+import heapq
+import random
+import threading
+
+from service.cache import normalize_keyword
+
+WATCHLIST_FILE = os.environ.get(
+    "WATCHLIST_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output", "watchlist.json"),
+)
+
+DEFAULT_MIN_INTERVAL = 60
+DEFAULT_MAX_INTERVAL = 3600
+DEFAULT_MAX_INFLIGHT = 2
+
+# 新加入关键词的首轮在这段时间内随机错开（秒）
+INITIAL_SPREAD = 30
+JITTER = 0.1
+
+# WATCHLIST 取这些值时表示关闭，而不是关键词
+DISABLED_VALUES = ("", "off", "0", "false", "no")
+
+
+class Pair:
+    """单个 (关键词, 数据源) 的排期状态"""
+
+    def __init__(self, keyword: str, source: str, limit: int, interval: float):
+        self.keyword = keyword
+        self.source = source
+        self.limit = limit
+        self.interval = interval
+        self.next_run = 0.0
+        self.last_run = None
+        self.last_duration = None
+        self.last_count = None
+        self.last_new = None
+        self.last_error = None
+        self.runs = 0
+        self.running = False
+        self.removed = False
+        self.titles = None  # 上一轮的标题集合，用于计算新条目数
+
+    def snapshot(self, now: float) -> dict:
+        return {
+            "source": self.source,
+            "interval_seconds": round(self.interval, 1),
+            "running": self.running,
+            "next_run": None if self.running else time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.next_run)),
+            "next_run_in": None if self.running else round(max(self.next_run - now, 0), 1),
+            "last_run": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.last_run)) if self.last_run else None,
+            "last_duration": self.last_duration,
+            "last_count": self.last_count,
+            "last_new": self.last_new,
+            "last_error": self.last_error,
+            "runs": self.runs,
+        }
+
+
+class WatchlistScheduler:
+    """
+    runner(source, keyword, limit) -> list：执行一次采集并写入缓存/存储，返回条目（含 title）
+    submit(fn) -> Future：提交到共享线程池，结果为 (result, error, elapsed)
+    base_intervals：各数据源的初始间隔（一般取缓存 TTL）
+    groups：{source: 同组数据源列表}，共用一次搜索的数据源
+    group_runner(sources, keyword, limit) -> {source: list}：同组数据源一次采集
+    """
+
+    def __init__(self, runner, submit, sources: list, base_intervals: dict = None,
+                 min_interval: float = DEFAULT_MIN_INTERVAL, max_interval: float = DEFAULT_MAX_INTERVAL,
+                 max_inflight: int = DEFAULT_MAX_INFLIGHT, path: str = WATCHLIST_FILE, enabled: bool = True,
+                 groups: dict = None, group_runner=None):
+        self.runner = runner
+        self.submit = submit
+        self.sources = list(sources)
+        self.base_intervals = dict(base_intervals or {})
+        self.groups = dict(groups or {})
+        self.group_runner = group_runner
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_inflight = max(1, max_inflight)
+        self.path = path
+        self.enabled = enabled
+
+        self._entries = {}  # 规范化关键词 -> {"keyword", "limit", "sources", "added_at", "pairs": {source: Pair}}
+        self._heap = []     # (next_run, seq, Pair)
+        self._seq = 0
+        self._inflight = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self.completed = 0
+        self.failed = 0
+
+    @classmethod
+    def from_env(cls, runner, submit, sources: list, base_intervals: dict = None,
+                 groups: dict = None, group_runner=None):
+        env = os.environ.get
+        preset = env("WATCHLIST")
+        enabled = preset is None or preset.strip().lower() not in DISABLED_VALUES
+        scheduler = cls(
+            runner,
+            submit,
+            sources,
+            base_intervals,
+            min_interval=float(env("WATCHLIST_MIN_INTERVAL", DEFAULT_MIN_INTERVAL)),
+            max_interval=float(env("WATCHLIST_MAX_INTERVAL", DEFAULT_MAX_INTERVAL)),
+            max_inflight=int(env("WATCHLIST_MAX_INFLIGHT", DEFAULT_MAX_INFLIGHT)),
+            enabled=enabled,
+            groups=groups,
+            group_runner=group_runner,
+        )
+        if not enabled:
+            return scheduler
+        scheduler._load()
+        # WATCHLIST="小米集团,腾讯控股" 预置关键词（已在保存的列表里则跳过）
+        for keyword in (preset or "").split(","):
+            if keyword.strip() and normalize_keyword(keyword) not in scheduler._entries:
+                scheduler.add(keyword.strip())
+        return scheduler
+
+    # ---------- 列表维护 ----------
+
+    def _clamp(self, interval: float) -> float:
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _push(self, pair: Pair):
+        self._seq += 1
+        heapq.heappush(self._heap, (pair.next_run, self._seq, pair))
+
+    def add(self, keyword: str, limit: int = 20, sources: list = None) -> dict:
+        """加入（或更新）关注关键词，返回该关键词的排期"""
+        sources = [s for s in (sources or self.sources) if s in self.sources]
+        norm = normalize_keyword(keyword)
+        now = time.time()
+        with self._cond:
+            old = self._entries.pop(norm, None)
+            if old:
+                for pair in old["pairs"].values():
+                    pair.removed = True
+            pairs = {}
+            for source in sources:
+                pair = Pair(keyword, source, limit, self._clamp(self.base_intervals.get(source, self.min_interval)))
+                pair.next_run = now + random.uniform(0, INITIAL_SPREAD)
+                pairs[source] = pair
+                self._push(pair)
+            self._entries[norm] = {
+                "keyword": keyword,
+                "limit": limit,
+                "sources": sources,
+                "added_at": now,
+                "pairs": pairs,
+            }
+            self._save()
+            self._cond.notify_all()
+            return self._entry_snapshot(self._entries[norm], now)
+
+    def remove(self, keyword: str) -> bool:
+        with self._cond:
+            entry = self._entries.pop(normalize_keyword(keyword), None)
+            if entry is None:
+                return False
+            for pair in entry["pairs"].values():
+                pair.removed = True
+            self._save()
+            self._cond.notify_all()
+            return True
+
+    def entries(self) -> list:
+        now = time.time()
+        with self._cond:
+            return [self._entry_snapshot(e, now) for e in self._entries.values()]
+
+    def get(self, keyword: str):
+        with self._cond:
+            entry = self._entries.get(normalize_keyword(keyword))
+            return self._entry_snapshot(entry, time.time()) if entry else None
+
+    @staticmethod
+    def _entry_snapshot(entry: dict, now: float) -> dict:
+        return {
+            "keyword": entry["keyword"],
+            "limit": entry["limit"],
+            "added_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["added_at"])),
+            "sources": {s: p.snapshot(now) for s, p in entry["pairs"].items()},
+        }
+
+    def _load(self):
+        if not self.enabled or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        for e in saved:
+            self.add(e["keyword"], e.get("limit", 20), e.get("sources"))
+
+    def _save(self):
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(
+                    [{"keyword": e["keyword"], "limit": e["limit"], "sources": e["sources"]}
+                     for e in self._entries.values()],
+                    f, ensure_ascii=False, indent=2,
+                )
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    # ---------- 调度 ----------
+
+    def start(self):
+        if self.enabled and self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="watchlist", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _loop(self):
+        with self._cond:
+            while not self._stopped:
+                # 丢弃已移除的条目，以及随同组数据源提前刷新过的旧排期
+                while self._heap and self._stale(self._heap[0]):
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                next_run, _, pair = self._heap[0]
+                now = time.time()
+                if next_run > now:
+                    self._cond.wait(next_run - now)
+                    continue
+                if self._inflight >= self.max_inflight:
+                    self._cond.wait()
+                    continue
+                heapq.heappop(self._heap)
+                batch = self._batch(pair)
+                for p in batch:
+                    p.running = True
+                self._inflight += 1
+                if len(batch) > 1:
+                    sources = [p.source for p in batch]
+                    future = self.submit(lambda s=sources, p=pair: self.group_runner(s, p.keyword, p.limit))
+                else:
+                    future = self.submit(lambda p=pair: self.runner(p.source, p.keyword, p.limit))
+                future.add_done_callback(lambda f, b=batch: self._done(b, f))
+
+    @staticmethod
+    def _stale(item) -> bool:
+        next_run, _, pair = item
+        return pair.removed or pair.running or next_run != pair.next_run
+
+    def _batch(self, pair: Pair) -> list:
+        """到期的 pair 加上同一关键词下空闲的同组 pair（调用方持有锁）"""
+        members = self.groups.get(pair.source)
+        entry = self._entries.get(normalize_keyword(pair.keyword))
+        if not members or self.group_runner is None or entry is None:
+            return [pair]
+        # 按组内顺序排列，与实时请求的组采集共用同一个合并键
+        batch = []
+        for source in members:
+            other = entry["pairs"].get(source)
+            if other is pair or (other is not None and not other.running and not other.removed):
+                batch.append(other)
+        return batch
+
+    def _done(self, batch: list, future):
+        try:
+            result, error, elapsed = future.result()
+        except Exception as e:  # 线程池关闭等
+            result, error, elapsed = None, e, 0.0
+
+        now = time.time()
+        with self._cond:
+            self._inflight -= 1
+            for pair in batch:
+                # 同组一次采集的结果为 {source: list}
+                items = result.get(pair.source, []) if len(batch) > 1 and error is None else result
+                self._record(pair, items, error, elapsed, now)
+            self._cond.notify_all()
+
+    def _record(self, pair: Pair, items, error, elapsed: float, now: float):
+        pair.running = False
+        pair.runs += 1
+        pair.last_run = now
+        pair.last_duration = round(elapsed, 2)
+
+        if error is not None:
+            self.failed += 1
+            pair.last_error = str(error)
+            pair.interval = self._clamp(pair.interval * 2)
+        else:
+            self.completed += 1
+            pair.last_error = None
+            titles = {(i.get("title") or "")[:40] for i in items}
+            new = len(titles - pair.titles) if pair.titles is not None else None
+            pair.last_count = len(items)
+            pair.last_new = new
+            pair.titles = titles
+            if new is not None:
+                # 有新条目按数量缩短（最多减半），没有则拉长 1.5 倍
+                factor = max(0.5, 1 - 0.1 * new) if new else 1.5
+                pair.interval = self._clamp(pair.interval * factor)
+
+        if not pair.removed:
+            pair.next_run = now + pair.interval * random.uniform(1 - JITTER, 1 + JITTER)
+            self._push(pair)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "keywords": len(self._entries),
+                "pairs": sum(len(e["pairs"]) for e in self._entries.values()),
+                "inflight": self._inflight,
+                "max_inflight": self.max_inflight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "enabled": self.enabled,
+                "running": self._thread is not None and not self._stopped,
+            }
@@ -0,0 +1,55 @@
+"""
+相同请求合并（single-flight）
+同一个键同时只执行一次，期间到达的调用方挂到这次执行上，共享结果或异常
+"""
+
+import threading
+from collections import Counter
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}  # key -> Future
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+        self.coalesced_by_source = Counter()
+
+    def do(self, key, fn):
+        """执行 fn 或等待进行中的同键调用，返回 (result, shared)"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                self.coalesced_by_source[key[0]] += 1
+                leader = False
+            else:
+                future = Future()
+                self._calls[key] = future
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "coalesced_by_source": dict(self.coalesced_by_source),
+            }
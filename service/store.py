@@ -0,0 +1,234 @@
+"""
+新闻条目持久化存储
+SQLite（WAL 模式）保存每次采集到的标准格式条目，按 URL（无 URL 时按数据源 + 标题）哈希去重更新。
+
+中文检索用二元分词：标题和摘要里连续的中日韩字符切成重叠的两字词（"小米汽车" → 小米 米汽 汽车），
+英文数字按单词，空格拼接后写入 FTS5 表；查询按同样方式切分，中文片段作为短语匹配，
+等价于子串匹配但走倒排索引；英文数字片段按单词前缀匹配（"xiao"* 命中 Xiaomi，"su"* 命中 SU7），
+输入半个单词也能查到。单个汉字的查询没有两字词可用，退回 LIKE 扫描。
+"""
+
+import os
+import re
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from datetime import datetime
+
+STORE_PATH = os.environ.get(
+    "NEWS_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output", "news.db"),
+)
+
+_CJK = "㐀-䶿一-鿿豈-﫿぀-ヿ가-힯"
+_TOKEN_RE = re.compile(f"[{_CJK}]+|[0-9a-z]+")
+_CJK_RE = re.compile(f"[{_CJK}]")
+_TIME_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})(?:[ T](\d{2}):(\d{2})(?::(\d{2}))?)?")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT UNIQUE NOT NULL,
+    source_key TEXT NOT NULL,
+    source TEXT,
+    keyword TEXT,
+    title TEXT,
+    summary TEXT,
+    url TEXT,
+    publish_time TEXT,
+    published_at TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_news_published ON news (published_at);
+CREATE INDEX IF NOT EXISTS idx_news_source_published ON news (source_key, published_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5 (grams, tokenize = 'unicode61');
+"""
+
+
+def tokenize(text: str) -> list:
+    """切分为检索词列表：中日韩字符按重叠两字词，英文数字按单词（已 NFKC + 小写）"""
+    out = []
+    for run in _TOKEN_RE.findall(unicodedata.normalize("NFKC", text or "").casefold()):
+        if _CJK_RE.match(run) and len(run) > 1:
+            out.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            out.append(run)
+    return out
+
+
+def match_query(query: str):
+    """把查询转为 FTS5 MATCH 表达式（每个连续片段一个短语，片段之间 AND；英文数字片段为前缀查询）；
+    没有可用的两字词/单词时返回 None"""
+    phrases = []
+    for run in _TOKEN_RE.findall(unicodedata.normalize("NFKC", query or "").casefold()):
+        if not _CJK_RE.match(run):
+            phrases.append(f'"{run}"*')
+            continue
+        if len(run) == 1:
+            return None
+        phrases.append('"' + " ".join(tokenize(run)) + '"')
+    return " AND ".join(phrases) if phrases else None
+
+
+def item_key(source_key: str, item: dict) -> str:
+    """去重键：有 URL 用 URL，否则用数据源 + 标题"""
+    url = (item.get("url") or "").strip()
+    basis = url if url else f"{source_key}|{(item.get('title') or '').strip()}"
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()
+
+
+def normalize_time(value, fallback: str) -> str:
+    """发布时间规整为 YYYY-MM-DD HH:MM:SS，无法识别（如"1月16日"）时用首次入库时间"""
+    m = _TIME_RE.match(str(value or ""))
+    if not m:
+        return fallback
+    y, mo, d, h, mi, s = (int(g) if g else 0 for g in m.groups())
+    try:
+        return datetime(y, mo, d, h, mi, s).strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return fallback
+
+
+def parse_since(value: str):
+    """since 参数：YYYY-MM-DD[ HH:MM[:SS]] 或 Unix 时间戳，无法解析返回 None"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return datetime.fromtimestamp(int(value)).strftime("%Y-%m-%d %H:%M:%S")
+    normalized = normalize_time(value, "")
+    return normalized or None
+
+
+class NewsStore:
+    """写入走单个连接（加锁，批量事务），读取每个线程各用一个连接，WAL 下读写互不阻塞
+
+    数据库在第一次读写时才创建 / 打开，导入模块不产生文件
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._writer = None
+
+    def _open(self) -> sqlite3.Connection:
+        """写连接（首次调用时建库建表）；调用方持 _write_lock"""
+        if self._writer is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = self._connect()
+            conn.executescript(SCHEMA)
+            conn.commit()
+            self._writer = conn
+        return self._writer
+
+    def close(self):
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            with self._write_lock:
+                self._open()  # 确保表已建好
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def upsert_many(self, source_key: str, items: list) -> int:
+        """写入一个数据源的标准格式条目（已存在则更新内容和 last_seen），返回写入条数"""
+        if not items:
+            return 0
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._write_lock, self._open() as conn:
+            for item in items:
+                key = item_key(source_key, item)
+                title = item.get("title", "")
+                summary = item.get("summary", "")
+                publish_time = item.get("publish_time", "")
+                row = conn.execute("SELECT id, published_at FROM news WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    cur = conn.execute(
+                        "INSERT INTO news (key, source_key, source, keyword, title, summary, url,"
+                        " publish_time, published_at, first_seen, last_seen)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (key, source_key, item.get("source", ""), item.get("symbol", ""), title, summary,
+                         item.get("url", ""), publish_time, normalize_time(publish_time, now), now, now),
+                    )
+                    rowid = cur.lastrowid
+                else:
+                    rowid = row["id"]
+                    conn.execute(
+                        "UPDATE news SET title = ?, summary = ?, publish_time = ?, published_at = ?, last_seen = ?"
+                        " WHERE id = ?",
+                        (title, summary, publish_time, normalize_time(publish_time, row["published_at"]), now, rowid),
+                    )
+                    conn.execute("DELETE FROM news_fts WHERE rowid = ?", (rowid,))
+                conn.execute(
+                    "INSERT INTO news_fts (rowid, grams) VALUES (?, ?)",
+                    (rowid, " ".join(tokenize(f"{title} {summary}"))),
+                )
+        return len(items)
+
+    def search(self, q: str = "", since: str = None, source: str = None, limit: int = 50, offset: int = 0):
+        """检索，按发布时间倒序；返回 (条目列表, 命中总数)"""
+        where, params = [], []
+        if since:
+            where.append("n.published_at >= ?")
+            params.append(since)
+        if source:
+            where.append("n.source_key = ?")
+            params.append(source)
+
+        q = (q or "").strip()
+        expr = match_query(q) if q else None
+        if expr:
+            # 命中集合先从倒排索引一次取出，再按时间索引回表，避免逐行求值 MATCH
+            where.append("n.id IN (SELECT rowid FROM news_fts WHERE news_fts MATCH ?)")
+            params.append(expr)
+        elif q:
+            where.append("(n.title LIKE ? OR n.summary LIKE ?)")
+            params.extend([f"%{q}%", f"%{q}%"])
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+
+        conn = self._reader()
+        total = conn.execute(f"SELECT COUNT(*) FROM news n{clause}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT n.* FROM news n{clause} ORDER BY n.published_at DESC LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+        return [
+            {
+                "symbol": r["keyword"],
+                "title": r["title"],
+                "summary": r["summary"],
+                "source": r["source"],
+                "source_key": r["source_key"],
+                "url": r["url"],
+                "publish_time": r["publish_time"],
+                "first_seen": r["first_seen"],
+                "last_seen": r["last_seen"],
+            }
+            for r in rows
+        ], total
+
+    def stats(self) -> dict:
+        if self._writer is None and not os.path.exists(self.path):
+            return {"path": self.path, "items": 0, "db_bytes": 0}
+        conn = self._reader()
+        count = conn.execute("SELECT COUNT(*) FROM news").fetchone()[0]
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        return {"path": self.path, "items": count, "db_bytes": size}
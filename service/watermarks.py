@@ -0,0 +1,361 @@
+"""
+增量采集水位线
+按 (数据源, 关键词) 记录已经返回过的条目：布隆过滤器（标题前 30 字 / 条目 ID）
+加上最新的发布时间和 ID（如富途 newsUniqueId），持久化到 JSON。
+布隆过滤器按预计条目数 WATERMARK_BLOOM_ITEMS 定长，分两代轮换：当前代写满后降为上一代、新建一代，
+查询两代都查，误判率始终有上限（约为单代的两倍），更早的条目靠发布时间判断。
+更新只在内存里标记，后台每隔 WATERMARK_FLUSH_SECONDS 秒（默认 5）最多写一次文件，进程退出时再写一次，
+避免每个数据源采集完都在请求路径上重写整个文件。
+
+增量模式下爬虫每轮把新抓到的条目交给 Run.split()，只保留没见过的；
+按时间倒序的列表一旦碰到已知条目就可以停止滚动/翻页（Run.should_stop()）。
+全量模式同样记录轮数，作为计算"节省轮数"的基线，但不并入条目：水位线只由增量请求推进，
+全量请求和关注列表的后台刷新采到的条目不会让增量轮询方漏掉。
+"""
+
+import os
+import re
+import json
+import math
+import time
+import atexit
+import base64
+import hashlib
+import threading
+
+from service.cache import normalize_keyword
+
+WATERMARK_FILE = os.environ.get(
+    "WATERMARK_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "output", "watermarks.json"),
+)
+
+# 每代布隆过滤器的容量与写满时的误判率：1000 条、1% 约 1.2KB、7 个哈希
+DEFAULT_BLOOM_ITEMS = 1000
+DEFAULT_BLOOM_FP_RATE = 0.01
+
+# 旧版水位线文件的定长参数（没有记录容量时按此读取）
+DEFAULT_BLOOM_BITS = 8192
+DEFAULT_BLOOM_HASHES = 4
+
+# 最多保留多少个 (数据源, 关键词)，超出淘汰最久未更新的
+DEFAULT_MAX_KEYS = 1000
+
+# 更新后最多延迟多少秒写盘，0 表示每次更新立即写
+DEFAULT_FLUSH_SECONDS = 5.0
+
+# 可比较的时间格式：2026-01-16 18:58
+_TIME_RE = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}")
+
+
+class BloomFilter:
+    """定长位数组 + 双重哈希"""
+
+    def __init__(self, bits: int = DEFAULT_BLOOM_BITS, hashes: int = DEFAULT_BLOOM_HASHES, data: bytes = None):
+        self.bits = bits
+        self.hashes = hashes
+        self.array = bytearray(data) if data else bytearray((bits + 7) // 8)
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, value: str):
+        for pos in self._positions(value):
+            self.array[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+    def dump(self) -> str:
+        return base64.b64encode(bytes(self.array)).decode("ascii")
+
+    @classmethod
+    def load(cls, data: str, bits: int, hashes: int) -> "BloomFilter":
+        return cls(bits, hashes, base64.b64decode(data))
+
+    @classmethod
+    def for_capacity(cls, items: int, fp_rate: float = DEFAULT_BLOOM_FP_RATE) -> "BloomFilter":
+        """按容量和写满时的目标误判率取位数、哈希个数"""
+        items = max(1, items)
+        bits = max(64, math.ceil(-items * math.log(fp_rate) / math.log(2) ** 2))
+        return cls(bits, max(1, round(bits / items * math.log(2))))
+
+
+def item_keys(item: dict) -> list:
+    """条目的身份键：标题前 30 字（与各爬虫去重一致），有 ID 时再加 ID"""
+    keys = []
+    title = (item.get("title") or "").strip()
+    if title:
+        keys.append("t:" + title[:30])
+    if item.get("id"):
+        keys.append("i:" + str(item["id"]))
+    return keys
+
+
+def item_time(item: dict) -> str:
+    """可比较的发布时间（YYYY-MM-DD HH:MM），格式不符返回空串"""
+    value = str(item.get("time") or "")
+    m = _TIME_RE.match(value)
+    return m.group() if m else ""
+
+
+class Mark:
+    """单个 (数据源, 关键词) 的水位线；bloom 为当前代，previous 为上一代，filled 为当前代已写入的键数"""
+
+    def __init__(self, bloom: BloomFilter, newest_time: str = "", newest_id: str = "",
+                 count: int = 0, full_rounds: int = 0, updated_at: float = 0.0,
+                 previous: BloomFilter = None, filled: int = 0, capacity: int = DEFAULT_BLOOM_ITEMS):
+        self.bloom = bloom
+        self.previous = previous
+        self.filled = filled
+        self.capacity = capacity
+        self.newest_time = newest_time
+        self.newest_id = newest_id
+        self.count = count
+        self.full_rounds = full_rounds  # 最近一次全量采集用的轮数/页数
+        self.updated_at = updated_at
+
+    def remember(self, key: str):
+        """写入当前代，写满后轮换"""
+        if self.filled >= self.capacity:
+            self.previous = self.bloom
+            self.bloom = BloomFilter.for_capacity(self.capacity)
+            self.filled = 0
+        self.bloom.add(key)
+        self.filled += 1
+
+    def seen(self, key: str) -> bool:
+        return key in self.bloom or (self.previous is not None and key in self.previous)
+
+    def is_known(self, item: dict) -> bool:
+        if any(self.seen(k) for k in item_keys(item)):
+            return True
+        t = item_time(item)
+        return bool(t and self.newest_time and t < self.newest_time)
+
+    def to_dict(self) -> dict:
+        return {
+            "bloom": self.bloom.dump(),
+            "bits": self.bloom.bits,
+            "hashes": self.bloom.hashes,
+            "filled": self.filled,
+            "capacity": self.capacity,
+            "previous": None if self.previous is None else {
+                "bloom": self.previous.dump(), "bits": self.previous.bits, "hashes": self.previous.hashes,
+            },
+            "newest_time": self.newest_time,
+            "newest_id": self.newest_id,
+            "count": self.count,
+            "full_rounds": self.full_rounds,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict, capacity: int = DEFAULT_BLOOM_ITEMS) -> "Mark":
+        """旧版文件没有 filled：按累计条目数计，超过容量的下次写入时即轮换"""
+        prev = d.get("previous")
+        return cls(
+            BloomFilter.load(d["bloom"], d["bits"], d["hashes"]),
+            d.get("newest_time", ""),
+            d.get("newest_id", ""),
+            d.get("count", 0),
+            d.get("full_rounds", 0),
+            d.get("updated_at", 0.0),
+            previous=BloomFilter.load(prev["bloom"], prev["bits"], prev["hashes"]) if prev else None,
+            filled=d.get("filled", d.get("count", 0)),
+            capacity=d.get("capacity", capacity),
+        )
+
+
+class Run:
+    """一次采集的增量状态，交给爬虫使用（爬虫只依赖 tick / split / should_stop / prune_known）"""
+
+    def __init__(self, mark: Mark = None, incremental: bool = False):
+        self.mark = mark
+        self.requested = incremental  # 增量请求（含还没有水位线、退化为全量的第一次）
+        self.incremental = incremental and mark is not None
+        self.rounds = 0
+        self.new = 0
+        self.known = 0
+        self.stopped_early = False
+        self._round_new = 0
+        self._round_known = 0
+
+    def tick(self):
+        """开始新的一轮（滚动一次 / 翻一页）"""
+        self.rounds += 1
+        self._round_new = 0
+        self._round_known = 0
+
+    def split(self, items: list) -> list:
+        """返回未见过的条目；全量模式原样返回"""
+        if not self.incremental:
+            self._round_new += len(items)
+            self.new += len(items)
+            return items
+        fresh = []
+        for item in items:
+            if self.mark.is_known(item):
+                self._round_known += 1
+                self.known += 1
+            else:
+                fresh.append(item)
+        self._round_new += len(fresh)
+        self.new += len(fresh)
+        return fresh
+
+    def prune_known(self, results: dict, seen: set):
+        """用于 {uid: item} 结果表：检查 seen 之外新加入的条目，删掉已知的"""
+        added = [uid for uid in results if uid not in seen]
+        seen.update(added)
+        for uid in added:
+            if not self.split([results[uid]]):
+                del results[uid]
+
+    def should_stop(self, ordered: bool = True) -> bool:
+        """
+        增量模式下是否可以停止
+        ordered=True（按时间倒序的列表）：本轮碰到已知条目即停
+        ordered=False（相关性排序）：本轮全是已知条目才停
+        """
+        if not self.incremental or self._round_known == 0:
+            return False
+        if ordered or self._round_new == 0:
+            self.stopped_early = True
+            return True
+        return False
+
+    def summary(self, rounds_saved: int) -> dict:
+        return {
+            "new": self.new,
+            "known_skipped": self.known,
+            "rounds": self.rounds,
+            "rounds_saved": rounds_saved,
+            "stopped_early": self.stopped_early,
+        }
+
+
+class WatermarkStore:
+    """所有 (数据源, 关键词) 的水位线，线程安全，更新后延迟 flush_seconds 秒批量落盘"""
+
+    def __init__(self, path: str = WATERMARK_FILE, max_keys: int = DEFAULT_MAX_KEYS,
+                 bloom_items: int = DEFAULT_BLOOM_ITEMS, flush_seconds: float = DEFAULT_FLUSH_SECONDS):
+        self.path = path
+        self.max_keys = max_keys
+        self.bloom_items = max(1, bloom_items)
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # 串行化快照 + 写文件，保证后写的总是较新的快照
+        self._marks = None
+        self._dirty = False
+        self._timer = None
+        self.rounds_saved = {}
+        self.saves = 0
+        atexit.register(self.flush)
+
+    @classmethod
+    def from_env(cls) -> "WatermarkStore":
+        return cls(
+            max_keys=int(os.environ.get("WATERMARK_MAX_KEYS", DEFAULT_MAX_KEYS)),
+            bloom_items=int(os.environ.get("WATERMARK_BLOOM_ITEMS", DEFAULT_BLOOM_ITEMS)),
+            flush_seconds=float(os.environ.get("WATERMARK_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS)),
+        )
+
+    @staticmethod
+    def _key(source: str, keyword: str) -> str:
+        return f"{source}|{normalize_keyword(keyword)}"
+
+    def _load(self) -> dict:
+        if self._marks is None:
+            self._marks = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        for key, d in json.load(f).items():
+                            self._marks[key] = Mark.from_dict(d, self.bloom_items)
+                except (OSError, ValueError, KeyError):
+                    self._marks = {}
+        return self._marks
+
+    def _mark_dirty(self):
+        """记下有未写盘的更新，并安排一次延迟写盘；调用方持 _lock"""
+        self._dirty = True
+        if self.flush_seconds <= 0 or self._timer is not None:
+            return
+        self._timer = threading.Timer(self.flush_seconds, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """有未写盘的更新时写入文件；写文件时不占用 _lock，采集线程照常更新水位线"""
+        with self._save_lock:
+            with self._lock:
+                self._timer = None
+                if not self._dirty:
+                    return
+                data = {k: m.to_dict() for k, m in self._marks.items()}
+                self._dirty = False
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp = self.path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp, self.path)
+                self.saves += 1
+            except OSError:
+                pass
+
+    def start(self, source: str, keyword: str, incremental: bool) -> Run:
+        """开始一次采集；增量模式但还没有水位线时退化为全量"""
+        with self._lock:
+            mark = self._load().get(self._key(source, keyword))
+        return Run(mark, incremental)
+
+    def finish(self, source: str, keyword: str, run: Run, items: list) -> dict:
+        """增量请求把本次返回的条目并入水位线；全量采集只记录轮数。返回增量统计"""
+        with self._lock:
+            marks = self._load()
+            key = self._key(source, keyword)
+            mark = marks.get(key)
+            if mark is None:
+                mark = marks[key] = Mark(BloomFilter.for_capacity(self.bloom_items), capacity=self.bloom_items)
+
+            if run.requested:
+                for item in items:
+                    for k in item_keys(item):
+                        mark.remember(k)
+                    t = item_time(item)
+                    if t > mark.newest_time:
+                        mark.newest_time = t
+                        mark.newest_id = str(item.get("id") or "")
+                mark.count += len(items)
+            mark.updated_at = time.time()
+
+            saved = 0
+            if run.incremental:
+                saved = max(0, mark.full_rounds - run.rounds)
+                self.rounds_saved[source] = self.rounds_saved.get(source, 0) + saved
+            elif run.rounds:
+                mark.full_rounds = run.rounds
+
+            if len(marks) > self.max_keys:
+                oldest = sorted(marks, key=lambda k: marks[k].updated_at)
+                for k in oldest[: len(marks) - self.max_keys]:
+                    del marks[k]
+            self._mark_dirty()
+        if self.flush_seconds <= 0:
+            self.flush()
+        return run.summary(saved)
+
+    def stats(self) -> dict:
+        with self._lock:
+            marks = self._load()
+            return {
+                "keys": len(marks),
+                "rounds_saved": dict(self.rounds_saved),
+                "saves": self.saves,
+                "pending": self._dirty,
+            }
@@ -0,0 +1,112 @@
+"""接口参数校验：非法的 limit / count / sources 或非对象请求体返回 400，关注列表关闭时返回 409，都不触发采集"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 导入 app 前把状态文件指向临时目录，并关闭浏览器预热和关注列表
+STATE_DIR = tempfile.mkdtemp()
+os.environ.update(
+    NEWS_STORE_PATH=os.path.join(STATE_DIR, "news.db"),
+    WATERMARK_FILE=os.path.join(STATE_DIR, "watermarks.json"),
+    WATCHLIST_FILE=os.path.join(STATE_DIR, "watchlist.json"),
+    SELECTOR_CACHE_FILE=os.path.join(STATE_DIR, "selector_cache.json"),
+    WATCHLIST="off",
+    BROWSER_POOL_MIN="0",
+)
+
+import app as web
+from service.scheduler import WatchlistScheduler
+
+
+class ApiTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = web.app.test_client()
+
+    def assertBadRequest(self, response, message):
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json["success"])
+        self.assertIn(message, response.json["error"])
+
+
+class JobsValidationTest(ApiTestCase):
+    def test_non_numeric_limit(self):
+        r = self.client.post("/api/v1/jobs", json={"keyword": "小米", "limit": "abc"})
+        self.assertBadRequest(r, "limit")
+
+    def test_non_positive_limit(self):
+        r = self.client.post("/api/v1/jobs", json={"keyword": "小米", "limit": 0})
+        self.assertBadRequest(r, "limit")
+
+    def test_body_not_object(self):
+        r = self.client.post("/api/v1/jobs", json=["小米"])
+        self.assertBadRequest(r, "JSON 对象")
+
+    def test_missing_keyword(self):
+        r = self.client.post("/api/v1/jobs", json={})
+        self.assertBadRequest(r, "keyword")
+
+
+class WatchlistValidationTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        # 换成开启状态、不启动调度线程的关注列表
+        scheduler = WatchlistScheduler(
+            web.run_source, web.engine.submit, list(web.SCRAPERS.keys()),
+            path=os.path.join(STATE_DIR, "watchlist.json"),
+        )
+        patcher = mock.patch.object(web, "watchlist", scheduler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_invalid_limit(self):
+        r = self.client.post("/api/v1/watchlist", json={"keyword": "小米", "limit": "many"})
+        self.assertBadRequest(r, "limit")
+
+    def test_sources_must_be_list(self):
+        r = self.client.post("/api/v1/watchlist", json={"keyword": "小米", "sources": "cls"})
+        self.assertBadRequest(r, "sources")
+
+    def test_sources_items_must_be_strings(self):
+        r = self.client.post("/api/v1/watchlist", json={"keyword": "小米", "sources": [1, 2]})
+        self.assertBadRequest(r, "sources")
+
+    def test_unknown_source(self):
+        r = self.client.post("/api/v1/watchlist", json={"keyword": "小米", "sources": ["nope"]})
+        self.assertBadRequest(r, "nope")
+
+    def test_body_not_object(self):
+        r = self.client.post("/api/v1/watchlist", json="小米")
+        self.assertBadRequest(r, "JSON 对象")
+
+    def test_valid_add(self):
+        r = self.client.post("/api/v1/watchlist", json={"keyword": "小米", "limit": 10, "sources": ["cls"]})
+        self.assertEqual(r.status_code, 201)
+        self.assertEqual(list(r.json["data"]["sources"]), ["cls"])
+
+
+class WatchlistDisabledTest(ApiTestCase):
+    def test_add_rejected_when_disabled(self):
+        self.assertFalse(web.watchlist.enabled)
+        r = self.client.post("/api/v1/watchlist", json={"keyword": "小米"})
+        self.assertEqual(r.status_code, 409)
+        self.assertEqual(web.watchlist.entries(), [])
+
+
+class ScrapeValidationTest(ApiTestCase):
+    def test_invalid_count(self):
+        for count in ("abc", -1, 0):
+            r = self.client.post("/api/scrape", json={"keyword": "小米", "count": count, "sources": ["cls"]})
+            self.assertBadRequest(r, "count")
+
+    def test_body_not_object(self):
+        r = self.client.post("/api/scrape", data="小米", content_type="text/plain")
+        self.assertBadRequest(r, "JSON 对象")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""浏览器池：启动驱动 / 浏览器失败时，排队和新提交的任务应以原异常立即失败，而不是等到超时"""
+
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers import browser_pool
+from scrapers.browser_pool import BrowserPool
+
+
+def broken_driver():
+    raise RuntimeError("driver boom")
+
+
+class LaunchFailureTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(browser_pool, "start_driver", broken_driver)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = BrowserPool(min_size=0, max_size=1)
+        self.addCleanup(self.pool.shutdown, False)
+
+    def test_queued_job_fails_with_launch_error(self):
+        start = time.time()
+        with self.assertRaisesRegex(RuntimeError, "driver boom"):
+            self.pool.run(lambda context: "ok", timeout=5)
+        self.assertLess(time.time() - start, 3)
+
+        stats = self.pool.stats()
+        self.assertFalse(stats["healthy"])
+        self.assertEqual(stats["queued"], 0)
+        self.assertEqual(stats["size"], 0)
+
+    def test_submit_during_backoff_fails_immediately(self):
+        with self.assertRaises(RuntimeError):
+            self.pool.run(lambda context: "ok", timeout=5)
+        future = self.pool.submit(lambda context: "ok")
+        self.assertTrue(future.done())
+        self.assertRaisesRegex(RuntimeError, "driver boom", future.result)
+
+    def test_retries_after_backoff(self):
+        with self.assertRaises(RuntimeError):
+            self.pool.run(lambda context: "ok", timeout=5)
+        self.pool._retry_at = 0.0  # 跳过退避
+        with self.assertRaisesRegex(RuntimeError, "driver boom"):
+            self.pool.run(lambda context: "ok", timeout=5)
+        self.assertEqual(self.pool.stats()["launch_failures"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""检索回归：FTS5 索引的结果应与原先的 LIKE 子串匹配一致（中文子串、英文半个单词）"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memori import Memori
+from service.store import NewsStore
+
+CONTENTS = ["小米汽车SU7交付量创新高", "Xiaomi 发布新款手机", "腾讯控股回购股份"]
+
+
+class MemoriFindTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.memori = Memori(os.path.join(self.tmp.name, "memory.db"))
+        self.memori.add_many(CONTENTS)
+
+    def tearDown(self):
+        self.memori.conn.close()
+        self.tmp.cleanup()
+
+    def found(self, query):
+        rows, total = self.memori.find(query)
+        self.assertEqual(total, len(rows))
+        return sorted(row[0] for row in rows)
+
+    def test_partial_latin_word(self):
+        self.assertEqual(self.found("Xiao"), ["Xiaomi 发布新款手机"])
+        self.assertEqual(self.found("su"), ["小米汽车SU7交付量创新高"])
+
+    def test_cjk_substring(self):
+        self.assertEqual(self.found("米汽"), ["小米汽车SU7交付量创新高"])
+        self.assertEqual(self.found("腾"), ["腾讯控股回购股份"])
+
+
+class NewsStoreSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = NewsStore(os.path.join(self.tmp.name, "news.db"))
+        self.store.upsert_many("cls", [{"title": t, "url": f"http://x/{i}"} for i, t in enumerate(CONTENTS)])
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def titles(self, q):
+        items, total = self.store.search(q)
+        self.assertEqual(total, len(items))
+        return sorted(i["title"] for i in items)
+
+    def test_partial_latin_word(self):
+        self.assertEqual(self.titles("Xiao"), ["Xiaomi 发布新款手机"])
+        self.assertEqual(self.titles("SU"), ["小米汽车SU7交付量创新高"])
+        self.assertEqual(self.titles("小米 su"), ["小米汽车SU7交付量创新高"])
+
+
+if __name__ == "__main__":
+    unittest.main()
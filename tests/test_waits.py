@@ -0,0 +1,68 @@
+"""expect_response：等待超时返回不抛出，包住的操作自身的异常必须向外抛出"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from scrapers import waits
+
+
+class _Expect:
+    """与 Playwright 的 expect_response 一致：操作出错时直接抛出，操作完成后才等待响应"""
+
+    def __init__(self, arrives: bool):
+        self.arrives = arrives
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            return False
+        if not self.arrives:
+            raise PlaywrightTimeoutError("Timeout 1000ms exceeded")
+        return False
+
+
+class StubPage:
+    def __init__(self, arrives: bool):
+        self.arrives = arrives
+
+    def expect_response(self, predicate, timeout):
+        return _Expect(self.arrives)
+
+
+def timeouts(label: str) -> int:
+    return waits.wait_stats.snapshot().get(label, {}).get("timeouts", 0)
+
+
+class ExpectResponseTest(unittest.TestCase):
+    def test_response_arrives(self):
+        with waits.expect_response(StubPage(True), r"search", label="t.ok"):
+            pass
+        self.assertEqual(timeouts("t.ok"), 0)
+
+    def test_wait_timeout_is_recorded_not_raised(self):
+        with waits.expect_response(StubPage(False), r"search", label="t.timeout"):
+            pass
+        self.assertEqual(timeouts("t.timeout"), 1)
+
+    def test_body_error_propagates(self):
+        with self.assertRaisesRegex(ValueError, "fill failed"):
+            with waits.expect_response(StubPage(True), r"search", label="t.body"):
+                raise ValueError("fill failed")
+        self.assertEqual(timeouts("t.body"), 0)
+
+    def test_body_playwright_timeout_propagates(self):
+        # 操作本身（如 fill）超时也不能当成等待响应超时吞掉
+        with self.assertRaises(PlaywrightTimeoutError):
+            with waits.expect_response(StubPage(True), r"search", label="t.body_timeout"):
+                raise PlaywrightTimeoutError("fill timeout")
+
+
+if __name__ == "__main__":
+    unittest.main()
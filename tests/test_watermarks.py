@@ -0,0 +1,71 @@
+"""水位线：布隆过滤器跑很多轮之后误判率仍有上限，已返回的条目在增量模式下被识别"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service.watermarks import BloomFilter, WatermarkStore
+
+
+def items(start: int, n: int) -> list:
+    return [{"title": f"新闻标题 {i}", "id": f"id-{i}"} for i in range(start, start + n)]
+
+
+class BloomFilterTest(unittest.TestCase):
+    def test_for_capacity_meets_target_rate(self):
+        bloom = BloomFilter.for_capacity(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f"k{i}")
+        false_hits = sum(f"other{i}" in bloom for i in range(20000))
+        self.assertLess(false_hits / 20000, 0.02)
+
+
+class WatermarkStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = WatermarkStore(os.path.join(self.tmp.name, "w.json"), bloom_items=500, flush_seconds=0)
+
+    def poll(self, batch: list, incremental: bool = True) -> list:
+        """一次采集：增量模式返回过滤后的新条目"""
+        run = self.store.start("cls", "小米", incremental=incremental)
+        run.tick()
+        fresh = run.split(batch)
+        self.store.finish("cls", "小米", run, fresh)
+        return fresh
+
+    def test_false_positive_rate_bounded_after_many_runs(self):
+        # 200 轮 × 50 条（每条 2 个键）= 20000 个键，远超单代容量
+        for r in range(200):
+            self.poll(items(r * 50, 50))
+        run = self.store.start("cls", "小米", incremental=True)
+        fresh = items(10_000_000, 5000)
+        kept = run.split(fresh)
+        self.assertLess(1 - len(kept) / len(fresh), 0.05)
+
+    def test_recent_items_stay_known(self):
+        for r in range(20):
+            self.poll(items(r * 50, 50))
+        run = self.store.start("cls", "小米", incremental=True)
+        self.assertEqual(run.split(items(19 * 50, 50)), [])
+
+    def test_reload_keeps_generations(self):
+        for r in range(30):
+            self.poll(items(r * 50, 50))
+        reloaded = WatermarkStore(self.store.path, bloom_items=500, flush_seconds=0)
+        run = reloaded.start("cls", "小米", incremental=True)
+        self.assertEqual(run.split(items(29 * 50, 50)), [])
+        self.assertEqual(len(run.split(items(10_000_000, 10))), 10)
+
+    def test_full_runs_do_not_advance_watermark(self):
+        # 关注列表 / 全量请求先采到的条目，增量轮询方仍应拿到
+        self.poll(items(0, 10))
+        self.poll(items(10, 10), incremental=False)
+        self.assertEqual(len(self.poll(items(0, 20))), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()